@@ -0,0 +1,106 @@
+import os
+from typing import List
+
+
+def _env_str(name: str, default: str) -> str:
+    return os.environ.get(name, default)
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+def _env_list(name: str, default: str) -> List[str]:
+    """Comma separated environment variable as a list of non-empty items"""
+    return [item.strip() for item in os.environ.get(name, default).split(",") if item.strip()]
+
+
+# Routers to mount, by module name under app.routes (empty mounts all of them)
+ROUTERS = _env_list("DRUG_API_ROUTERS", "")
+
+# Binding models
+CHECKPOINT_ROOT = _env_str("DRUG_API_CHECKPOINT_ROOT", os.path.join("save_folder", "pretrained_models"))
+PRELOAD_MODELS = _env_list("DRUG_API_PRELOAD_MODELS", "CNN")
+
+# CPU inference: "eager" (DeepPurpose as is), "traced" or "int8" (traced after dynamic
+# int8 quantization); optimized models are kept only if their scores on a fixed parity
+# set stay within INFERENCE_MAX_DELTA of eager. Threads is torch's intra-op thread
+# count per process (0 keeps torch's default).
+INFERENCE_MODE = _env_str("DRUG_API_INFERENCE_MODE", "eager")
+INFERENCE_MAX_DELTA = _env_float("DRUG_API_INFERENCE_MAX_DELTA", 0.05)
+INFERENCE_THREADS = _env_int("DRUG_API_INFERENCE_THREADS", 0)
+
+# Micro-batching of binding requests
+BATCH_WINDOW_MS = _env_float("DRUG_API_BATCH_WINDOW_MS", 5.0)
+BATCH_MAX_SIZE = _env_int("DRUG_API_BATCH_MAX_SIZE", 64)
+
+# Cache of DeepPurpose drug/target encodings
+ENCODING_CACHE_MB = _env_int("DRUG_API_ENCODING_CACHE_MB", 256)
+ENCODING_CACHE_PATH = _env_str("DRUG_API_ENCODING_CACHE_PATH", "")
+
+# Cache of binding scores keyed by model checkpoint, canonical SMILES and target
+SCORE_CACHE_MAX_ENTRIES = _env_int("DRUG_API_SCORE_CACHE_MAX_ENTRIES", 200000)
+SCORE_CACHE_PATH = _env_str("DRUG_API_SCORE_CACHE_PATH", "")
+
+# Cache of Lipinski/ADMET results keyed by canonical SMILES
+RESULT_CACHE_MAX_ENTRIES = _env_int("DRUG_API_RESULT_CACHE_MAX_ENTRIES", 100000)
+RESULT_CACHE_TTL_SECONDS = _env_float("DRUG_API_RESULT_CACHE_TTL_SECONDS", 3600.0)
+
+# Batch Lipinski/ADMET endpoints
+MAX_BATCH_SIZE = _env_int("DRUG_API_MAX_BATCH_SIZE", 50000)
+
+# Process pool for RDKit-heavy work (0 runs tasks on the thread pool instead)
+PROCESS_WORKERS = _env_int("DRUG_API_PROCESS_WORKERS", os.cpu_count() or 1)
+TASK_TIMEOUT_SECONDS = _env_float("DRUG_API_TASK_TIMEOUT_SECONDS", 60.0)
+
+# AgentAI LLM service
+AGENTAI_API_URL = _env_str("DRUG_API_AGENTAI_URL", "https://api-lr.agent.ai/v1/action/invoke_llm")
+AGENTAI_API_KEY = _env_str("DRUG_API_AGENTAI_KEY", "WqapEOrxL4wmfpCLC5BrR7auoBQWrekqKTLVy7ffCf785BOfpa6WsrpMvM0oGF5A")
+AGENTAI_TIMEOUT_SECONDS = _env_float("DRUG_API_AGENTAI_TIMEOUT_SECONDS", 30.0)
+AGENTAI_MAX_CONNECTIONS = _env_int("DRUG_API_AGENTAI_MAX_CONNECTIONS", 20)
+AGENTAI_MAX_CONCURRENCY = _env_int("DRUG_API_AGENTAI_MAX_CONCURRENCY", 10)
+AGENTAI_RETRIES = _env_int("DRUG_API_AGENTAI_RETRIES", 2)
+AGENTAI_BACKOFF_SECONDS = _env_float("DRUG_API_AGENTAI_BACKOFF_SECONDS", 0.5)
+AGENTAI_CACHE_TTL_SECONDS = _env_float("DRUG_API_AGENTAI_CACHE_TTL_SECONDS", 600.0)
+AGENTAI_CACHE_MAX_ENTRIES = _env_int("DRUG_API_AGENTAI_CACHE_MAX_ENTRIES", 1024)
+
+# Molecule generation
+GENERATE_MAX_SAMPLES = _env_int("DRUG_API_GENERATE_MAX_SAMPLES", 5000)
+GENERATE_STREAM_MAX_SAMPLES = _env_int("DRUG_API_GENERATE_STREAM_MAX_SAMPLES", 1000000)
+# Most recent distinct molecules a streamed campaign deduplicates against
+GENERATE_DEDUP_WINDOW = _env_int("DRUG_API_GENERATE_DEDUP_WINDOW", 100000)
+# Consecutive chunks without a new molecule after which a campaign counts as exhausted
+GENERATE_STALL_CHUNKS = _env_int("DRUG_API_GENERATE_STALL_CHUNKS", 8)
+
+# Fingerprint similarity index (directory; empty keeps the index in memory only)
+SIMILARITY_INDEX_PATH = _env_str("DRUG_API_SIMILARITY_INDEX_PATH", "")
+
+# Compound table for substructure/property queries (directory; empty keeps it in memory only)
+COMPOUND_TABLE_PATH = _env_str("DRUG_API_COMPOUND_TABLE_PATH", "")
+
+# Precomputed descriptor store built by `python -m app.utils.descriptor_store ingest` (directory)
+DESCRIPTOR_STORE = _env_str("DRUG_API_DESCRIPTOR_STORE", "")
+
+# Background jobs (SQLite file for the job queue and results; empty keeps them in memory)
+JOBS_DB_PATH = _env_str("DRUG_API_JOBS_DB_PATH", "")
+JOB_WORKERS = _env_int("DRUG_API_JOB_WORKERS", 2)
+JOB_MAX_PAIRS = _env_int("DRUG_API_JOB_MAX_PAIRS", 10000000)
+
+# Admission control: concurrent requests, queued requests and queue deadline per
+# priority class (see app.utils.admission), plus optional per-route concurrency
+# limits as "path=limit" entries, e.g. "/generate/=2,/agent/=4"
+ADMISSION_ENABLED = _env_int("DRUG_API_ADMISSION_ENABLED", 1)
+ADMISSION_INTERACTIVE_LIMIT = _env_int("DRUG_API_ADMISSION_INTERACTIVE_LIMIT", 64)
+ADMISSION_INTERACTIVE_QUEUE = _env_int("DRUG_API_ADMISSION_INTERACTIVE_QUEUE", 256)
+ADMISSION_INTERACTIVE_WAIT_SECONDS = _env_float("DRUG_API_ADMISSION_INTERACTIVE_WAIT_SECONDS", 2.0)
+ADMISSION_BATCH_LIMIT = _env_int("DRUG_API_ADMISSION_BATCH_LIMIT", 4)
+ADMISSION_BATCH_QUEUE = _env_int("DRUG_API_ADMISSION_BATCH_QUEUE", 32)
+ADMISSION_BATCH_WAIT_SECONDS = _env_float("DRUG_API_ADMISSION_BATCH_WAIT_SECONDS", 10.0)
+ADMISSION_AI_LIMIT = _env_int("DRUG_API_ADMISSION_AI_LIMIT", 8)
+ADMISSION_AI_QUEUE = _env_int("DRUG_API_ADMISSION_AI_QUEUE", 32)
+ADMISSION_AI_WAIT_SECONDS = _env_float("DRUG_API_ADMISSION_AI_WAIT_SECONDS", 15.0)
+ADMISSION_ROUTE_LIMITS = _env_list("DRUG_API_ADMISSION_ROUTE_LIMITS", "")
@@ -1,20 +1,108 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import (
-    generate,
-    lipinski,
-    binding,
-    admet,
-    agent,
-    agent_ai
-)
+from app.utils.startup import import_tracker
+from app import config
+from app.utils.admission import AdmissionMiddleware, admission
+from app.utils.agentai_client import agentai_client
+from app.utils.batching import binding_batcher
+from app.utils.compound_query import compound_table
+from app.utils.executor import rdkit_pool
+from app.utils.job_kinds import job_runner
+from app.utils.metrics import MetricsMiddleware
+from app.utils.model_registry import registry
+from app.utils.score_cache import score_cache
+from app.utils.similarity import similarity_index
+
+logger = logging.getLogger(__name__)
+
+# Mountable routers: module under app.routes -> (OpenAPI tag, endpoints listed at /)
+ROUTERS = {
+    "generate": ("Molecule Generation", {
+        "/generate": "Generate novel drug-like molecules",
+        "/generate/stream": "Stream seeded, reproducible molecule generation (NDJSON)",
+    }),
+    "lipinski": ("Drug-likeness", {
+        "/lipinski": "Check Lipinski's Rule of Five",
+        "/lipinski/batch": "Check Lipinski's Rule of Five for many SMILES (JSON list or file upload)",
+    }),
+    "binding": ("Binding Prediction", {
+        "/binding": "Predict drug-target binding",
+        "/binding/screen": "Screen many drugs against many targets (NDJSON stream)",
+    }),
+    "admet": ("ADMET Properties", {
+        "/admet": "Predict ADMET properties",
+        "/admet/batch": "Predict ADMET properties for many SMILES (JSON list or file upload)",
+    }),
+    "agent": ("Full Analysis", {
+        "/agent": "Perform complete drug analysis",
+    }),
+    "agent_ai": ("AI Analysis", {
+        "/agentai": "Get AI-powered analysis and recommendations",
+    }),
+    "similarity": ("Similarity Search", {
+        "/similarity": "Find similar compounds among generated and screened ones",
+    }),
+    "query": ("Compound Queries", {
+        "/query": "Filter stored compounds by SMARTS and Lipinski/ADMET properties",
+    }),
+    "jobs": ("Background Jobs", {
+        "/jobs": "Run large screens and generation campaigns in the background",
+    }),
+    "cache": ("Service Stats", {
+        "/cache/stats": "Cache hit rates and memory use",
+    }),
+    "metrics": ("Service Stats", {
+        "/metrics": "Request, stage latency and cache metrics in Prometheus format",
+    }),
+}
+
+# Routers that score binding, and so want models loaded before traffic
+MODEL_ROUTERS = {"binding", "agent", "jobs"}
+
+unknown = set(config.ROUTERS) - set(ROUTERS)
+if unknown:
+    raise ValueError(f"Unknown routers in DRUG_API_ROUTERS: {sorted(unknown)}; available: {list(ROUTERS)}")
+ENABLED_ROUTERS = [name for name in ROUTERS if not config.ROUTERS or name in config.ROUTERS]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start and warm up RDKit workers before taking traffic
+    await run_in_threadpool(rdkit_pool.start)
+    if MODEL_ROUTERS.intersection(ENABLED_ROUTERS):
+        # Load binding models once so requests never pay for model_pretrained();
+        # with DRUG_API_PRELOAD_MODELS empty they load on first use or /health/warmup
+        await run_in_threadpool(registry.preload, config.PRELOAD_MODELS)
+        # Persisted scores from replaced checkpoints can never be hit again
+        await run_in_threadpool(score_cache.purge_stale, registry.versions())
+    if "jobs" in ENABLED_ROUTERS:
+        # Background jobs run on their own thread and event loop
+        job_runner.start()
+    import_tracker.mark_ready()
+    logger.info("Ready in %.2fs with routers %s; imports: %s", import_tracker.ready_seconds,
+                ENABLED_ROUTERS, import_tracker.report()["import_seconds"])
+    yield
+    await run_in_threadpool(job_runner.stop)
+    await binding_batcher.close()
+    rdkit_pool.shutdown()
+    await agentai_client.aclose()
+    await run_in_threadpool(similarity_index.save)
+    await run_in_threadpool(compound_table.save)
 
 app = FastAPI(
     title="Drug Analysis API",
     description="Comprehensive API for drug analysis and prediction with AI insights",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Admission control sits inside the metrics middleware so rejections are counted
+if config.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware, controller=admission)
+app.add_middleware(MetricsMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -24,13 +112,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include all routers
-app.include_router(generate.router, tags=["Molecule Generation"])
-app.include_router(lipinski.router, tags=["Drug-likeness"])
-app.include_router(binding.router, tags=["Binding Prediction"])
-app.include_router(admet.router, tags=["ADMET Properties"])
-app.include_router(agent.router, tags=["Full Analysis"])
-app.include_router(agent_ai.router, tags=["AI Analysis"])
+# Routers are imported here, one at a time, so the startup report shows what each costs
+app.include_router(import_tracker.load("app.routes.health").router, tags=["Health"])
+for name in ENABLED_ROUTERS:
+    tag, _ = ROUTERS[name]
+    app.include_router(import_tracker.load(f"app.routes.{name}").router, tags=[tag])
 
 @app.get("/")
 async def root():
@@ -40,11 +126,7 @@ async def root():
         "version": "1.0.0",
         "description": "API for drug analysis and prediction with AI insights",
         "endpoints": {
-            "/generate": "Generate novel drug-like molecules",
-            "/lipinski": "Check Lipinski's Rule of Five",
-            "/binding": "Predict drug-target binding",
-            "/admet": "Predict ADMET properties",
-            "/agent": "Perform complete drug analysis",
-            "/agentai": "Get AI-powered analysis and recommendations"
+            "/health": "Liveness, readiness and warm-up of heavy dependencies",
+            **{path: description for name in ENABLED_ROUTERS for path, description in ROUTERS[name][1].items()}
         }
-    }
\ No newline at end of file
+    }
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, HTTPException
+from typing import List
+from fastapi import APIRouter, File, HTTPException, UploadFile
 from pydantic import BaseModel, validator
-from app.utils.molecule_utils import predict_admet
+from app import config
+from app.utils.molecule_utils import predict_admet_batch, read_smiles_file
+from app.utils.executor import rdkit_pool, TaskTimeoutError
+from app.utils.result_cache import get_results
+from app.utils.single_flight import single_flight
 
 router = APIRouter()
 
+# Identical concurrent requests share one computation
+admet_flight = single_flight("admet")
+
 class AdmetRequest(BaseModel):
     smiles: str
 
@@ -13,13 +21,68 @@ class AdmetRequest(BaseModel):
             raise ValueError('SMILES string cannot be empty')
         return v
 
+class AdmetBatchRequest(BaseModel):
+    smiles: List[str]
+
+    @validator('smiles')
+    def validate_smiles(cls, v):
+        if not v:
+            raise ValueError('SMILES list cannot be empty')
+        if len(v) > config.MAX_BATCH_SIZE:
+            raise ValueError(f'At most {config.MAX_BATCH_SIZE} SMILES per batch')
+        return v
+
 @router.post("/admet/")
 async def predict_admet_properties(request: AdmetRequest):
     """Predict ADMET properties of a molecule"""
     try:
-        result = predict_admet(request.smiles)
+        results = await admet_flight.do(request.smiles, lambda: get_results(("admet",), request.smiles))
+        result = results["admet"]
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
         return result
+    except HTTPException:
+        raise
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _admet_batch_response(smiles: List[str]):
+    # Chunks are spread over the RDKit worker processes
+    results = await rdkit_pool.map_chunks(predict_admet_batch, smiles)
+    invalid = sum(1 for result in results if "error" in result)
+    return {
+        "results": results,
+        "num_molecules": len(results),
+        "num_invalid": invalid,
+        "message": "ADMET properties predicted using RDKit descriptors; invalid SMILES are reported per entry"
+    }
+
+@router.post("/admet/batch")
+async def predict_admet_properties_batch(request: AdmetBatchRequest):
+    """Predict ADMET properties for a list of SMILES"""
+    try:
+        return await _admet_batch_response(request.smiles)
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/admet/batch/upload")
+async def predict_admet_properties_batch_upload(file: UploadFile = File(...)):
+    """Predict ADMET properties for an uploaded .smi or .csv file"""
+    try:
+        smiles = read_smiles_file(await file.read(), file.filename or "")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 text")
+    if not smiles:
+        raise HTTPException(status_code=400, detail="No SMILES found in file")
+    if len(smiles) > config.MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {config.MAX_BATCH_SIZE} SMILES per batch")
+    try:
+        return await _admet_batch_response(smiles)
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
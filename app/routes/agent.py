@@ -1,18 +1,27 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field, root_validator
-from typing import Optional
-from ..utils.molecule_utils import check_drug_likeness, predict_admet
-from DeepPurpose import DTI as models
-from DeepPurpose.utils import data_process_repurpose_virtual_screening
+from typing import Any, AsyncIterator, Dict, Optional
+from .agent_ai import ndjson_event, stream_ai_events
+from ..utils.executor import TaskTimeoutError
+from ..utils.result_cache import get_results
+from ..utils.batching import binding_batcher
+from ..utils.model_registry import registry, UnknownModelError
+from ..utils.pipeline import Pipeline, Stage
+from ..utils.single_flight import single_flight
 
 router = APIRouter()
 
+# Identical concurrent analyses share one run of the pipeline
+agent_flight = single_flight("agent")
+
 class AgentRequest(BaseModel):
     smiles: str = Field(None, description="SMILES string of the drug molecule")
     drug: Optional[str] = None
     target: str
     model_type: str = "CNN"
     question: Optional[str] = None
+    stream: bool = False  # Send each result as an NDJSON event as soon as it is computed
 
     @root_validator(pre=True)
     def check_smiles_or_drug(cls, values):
@@ -37,72 +46,135 @@ class AgentRequest(BaseModel):
             }
         }
 
+def build_pipeline(request: AgentRequest, include_ai: bool) -> Pipeline:
+    """
+    Full analysis as a dependency graph of stages.
+
+    Drug-likeness, ADMET (RDKit workers) and binding (batched inference
+    threads) run concurrently; the AI stage starts once all three are done.
+    """
+    drug_smiles = request.smiles
+
+    async def drug_likeness(inputs):
+        result = (await get_results(("lipinski",), drug_smiles))["lipinski"]
+        if "error" in result:
+            raise HTTPException(status_code=400, detail=result["error"])
+        return result
+
+    async def admet(inputs):
+        return (await get_results(("admet",), drug_smiles))["admet"]
+
+    async def binding(inputs):
+        return await binding_batcher.submit(drug_smiles, request.target, request.model_type)
+
+    async def ai_analysis(inputs):
+        try:
+            from .agent_ai import ask_agent_ai, AgentAIRequest
+
+            ai_request = AgentAIRequest(
+                instructions=request.question,
+                drug_data=drug_data(request, inputs),
+                llm_engine="gpt4o"
+            )
+
+            ai_response = await ask_agent_ai(ai_request)
+            if ai_response and "analysis" in ai_response:
+                return ai_response["analysis"]
+            return {"error": "No analysis received from AI service"}
+        except Exception as e:
+            return {"error": f"AI analysis failed: {str(e)}"}
+
+    stages = [
+        Stage("drug_likeness", drug_likeness),
+        Stage("admet", admet),
+        Stage("binding_score", binding),
+    ]
+    if include_ai:
+        stages.append(Stage("ai_analysis", ai_analysis, deps=("drug_likeness", "admet", "binding_score")))
+    return Pipeline(stages)
+
+def drug_data(request: AgentRequest, results: Dict[str, Any]) -> Dict[str, Any]:
+    """Analysis results in the shape AgentAI expects"""
+    return {
+        "drug_smiles": request.smiles,
+        "target_sequence": request.target,
+        "drug_likeness": results["drug_likeness"],
+        "binding_score": results["binding_score"],
+        "admet": results["admet"]
+    }
+
+async def stream_analysis(request: AgentRequest, pipeline: Pipeline) -> AsyncIterator[str]:
+    """
+    NDJSON events for a full analysis: one event per stage in the order the
+    stages finish, then the AI analysis, then stage timings.
+    """
+    results = {}
+    try:
+        async for name, result in pipeline.iter_completed():
+            results[name] = result
+            yield ndjson_event(name, result)
+    except Exception as e:
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        yield ndjson_event("error", {"stage": pipeline.failed_stage, "detail": detail})
+        return
+
+    if request.question:
+        async for line in stream_ai_events(request.question, drug_data(request, results), "gpt4o"):
+            yield line
+
+    yield ndjson_event("timings", pipeline.timings())
+    yield ndjson_event("done")
+
+async def run_analysis(request: AgentRequest) -> Dict[str, Any]:
+    """Full analysis response for a non-streamed request"""
+    pipeline = build_pipeline(request, include_ai=bool(request.question))
+    results = await pipeline.run()
+
+    # Prepare base response
+    response_data = {
+        "drug_smiles": request.smiles,
+        "target_sequence": request.target,
+        "drug_likeness": results["drug_likeness"],
+        "binding_score": results["binding_score"],
+        "admet": results["admet"],
+        "message": "Higher scores indicate stronger predicted binding"
+    }
+    if "ai_analysis" in results:
+        response_data["ai_analysis"] = results["ai_analysis"]
+    response_data["stage_timings_ms"] = pipeline.timings()
+
+    return response_data
+
 @router.post("/agent/")
 async def full_analysis(request: AgentRequest):
+    """
+    Run drug-likeness, binding and ADMET analysis, plus AI analysis when a
+    question is given. With `stream`, results are sent as NDJSON events as
+    soon as each one is ready.
+    """
     try:
-        # Use smiles from either source
-        drug_smiles = request.smiles
-        
-        # Step 1: Check drug-likeness
-        drug_likeness = check_drug_likeness(drug_smiles)
-        if "error" in drug_likeness:
-            raise HTTPException(status_code=400, detail=drug_likeness["error"])
-
-        # Step 2: Predict binding
-        model = models.model_pretrained(model='CNN_CNN_DAVIS')
-        processed_data = data_process_repurpose_virtual_screening(
-            drug_smiles,
-            request.target,
-            drug_encoding=model.drug_encoding,
-            target_encoding=model.target_encoding,
-            mode='repurposing'
-        )
-        predictions = model.predict(processed_data)
-        binding_score = float(predictions[0])
-
-        # Step 3: Get ADMET properties
-        admet_results = predict_admet(drug_smiles)
-
-        # Prepare base response
-        response_data = {
-            "drug_smiles": drug_smiles,
-            "target_sequence": request.target,
-            "drug_likeness": drug_likeness,
-            "binding_score": binding_score,
-            "admet": admet_results,
-            "message": "Higher scores indicate stronger predicted binding"
-        }
+        model_name = registry.resolve(request.model_type)
+
+        if request.stream:
+            # AI output is forwarded token by token after the pipeline instead
+            pipeline = build_pipeline(request, include_ai=False)
+            # Invalid SMILES must still be a 400, so wait for the first result
+            # before the 200 response starts; the other stages keep running
+            await pipeline.result("drug_likeness")
+            return StreamingResponse(
+                stream_analysis(request, pipeline),
+                media_type="application/x-ndjson"
+            )
 
-        # Step 4: If question is provided, get AI analysis
-        if request.question:
-            try:
-                from .agent_ai import ask_agent_ai, AgentAIRequest
-                
-                ai_request = AgentAIRequest(
-                    instructions=request.question,
-                    drug_data={
-                        "drug_smiles": drug_smiles,
-                        "target_sequence": request.target,
-                        "drug_likeness": drug_likeness,
-                        "binding_score": binding_score,
-                        "admet": admet_results
-                    },
-                    llm_engine="gpt4o"
-                )
-
-                ai_response = await ask_agent_ai(ai_request)
-                if ai_response and "analysis" in ai_response:
-                    response_data["ai_analysis"] = ai_response["analysis"]
-                else:
-                    response_data["ai_analysis"] = {
-                        "error": "No analysis received from AI service"
-                    }
-            except Exception as e:
-                response_data["ai_analysis"] = {
-                    "error": f"AI analysis failed: {str(e)}"
-                }
-
-        return response_data
+        # request.smiles holds the SMILES from either source
+        key = (request.smiles, request.target, model_name, request.question)
+        return await agent_flight.do(key, lambda: run_analysis(request))
 
+    except HTTPException:
+        raise
+    except UnknownModelError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,7 +1,10 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import requests
-from typing import Optional, Dict, Any
+import httpx
+import json
+from typing import AsyncIterator, Dict, Any
+from app.utils.agentai_client import agentai_client, AgentAIError
 
 router = APIRouter()
 
@@ -9,6 +12,7 @@ class AgentAIRequest(BaseModel):
     instructions: str  # Changed from query to instructions to match API
     drug_data: Dict[str, Any]
     llm_engine: str = "gpt4o"  # Default to GPT-4
+    stream: bool = False  # Send the analysis as NDJSON events
 
     class Config:
         schema_extra = {
@@ -35,64 +39,74 @@ class AgentAIRequest(BaseModel):
             }
         }
 
-@router.post("/agentai/")
-async def ask_agent_ai(request: AgentAIRequest):
+def ndjson_event(event: str, data: Any = None) -> str:
+    """One line of a streamed NDJSON response"""
+    return json.dumps({"event": event, "data": data}, default=str) + "\n"
+
+async def stream_ai_events(instructions: str, drug_data: Dict[str, Any], llm_engine: str) -> AsyncIterator[str]:
     """
-    Query the AgentAI with drug analysis data for insights and recommendations.
+    The AI analysis as one `ai_analysis` event.
+
+    AgentAI answers with a single JSON document rather than a token stream,
+    so there is nothing to forward before it is complete; the analysis goes
+    through the same retries, cache and coalescing as non-streamed requests.
+    Failures are reported as an `ai_error` event since the response status has
+    already been sent.
     """
     try:
-        # API configuration
-        API_KEY = "WqapEOrxL4wmfpCLC5BrR7auoBQWrekqKTLVy7ffCf785BOfpa6WsrpMvM0oGF5A"
-        API_URL = "https://api-lr.agent.ai/v1/action/invoke_llm"
-
-        headers = {
-            "Authorization": f"Bearer {API_KEY}",
-            "Content-Type": "application/json"
-        }
+        analysis = await agentai_client.analyze(instructions, drug_data, llm_engine)
+    except AgentAIError as e:
+        yield ndjson_event("ai_error", {"status_code": e.status_code, "detail": f"AgentAI API error: {e.detail}"})
+        return
+    except httpx.TimeoutException:
+        yield ndjson_event("ai_error", {"status_code": 504, "detail": "AgentAI request timed out"})
+        return
+    except Exception as e:
+        yield ndjson_event("ai_error", {"status_code": 500, "detail": f"Error connecting to AgentAI: {str(e)}"})
+        return
+    yield ndjson_event("ai_analysis", analysis)
 
-        # Construct the instruction with drug data context
-        full_instructions = f"""
-        Context: Analyzing drug with the following properties:
-        - Drug SMILES: {request.drug_data.get('drug_smiles')}
-        - Target Sequence: {request.drug_data.get('target_sequence')}
-        - Drug-likeness: {request.drug_data.get('drug_likeness')}
-        - Binding Score: {request.drug_data.get('binding_score')}
-        - ADMET Properties: {request.drug_data.get('admet')}
+@router.post("/agentai/")
+async def ask_agent_ai(request: AgentAIRequest):
+    """
+    Query the AgentAI with drug analysis data for insights and recommendations.
 
-        User Question: {request.instructions}
-        """
+    With `stream`, the response is NDJSON: an `ai_analysis` (or `ai_error`)
+    event once AgentAI has answered, then `done`.
+    """
+    if request.stream:
+        async def events():
+            async for line in stream_ai_events(request.instructions, request.drug_data, request.llm_engine):
+                yield line
+            yield ndjson_event("done")
 
-        payload = {
-            "instructions": full_instructions,
-            "llm_engine": request.llm_engine
-        }
+        return StreamingResponse(events(), media_type="application/x-ndjson")
 
-        response = requests.post(
-            API_URL, 
-            headers=headers, 
-            json=payload,
-            timeout=30
+    try:
+        analysis = await agentai_client.analyze(
+            request.instructions,
+            request.drug_data,
+            request.llm_engine
         )
 
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"AgentAI API error: {response.text}"
-            )
-
         return {
             "query": request.instructions,
             "context": request.drug_data,
-            "analysis": response.json(),
+            "analysis": analysis,
             "message": "AI analysis completed successfully"
         }
 
-    except requests.exceptions.Timeout:
+    except AgentAIError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=f"AgentAI API error: {e.detail}"
+        )
+    except httpx.TimeoutException:
         raise HTTPException(
             status_code=504,
             detail="AgentAI request timed out"
         )
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error connecting to AgentAI: {str(e)}"
@@ -101,4 +115,9 @@ async def ask_agent_ai(request: AgentAIRequest):
         raise HTTPException(
             status_code=500,
             detail=f"Internal server error: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+@router.get("/agentai/stats")
+async def agent_ai_stats():
+    """Upstream request, retry and cache counters of the AgentAI client"""
+    return agentai_client.stats()
@@ -1,10 +1,21 @@
+import json
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, validator
-from DeepPurpose import DTI as models
-from DeepPurpose.utils import data_process_repurpose_virtual_screening
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, validator
+from app.utils.batching import binding_batcher
+from app.utils.binding_utils import iter_screen
+from app.utils.encoding_cache import encoding_cache
+from app.utils.model_registry import registry, UnknownModelError
+from app.utils.similarity import schedule_index
+from app.utils.single_flight import single_flight
 
 router = APIRouter()
 
+# Identical concurrent requests share one score
+binding_flight = single_flight("binding")
+
 class BindingRequest(BaseModel):
     drug: str
     target: str
@@ -22,30 +33,108 @@ class BindingRequest(BaseModel):
             raise ValueError('Protein sequence cannot be empty')
         return v
 
+class ScreenRequest(BaseModel):
+    drugs: List[str]
+    targets: List[str]
+    model_type: str = "CNN"
+    top_k: Optional[int] = Field(None, ge=1, description="Only return the best k drugs per target")
+    batch_size: int = Field(1024, ge=1, le=16384, description="Pairs scored per model call")
+
+    @validator('drugs')
+    def validate_drugs(cls, v):
+        if not v or any(not smiles for smiles in v):
+            raise ValueError('Drug list must contain non-empty SMILES strings')
+        return v
+
+    @validator('targets')
+    def validate_targets(cls, v):
+        if not v or any(not sequence for sequence in v):
+            raise ValueError('Target list must contain non-empty protein sequences')
+        return v
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "drugs": ["CC(=O)OC1=CC=CC=C1C(=O)O", "CN1CCN(CC1)CC2=CC=C(C=C2)C(=O)N"],
+                "targets": ["MRGPGAGVLVVGVGVGVGVGVGVGV"],
+                "model_type": "CNN",
+                "top_k": 10
+            }
+        }
+
 @router.post("/binding/")
 async def predict_binding(request: BindingRequest):
     """Predict drug-target binding affinity"""
     try:
-        # Load pretrained model
-        model = models.model_pretrained(model='CNN_CNN_DAVIS')
-
-        # Process data
-        processed_data = data_process_repurpose_virtual_screening(
-            request.drug,
-            request.target,
-            drug_encoding=model.drug_encoding,
-            target_encoding=model.target_encoding,
-            mode='repurposing'
+        # Identical requests share one queue entry; different ones share a batched encode + predict
+        key = (request.drug, request.target, registry.resolve(request.model_type))
+        binding_score = await binding_flight.do(
+            key, lambda: binding_batcher.submit(request.drug, request.target, request.model_type)
         )
 
-        # Make prediction
-        predictions = model.predict(processed_data)
-        
         return {
             "drug_smiles": request.drug,
             "target_sequence": request.target,
-            "binding_score": float(predictions[0]),
+            "binding_score": binding_score,
             "message": "Higher scores indicate stronger predicted binding"
         }
+    except UnknownModelError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/binding/screen")
+async def screen_binding(request: ScreenRequest):
+    """
+    Score every drug against every target, streamed as NDJSON.
+
+    Each line is a result for one (drug, target) pair; the last line is a
+    summary. With top_k, each target's best drugs are sent once it is scored.
+    """
+    try:
+        model_name = registry.resolve(request.model_type)
+        # Load before streaming so a missing model is a clean error response
+        await run_in_threadpool(registry.get, model_name)
+    except UnknownModelError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # Screened libraries become searchable by similarity
+    schedule_index(request.drugs)
+
+    def ndjson_lines():
+        count = 0
+        try:
+            for result in iter_screen(model_name, request.drugs, request.targets,
+                                      top_k=request.top_k, batch_size=request.batch_size):
+                count += 1
+                yield json.dumps({"type": "result", **result}) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+            return
+        yield json.dumps({
+            "type": "summary",
+            "num_drugs": len(request.drugs),
+            "num_targets": len(request.targets),
+            "pairs_scored": len(request.drugs) * len(request.targets),
+            "results_returned": count,
+            "message": "Higher scores indicate stronger predicted binding"
+        }) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+@router.get("/binding/models")
+async def binding_models():
+    """List available binding models with load time and memory of the loaded ones"""
+    return registry.report()
+
+@router.get("/binding/queue")
+async def binding_queue():
+    """Micro-batching queue metrics: queue depth, batch sizes and wait times"""
+    return binding_batcher.stats()
+
+@router.get("/binding/encoding-cache")
+async def binding_encoding_cache():
+    """Hit/miss counters and memory use of the drug/target encoding cache"""
+    return encoding_cache.stats()
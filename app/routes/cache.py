@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from app.utils.descriptor_store import descriptor_store
+from app.utils.encoding_cache import encoding_cache
+from app.utils.result_cache import result_cache
+from app.utils.score_cache import score_cache
+from app.utils.single_flight import flights
+
+router = APIRouter()
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """Hit rates and memory use of the service's caches, and how many calls were coalesced"""
+    return {
+        "descriptor_results": result_cache.stats(),
+        "binding_encodings": encoding_cache.stats(),
+        "binding_scores": score_cache.stats(),
+        "descriptor_store": descriptor_store.stats(),
+        "coalescing": {name: flight.stats() for name, flight in flights.items()}
+    }
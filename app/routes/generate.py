@@ -1,19 +1,72 @@
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from rdkit import Chem
 from typing import Optional
+import json
+import random
+from app import config
+from app.utils.executor import rdkit_pool, TaskTimeoutError
+from app.utils.generation import stream_generated
 from app.utils.molecule_utils import generate_molecule
+from app.utils.similarity import schedule_index
 
 router = APIRouter()
 
 @router.get("/generate/")
 async def generate_drug_molecule(
-    num_samples: int = Query(1, ge=1, le=10, description="Number of molecules to generate"),
-    seed_smiles: Optional[str] = Query(None, description="Optional SMILES string to use as a template")
+    num_samples: int = Query(1, ge=1, le=config.GENERATE_MAX_SAMPLES, description="Number of molecules to generate"),
+    seed_smiles: Optional[str] = Query(None, description="Optional SMILES string to use as a template"),
+    seed: Optional[int] = Query(None, description="Random seed for reproducible output")
 ):
     """Generate novel drug-like molecules"""
     try:
-        result = generate_molecule(num_samples=num_samples, seed_smiles=seed_smiles)
+        rng = random.Random(seed) if seed is not None else None
+        result = await rdkit_pool.run(generate_molecule, num_samples, seed_smiles, rng)
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
+        schedule_index(result["generated_molecules"])
         return result
+    except HTTPException:
+        raise
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/generate/stream")
+async def stream_drug_molecules(
+    num_samples: int = Query(1000, ge=1, le=config.GENERATE_STREAM_MAX_SAMPLES, description="Number of molecules to generate"),
+    seed: Optional[int] = Query(None, ge=0, description="Random seed; the same seed always gives the same molecules"),
+    seed_smiles: Optional[str] = Query(None, description="Optional SMILES string to use as a template"),
+    chunk_size: int = Query(256, ge=1, le=10000, description="Molecules per parallel work unit; part of the reproducibility key"),
+    index: bool = Query(False, description="Add the generated molecules to the in-memory similarity index")
+):
+    """
+    Generate molecules as an NDJSON stream while they pass the filter.
+
+    Sampling is split across worker processes with independent RNG streams.
+    The summary line reports the seed, so unseeded runs can be replayed.
+    Streamed molecules are only added to the similarity index when `index`
+    is set, since a large campaign would otherwise grow it without bound.
+    """
+    if seed_smiles and Chem.MolFromSmiles(seed_smiles) is None:
+        raise HTTPException(status_code=400, detail="Invalid seed SMILES string")
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 63)
+
+    async def ndjson_lines():
+        batch = []
+        try:
+            async for entry in stream_generated(num_samples, seed, seed_smiles, chunk_size):
+                if index and entry["type"] == "molecule":
+                    batch.append(entry["smiles"])
+                    if len(batch) >= chunk_size:
+                        schedule_index(batch)
+                        batch = []
+                yield json.dumps(entry) + "\n"
+            if batch:
+                schedule_index(batch)
+        except Exception as e:
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
@@ -0,0 +1,77 @@
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from app import config
+from app.utils.binding_utils import load_encoders
+from app.utils.executor import rdkit_pool
+from app.utils.job_kinds import job_runner
+from app.utils.model_registry import registry, UnknownModelError
+from app.utils.startup import import_tracker
+
+router = APIRouter()
+
+class WarmupRequest(BaseModel):
+    # model_type values to load; defaults to DRUG_API_PRELOAD_MODELS
+    models: Optional[List[str]] = None
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "models": ["CNN"]
+            }
+        }
+
+def subsystems():
+    """Which heavy dependencies and background components are loaded in this process"""
+    loaded = import_tracker.subsystems()
+    loaded.update({
+        "rdkit_pool": rdkit_pool.started,
+        "jobs": job_runner.started,
+        "binding_models": registry.versions(),
+    })
+    return loaded
+
+@router.get("/health/live")
+async def live():
+    """Liveness: the process is serving requests"""
+    return {"status": "alive"}
+
+@router.get("/health/ready")
+async def ready():
+    """Readiness: startup has finished; reports loaded subsystems and import times"""
+    body = {
+        "status": "ready" if import_tracker.ready else "starting",
+        "subsystems": subsystems(),
+        "startup": import_tracker.report(),
+    }
+    return JSONResponse(body, status_code=200 if import_tracker.ready else 503)
+
+@router.post("/health/warmup")
+async def warm_up(request: Optional[WarmupRequest] = None):
+    """
+    Import DeepPurpose/torch here and in the RDKit workers and load binding
+    models, so the first binding request doesn't pay for them.
+    """
+    model_types = config.PRELOAD_MODELS if request is None or request.models is None else request.models
+    try:
+        names = [registry.resolve(model_type) for model_type in model_types]
+    except UnknownModelError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        await run_in_threadpool(load_encoders)
+        # Drug encodings are computed in the workers, which import separately
+        workers = await run_in_threadpool(rdkit_pool.warm_up, load_encoders)
+        for name in names:
+            await run_in_threadpool(registry.get, name)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Warm-up failed: {e}")
+
+    return {
+        "models": [registry.version(name) for name in names],
+        "workers_warmed": workers,
+        "subsystems": subsystems(),
+        "startup": import_tracker.report(),
+    }
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import random
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from rdkit import Chem
+from app import config
+from app.routes.binding import ScreenRequest
+from app.utils.job_kinds import job_runner
+from app.utils.jobs import FINISHED_STATES
+from app.utils.model_registry import registry, UnknownModelError
+
+router = APIRouter()
+
+class ScreenJobRequest(ScreenRequest):
+    priority: int = Field(0, ge=-10, le=10, description="Higher priority jobs start first")
+
+class GenerateJobRequest(BaseModel):
+    num_samples: int = Field(10000, ge=1, le=config.GENERATE_STREAM_MAX_SAMPLES)
+    seed: Optional[int] = Field(None, ge=0, description="Random seed; the same seed always gives the same molecules")
+    seed_smiles: Optional[str] = None
+    chunk_size: int = Field(256, ge=1, le=10000)
+    index: bool = Field(False, description="Add the generated molecules to the in-memory similarity index")
+    priority: int = Field(0, ge=-10, le=10, description="Higher priority jobs start first")
+
+def _get_job(job_id: str):
+    job = job_runner.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+    return job
+
+@router.post("/jobs/screen", status_code=202)
+async def submit_screen_job(request: ScreenJobRequest):
+    """Queue a drug x target screen; poll /jobs/{job_id} and fetch /jobs/{job_id}/results"""
+    try:
+        model_name = registry.resolve(request.model_type)
+    except UnknownModelError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    pairs = len(request.drugs) * len(request.targets)
+    if pairs > config.JOB_MAX_PAIRS:
+        raise HTTPException(status_code=400, detail=f"At most {config.JOB_MAX_PAIRS} drug-target pairs per job")
+    params = {
+        "model_name": model_name,
+        "drugs": request.drugs,
+        "targets": request.targets,
+        "top_k": request.top_k,
+        "batch_size": request.batch_size,
+    }
+    total = len(request.targets) * min(request.top_k, len(request.drugs)) if request.top_k else pairs
+    return await run_in_threadpool(job_runner.submit, "screen", params, request.priority, total)
+
+@router.post("/jobs/generate", status_code=202)
+async def submit_generate_job(request: GenerateJobRequest):
+    """Queue a seeded generation campaign"""
+    if request.seed_smiles and Chem.MolFromSmiles(request.seed_smiles) is None:
+        raise HTTPException(status_code=400, detail="Invalid seed SMILES string")
+    params = {
+        "num_samples": request.num_samples,
+        "seed": request.seed if request.seed is not None else random.SystemRandom().randrange(2 ** 63),
+        "seed_smiles": request.seed_smiles,
+        "chunk_size": request.chunk_size,
+        "index": request.index,
+    }
+    return await run_in_threadpool(job_runner.submit, "generate", params, request.priority, request.num_samples)
+
+@router.get("/jobs/")
+async def list_jobs(
+    status: Optional[str] = Query(None, description="Only jobs in this state"),
+    limit: int = Query(50, ge=1, le=1000)
+):
+    """Most recent jobs first, without their parameters"""
+    jobs = await run_in_threadpool(job_runner.store.list, limit, status)
+    for job in jobs:
+        del job["params"]
+    return {"jobs": jobs, "runner": job_runner.stats()}
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status and progress of a job (progress counts result rows written)"""
+    job = await run_in_threadpool(_get_job, job_id)
+    del job["params"]
+    return job
+
+@router.get("/jobs/{job_id}/results")
+async def get_job_results(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=10000)
+):
+    """One page of a job's results; available while the job is still running"""
+    job = await run_in_threadpool(_get_job, job_id)
+    results = await run_in_threadpool(job_runner.store.results, job_id, offset, limit)
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "offset": offset,
+        "results": results,
+        "next_offset": offset + len(results) if results else None
+    }
+
+@router.get("/jobs/{job_id}/results/stream")
+async def stream_job_results(job_id: str, offset: int = Query(0, ge=0)):
+    """All results from `offset` as NDJSON, following the job until it finishes"""
+    await run_in_threadpool(_get_job, job_id)
+
+    async def ndjson_lines():
+        position = offset
+        while True:
+            job = await run_in_threadpool(job_runner.store.get, job_id)
+            rows = await run_in_threadpool(job_runner.store.results, job_id, position, 1000)
+            for row in rows:
+                yield json.dumps({"type": "result", **row}) + "\n"
+            position += len(rows)
+            if not rows:
+                if job["status"] in FINISHED_STATES:
+                    break
+                await asyncio.sleep(0.5)
+        yield json.dumps({"type": "status", "status": job["status"], "summary": job["summary"],
+                          "error": job["error"], "num_results": position}) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job; results written so far are kept"""
+    await run_in_threadpool(_get_job, job_id)
+    job = await run_in_threadpool(job_runner.cancel, job_id)
+    del job["params"]
+    return job
@@ -1,6 +1,10 @@
-from fastapi import APIRouter, HTTPException
+from typing import List
+from fastapi import APIRouter, File, HTTPException, UploadFile
 from pydantic import BaseModel, validator
-from app.utils.molecule_utils import check_drug_likeness
+from app import config
+from app.utils.molecule_utils import check_drug_likeness_batch, read_smiles_file
+from app.utils.executor import rdkit_pool, TaskTimeoutError
+from app.utils.result_cache import get_results
 
 router = APIRouter()
 
@@ -13,13 +17,69 @@ class LipinskiRequest(BaseModel):
             raise ValueError('SMILES string cannot be empty')
         return v
 
+class LipinskiBatchRequest(BaseModel):
+    smiles: List[str]
+
+    @validator('smiles')
+    def validate_smiles(cls, v):
+        if not v:
+            raise ValueError('SMILES list cannot be empty')
+        if len(v) > config.MAX_BATCH_SIZE:
+            raise ValueError(f'At most {config.MAX_BATCH_SIZE} SMILES per batch')
+        return v
+
 @router.post("/lipinski/")
 async def check_lipinski_rules(request: LipinskiRequest):
     """Check if a molecule follows Lipinski's Rule of Five"""
     try:
-        result = check_drug_likeness(request.smiles)
+        result = (await get_results(("lipinski",), request.smiles))["lipinski"]
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
         return result
+    except HTTPException:
+        raise
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _lipinski_batch_response(smiles: List[str]):
+    # Chunks are spread over the RDKit worker processes
+    results = await rdkit_pool.map_chunks(check_drug_likeness_batch, smiles)
+    passed = sum(1 for result in results if result.get("drug_likeness") == "Pass")
+    invalid = sum(1 for result in results if "error" in result)
+    return {
+        "results": results,
+        "num_molecules": len(results),
+        "num_passed": passed,
+        "num_invalid": invalid,
+        "message": "Lipinski's Rule of Five evaluated per molecule; invalid SMILES are reported per entry"
+    }
+
+@router.post("/lipinski/batch")
+async def check_lipinski_batch(request: LipinskiBatchRequest):
+    """Check Lipinski's Rule of Five for a list of SMILES"""
+    try:
+        return await _lipinski_batch_response(request.smiles)
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/lipinski/batch/upload")
+async def check_lipinski_batch_upload(file: UploadFile = File(...)):
+    """Check Lipinski's Rule of Five for an uploaded .smi or .csv file"""
+    try:
+        smiles = read_smiles_file(await file.read(), file.filename or "")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 text")
+    if not smiles:
+        raise HTTPException(status_code=400, detail="No SMILES found in file")
+    if len(smiles) > config.MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {config.MAX_BATCH_SIZE} SMILES per batch")
+    try:
+        return await _lipinski_batch_response(smiles)
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
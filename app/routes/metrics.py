@@ -0,0 +1,68 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.utils.admission import admission
+from app.utils.agentai_client import agentai_client
+from app.utils.batching import binding_batcher
+from app.utils.compound_query import compound_table
+from app.utils.descriptor_store import descriptor_store
+from app.utils.encoding_cache import encoding_cache
+from app.utils.job_kinds import job_runner
+from app.utils.metrics import metrics
+from app.utils.result_cache import result_cache
+from app.utils.score_cache import score_cache
+from app.utils.similarity import similarity_index
+
+router = APIRouter()
+
+# Caches exported as drug_api_cache_* families, labelled by cache name
+CACHES = {
+    "descriptor_results": result_cache,
+    "binding_encodings": encoding_cache,
+    "binding_scores": score_cache,
+    "descriptor_store": descriptor_store,
+    "agentai": agentai_client,
+}
+
+def collect_caches():
+    stats = {name: cache.stats() for name, cache in CACHES.items()}
+    families = []
+    for family, kind, documentation, keys in (
+        ("drug_api_cache_hits_total", "counter", "Cache lookups answered from memory or disk",
+         ("hits", "canonical_hits", "disk_hits", "cache_hits")),
+        ("drug_api_cache_misses_total", "counter", "Cache lookups that had to compute", ("misses", "cache_misses")),
+        ("drug_api_cache_entries", "gauge", "Entries held in memory", ("entries", "cache_entries")),
+    ):
+        samples = []
+        for name, values in stats.items():
+            present = [values[key] for key in keys if isinstance(values.get(key), (int, float))]
+            if present:
+                samples.append(({"cache": name}, sum(present)))
+        families.append((family, kind, documentation, samples))
+    return families
+
+def collect_queues():
+    batcher = binding_batcher.stats()
+    jobs = job_runner.stats()
+    limiters = admission.stats()
+    return [
+        ("drug_api_admission_active", "gauge", "Requests holding an admission slot",
+         [({"limiter": name}, stats["active"]) for name, stats in limiters.items()]),
+        ("drug_api_admission_queued", "gauge", "Requests waiting for an admission slot",
+         [({"limiter": name}, stats["queued"]) for name, stats in limiters.items()]),
+        ("drug_api_binding_queue_depth", "gauge", "Binding requests waiting for a batch",
+         [({}, batcher["queue_depth"])]),
+        ("drug_api_binding_batches_total", "counter", "Batched binding model calls",
+         [({}, batcher["batches"])]),
+        ("drug_api_jobs", "gauge", "Background jobs by state",
+         [({"state": "running"}, jobs["running"]), ({"state": "queued"}, jobs["queued"])]),
+        ("drug_api_index_compounds", "gauge", "Compounds in the search indexes",
+         [({"index": "similarity"}, len(similarity_index)), ({"index": "compound_table"}, len(compound_table))]),
+    ]
+
+metrics.register_collector(collect_caches)
+metrics.register_collector(collect_queues)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Request, stage latency, cache and queue metrics in Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,93 @@
+import time
+from typing import Dict, List, Optional
+from fastapi import APIRouter, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, validator
+from app import config
+from app.utils.compound_query import compound_table, describe_compounds
+from app.utils.executor import rdkit_pool, TaskTimeoutError
+from app.utils.molecule_utils import read_smiles_file
+
+router = APIRouter()
+
+class CompoundQueryRequest(BaseModel):
+    smarts: List[str] = Field(default_factory=list, description="SMARTS patterns that must all match")
+    exclude_smarts: List[str] = Field(default_factory=list, description="SMARTS patterns that must not match")
+    filters: Dict[str, Dict[str, float]] = Field(
+        default_factory=dict,
+        description='Descriptor filters, e.g. {"tpsa": {"lt": 90}, "mol_weight": {"le": 450}}'
+    )
+    labels: Dict[str, str] = Field(
+        default_factory=dict,
+        description='Lipinski/ADMET labels, e.g. {"blood_brain_barrier": "High", "drug_likeness": "Pass"}'
+    )
+    limit: Optional[int] = Field(100, ge=1, le=100000, description="Maximum number of hits")
+
+class CompoundInsertRequest(BaseModel):
+    smiles: List[str]
+
+    @validator('smiles')
+    def validate_smiles(cls, v):
+        if not v:
+            raise ValueError('SMILES list cannot be empty')
+        if len(v) > config.MAX_BATCH_SIZE:
+            raise ValueError(f'At most {config.MAX_BATCH_SIZE} SMILES per batch')
+        return v
+
+async def _insert_compounds(smiles: List[str]):
+    # Descriptors and fingerprints are computed in the RDKit worker processes
+    chunk_size = 1024
+    added = 0
+    for start in range(0, len(smiles), chunk_size):
+        rows = await rdkit_pool.run(describe_compounds, smiles[start:start + chunk_size])
+        added += compound_table.add_rows(*rows)
+    return {"submitted": len(smiles), "added": added, "table_size": len(compound_table)}
+
+@router.post("/query/")
+async def query_compounds(request: CompoundQueryRequest):
+    """Filter stored compounds by substructure and Lipinski/ADMET properties"""
+    try:
+        start = time.perf_counter()
+        result = await run_in_threadpool(
+            compound_table.query, request.smarts, request.exclude_smarts,
+            request.filters, request.labels, request.limit
+        )
+        result["stats"]["query_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/query/compounds")
+async def add_compounds(request: CompoundInsertRequest):
+    """Add compounds to the query table; invalid SMILES and duplicates are skipped"""
+    try:
+        return await _insert_compounds(request.smiles)
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/query/compounds/upload")
+async def add_compounds_upload(file: UploadFile = File(...)):
+    """Add compounds from an uploaded .smi or .csv file to the query table"""
+    try:
+        smiles = read_smiles_file(await file.read(), file.filename or "")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="File must be UTF-8 text")
+    if not smiles:
+        raise HTTPException(status_code=400, detail="No SMILES found in file")
+    if len(smiles) > config.MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {config.MAX_BATCH_SIZE} SMILES per batch")
+    try:
+        return await _insert_compounds(smiles)
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/query/stats")
+async def query_stats():
+    """Size of the compound table and the descriptors and labels queries can use"""
+    return compound_table.stats()
@@ -0,0 +1,66 @@
+import time
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, validator
+from app import config
+from app.utils.executor import TaskTimeoutError
+from app.utils.similarity import similarity_index, index_compounds
+
+router = APIRouter()
+
+class SimilarityRequest(BaseModel):
+    smiles: str
+    threshold: float = Field(0.7, ge=0.0, le=1.0, description="Minimum Tanimoto similarity")
+    top_k: Optional[int] = Field(10, ge=1, le=10000, description="Maximum number of hits")
+
+    @validator('smiles')
+    def validate_smiles(cls, v):
+        if not v or len(v) < 1:
+            raise ValueError('SMILES string cannot be empty')
+        return v
+
+class SimilarityAddRequest(BaseModel):
+    smiles: List[str]
+
+    @validator('smiles')
+    def validate_smiles(cls, v):
+        if not v:
+            raise ValueError('SMILES list cannot be empty')
+        if len(v) > config.MAX_BATCH_SIZE:
+            raise ValueError(f'At most {config.MAX_BATCH_SIZE} SMILES per batch')
+        return v
+
+@router.post("/similarity/")
+async def search_similar(request: SimilarityRequest):
+    """Find indexed compounds similar to a molecule (Morgan fingerprint Tanimoto)"""
+    try:
+        start = time.perf_counter()
+        hits = await run_in_threadpool(similarity_index.search, request.smiles, request.threshold, request.top_k)
+        return {
+            "query": request.smiles,
+            "results": hits,
+            "num_results": len(hits),
+            "index_size": len(similarity_index),
+            "search_ms": round((time.perf_counter() - start) * 1000, 3)
+        }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/similarity/add")
+async def add_to_index(request: SimilarityAddRequest):
+    """Add compounds to the similarity index; invalid SMILES and duplicates are skipped"""
+    try:
+        added = await index_compounds(request.smiles)
+        return {"added": added, "index_size": len(similarity_index)}
+    except TaskTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/similarity/stats")
+async def similarity_stats():
+    """Size and storage of the similarity index"""
+    return similarity_index.stats()
@@ -0,0 +1,270 @@
+"""
+Admission control: per-class and per-route concurrency limits with bounded,
+deadline-bound wait queues.
+
+Every HTTP request is mapped by path to one limiter. That is its route's own
+limiter if one is configured, otherwise the limiter of its priority class:
+
+- interactive: single-molecule endpoints, given many slots and a short queue
+  deadline so they stay fast
+- batch: batch, upload, generation and screening endpoints
+- ai: routes that call AgentAI
+
+Because the classes have separate limiters, a burst of /generate/ or /agent/
+calls cannot hold the slots /lipinski/ needs. A request that finds its queue
+full is rejected at once with 429. One that waits past the queue deadline is
+rejected with 503. Both responses carry Retry-After, estimated from recent
+service times.
+"""
+import asyncio
+import json
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from app import config
+from app.utils.metrics import ROUTE_LABEL, metrics
+
+ADMISSION_REJECTED = metrics.counter(
+    "drug_api_admission_rejected", "Requests rejected by admission control", ("limiter", "reason")
+)
+ADMISSION_WAIT_SECONDS = metrics.histogram(
+    "drug_api_admission_wait_seconds", "Time admitted requests spent queued", ("limiter",)
+)
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+AI = "ai"
+
+# Path prefixes and their class, first match wins; None bypasses admission control
+ROUTE_CLASSES: Tuple[Tuple[str, Optional[str]], ...] = (
+    ("/health", None),
+    ("/metrics", None),
+    ("/cache", None),
+    ("/docs", None),
+    ("/openapi.json", None),
+    # Stats and introspection stay reachable while the work classes are saturated
+    ("/agentai/stats", None),
+    ("/binding/queue", None),
+    ("/binding/encoding-cache", None),
+    ("/binding/models", None),
+    ("/similarity/stats", None),
+    ("/query/stats", None),
+    # Jobs only enqueue or read; the job runner bounds the work itself
+    ("/jobs", None),
+    ("/lipinski/batch", BATCH),
+    ("/admet/batch", BATCH),
+    ("/generate", BATCH),
+    ("/binding/screen", BATCH),
+    ("/query/compounds", BATCH),
+    ("/similarity/add", BATCH),
+    ("/agentai/", AI),
+    ("/agent/", AI),
+)
+
+
+class Rejected(Exception):
+    """A request admission control turned away"""
+
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Limiter:
+    """
+    At most `limit` requests at once, at most `max_queue` more waiting, each
+    for at most `max_wait` seconds. Waiters are admitted in arrival order.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue: int, max_wait: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Moving average of how long admitted requests hold a slot
+        self._service_seconds = 0.0
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_deadline = 0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely free for a new request"""
+        backlog = (self.queued + 1) / max(self.limit, 1)
+        return max(1, math.ceil(backlog * self._service_seconds))
+
+    async def acquire(self) -> None:
+        """
+        Take a slot, waiting in the queue if needed.
+
+        Raises:
+            Rejected: 429 if the queue is full, 503 if no slot freed up in time
+        """
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_full += 1
+            raise Rejected(429, "queue_full", self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected_deadline += 1
+            raise Rejected(503, "deadline", self.retry_after())
+        self.admitted += 1
+
+    def release(self, service_seconds: Optional[float] = None) -> None:
+        """Free a slot, handing it straight to the longest-waiting request"""
+        if service_seconds is not None:
+            self._service_seconds += 0.2 * (service_seconds - self._service_seconds)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # The slot moves to the waiter; active stays the same
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait,
+            "active": self.active,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_full,
+            "rejected_deadline": self.rejected_deadline,
+            "avg_service_seconds": round(self._service_seconds, 4),
+        }
+
+
+class AdmissionController:
+    """Maps request paths onto class and per-route limiters"""
+
+    def __init__(self, classes: Dict[str, Tuple[int, int, float]],
+                 route_limits: Optional[Dict[str, int]] = None,
+                 route_classes: Sequence[Tuple[str, Optional[str]]] = ROUTE_CLASSES):
+        self.route_classes = tuple(route_classes)
+        self.limiters: Dict[str, Limiter] = {
+            name: Limiter(name, *settings) for name, settings in classes.items()
+        }
+        # Route limiters inherit queue size and deadline from the route's class;
+        # longest prefix first so the most specific one matches
+        self._routes: List[Tuple[str, Limiter]] = []
+        for prefix, limit in sorted((route_limits or {}).items(), key=lambda item: -len(item[0])):
+            class_name = self.class_of(prefix)
+            if class_name is None:
+                continue
+            parent = self.limiters[class_name]
+            limiter = Limiter(prefix, limit, parent.max_queue, parent.max_wait)
+            self.limiters[prefix] = limiter
+            self._routes.append((prefix, limiter))
+
+    def class_of(self, path: str) -> Optional[str]:
+        for prefix, class_name in self.route_classes:
+            if path.startswith(prefix):
+                return class_name
+        return INTERACTIVE
+
+    def limiter_for(self, path: str) -> Optional[Limiter]:
+        """The limiter a request to `path` must pass, or None if it is exempt"""
+        class_name = self.class_of(path)
+        if class_name is None or path == "/":
+            return None
+        for prefix, limiter in self._routes:
+            if path.startswith(prefix):
+                return limiter
+        return self.limiters[class_name]
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: limiter.stats() for name, limiter in self.limiters.items()}
+
+
+def parse_route_limits(entries: List[str]) -> Dict[str, int]:
+    """Route limits from "path=limit" entries, e.g. ["/generate/=2", "/agent/=4"]"""
+    limits = {}
+    for entry in entries:
+        path, sep, limit = entry.partition("=")
+        if not sep or not path.startswith("/"):
+            raise ValueError(f"Route limit '{entry}' must look like /path/=limit")
+        limits[path.strip()] = int(limit)
+    return limits
+
+
+class AdmissionMiddleware:
+    """ASGI middleware holding a limiter slot for the whole response, streamed bodies included"""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        limiter = self.controller.limiter_for(scope["path"]) if scope["type"] == "http" else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        queued_at = time.perf_counter()
+        try:
+            await limiter.acquire()
+        except Rejected as e:
+            ADMISSION_REJECTED.inc(limiter.name, e.reason)
+            # The request never reaches routing; MetricsMiddleware labels it by limiter instead
+            scope[ROUTE_LABEL] = f"admission:{limiter.name}"
+            await _reject(send, e)
+            return
+        started = time.perf_counter()
+        ADMISSION_WAIT_SECONDS.observe(started - queued_at, limiter.name)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - started)
+
+
+async def _reject(send, rejection: Rejected) -> None:
+    detail = ("Too many requests queued for this endpoint" if rejection.status_code == 429
+              else "Server busy; request could not be started in time")
+    body = json.dumps({"detail": detail, "retry_after": rejection.retry_after}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": rejection.status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(rejection.retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+admission = AdmissionController(
+    {
+        INTERACTIVE: (config.ADMISSION_INTERACTIVE_LIMIT, config.ADMISSION_INTERACTIVE_QUEUE,
+                      config.ADMISSION_INTERACTIVE_WAIT_SECONDS),
+        BATCH: (config.ADMISSION_BATCH_LIMIT, config.ADMISSION_BATCH_QUEUE, config.ADMISSION_BATCH_WAIT_SECONDS),
+        AI: (config.ADMISSION_AI_LIMIT, config.ADMISSION_AI_QUEUE, config.ADMISSION_AI_WAIT_SECONDS),
+    },
+    parse_route_limits(config.ADMISSION_ROUTE_LIMITS)
+)
@@ -0,0 +1,197 @@
+import asyncio
+import hashlib
+import json
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app import config
+from app.utils.metrics import UPSTREAM_ERRORS, UPSTREAM_IN_FLIGHT, stage_timer
+from app.utils.single_flight import single_flight
+
+# Upstream statuses worth retrying; anything else is returned to the caller
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class AgentAIError(Exception):
+    """Non-success response from the AgentAI API"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def build_instructions(instructions: str, drug_data: Dict[str, Any]) -> str:
+    """Construct the instruction with drug data context"""
+    return f"""
+        Context: Analyzing drug with the following properties:
+        - Drug SMILES: {drug_data.get('drug_smiles')}
+        - Target Sequence: {drug_data.get('target_sequence')}
+        - Drug-likeness: {drug_data.get('drug_likeness')}
+        - Binding Score: {drug_data.get('binding_score')}
+        - ADMET Properties: {drug_data.get('admet')}
+
+        User Question: {instructions}
+        """
+
+
+class AgentAIClient:
+    """
+    Async client for the AgentAI LLM endpoint.
+
+    One pooled keep-alive connection set is shared by all requests, at most
+    `max_concurrency` calls are in flight, transient failures (connection
+    errors, timeouts, 429 and 5xx) are retried with exponential backoff and
+    jitter, and successful analyses are cached by (instructions, drug_data,
+    llm_engine) for `cache_ttl` seconds. Identical analyses requested while
+    one is in flight wait for it rather than calling AgentAI again.
+    """
+
+    def __init__(self, url: str = config.AGENTAI_API_URL, api_key: str = config.AGENTAI_API_KEY,
+                 timeout: float = config.AGENTAI_TIMEOUT_SECONDS,
+                 max_connections: int = config.AGENTAI_MAX_CONNECTIONS,
+                 max_concurrency: int = config.AGENTAI_MAX_CONCURRENCY,
+                 retries: int = config.AGENTAI_RETRIES,
+                 backoff: float = config.AGENTAI_BACKOFF_SECONDS,
+                 cache_ttl: float = config.AGENTAI_CACHE_TTL_SECONDS,
+                 cache_max_entries: int = config.AGENTAI_CACHE_MAX_ENTRIES):
+        self.url = url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.retries = retries
+        self.backoff = backoff
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = cache_max_entries
+        self._transport: Optional[httpx.AsyncBaseTransport] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._flight = single_flight("agentai")
+        self.requests = 0
+        self.retried = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    async def configure(self, url: Optional[str] = None, api_key: Optional[str] = None,
+                        transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        """Point the client somewhere else, e.g. a local stub server for load tests"""
+        if url is not None:
+            self.url = url
+        if api_key is not None:
+            self.api_key = api_key
+        if transport is not None:
+            self._transport = transport
+        # The old connection pool is closed; a new one is built on next use
+        await self.aclose()
+        self._cache.clear()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                transport=self._transport
+            )
+        return self._client
+
+    @staticmethod
+    def cache_key(instructions: str, drug_data: Dict[str, Any], llm_engine: str) -> str:
+        payload = json.dumps([instructions, drug_data, llm_engine], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[Any]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, analysis = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return analysis
+
+    def _cache_put(self, key: str, analysis: Any) -> None:
+        if self.cache_ttl <= 0:
+            return
+        self._cache[key] = (time.monotonic() + self.cache_ttl, analysis)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_max_entries:
+            self._cache.popitem(last=False)
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+    async def _backoff(self, attempt: int) -> None:
+        self.retried += 1
+        delay = self.backoff * (2 ** attempt)
+        await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+    async def invoke(self, instructions: str, llm_engine: str) -> Any:
+        """POST a prompt to AgentAI and return the decoded JSON response"""
+        payload = {"instructions": instructions, "llm_engine": llm_engine}
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                self.requests += 1
+                try:
+                    with UPSTREAM_IN_FLIGHT.track("agentai"), stage_timer("agentai_request"):
+                        response = await self._get_client().post(self.url, headers=self._headers(), json=payload)
+                except httpx.TransportError as e:
+                    UPSTREAM_ERRORS.inc("agentai", type(e).__name__)
+                    if attempt == self.retries:
+                        raise
+                    await self._backoff(attempt)
+                    continue
+
+                if response.status_code == 200:
+                    return response.json()
+                UPSTREAM_ERRORS.inc("agentai", str(response.status_code))
+                if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                    await self._backoff(attempt)
+                    continue
+                raise AgentAIError(response.status_code, response.text)
+
+    async def analyze(self, instructions: str, drug_data: Dict[str, Any], llm_engine: str) -> Any:
+        """AI analysis of drug data, answered from the cache when the same question was asked"""
+        key = self.cache_key(instructions, drug_data, llm_engine)
+        analysis = self._cache_get(key)
+        if analysis is not None:
+            self.cache_hits += 1
+            return analysis
+        self.cache_misses += 1
+        return await self._flight.do(key, lambda: self._analyze(key, instructions, drug_data, llm_engine))
+
+    async def _analyze(self, key: str, instructions: str, drug_data: Dict[str, Any], llm_engine: str) -> Any:
+        analysis = await self.invoke(build_instructions(instructions, drug_data), llm_engine)
+        self._cache_put(key, analysis)
+        return analysis
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "url": self.url,
+            "upstream_requests": self.requests,
+            "retries": self.retried,
+            "cache_entries": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": round(self.cache_hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+agentai_client = AgentAIClient()
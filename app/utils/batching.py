@@ -0,0 +1,130 @@
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app import config
+from app.utils.binding_utils import predict_pairs
+from app.utils.metrics import STAGE_SECONDS
+from app.utils.model_registry import registry
+from app.utils.score_cache import score_cache
+
+
+class BindingBatcher:
+    """
+    Gathers concurrent binding requests into batched model calls.
+
+    The first queued request opens a collection window of `window_ms`; every
+    request arriving within it (up to `max_batch_size`) joins the same forward
+    pass. Requests queued while a batch is running are picked up by the next
+    one, so batches grow with load without adding latency when idle.
+    """
+
+    def __init__(self, window_ms: float = config.BATCH_WINDOW_MS, max_batch_size: int = config.BATCH_MAX_SIZE):
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._batches = 0
+        self._items = 0
+        self._max_batch = 0
+        self._last_batch = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._inference_total = 0.0
+
+    def _ensure_started(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def submit(self, drug: str, target: str, model_type: str = "CNN") -> float:
+        """Queue one (drug, target) pair and wait for its binding score"""
+        model_name = registry.resolve(model_type)
+        # Pairs scored before skip the batch window and the model entirely
+        cached = score_cache.get_raw(registry.version(model_name), drug, target)
+        if cached is not None:
+            return cached
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((model_name, drug, target, future, time.perf_counter()))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch: List[tuple]) -> None:
+        started = time.perf_counter()
+        for _, _, _, _, queued_at in batch:
+            wait = started - queued_at
+            STAGE_SECONDS.observe(wait, "binding_queue_wait")
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+        self._batches += 1
+        self._items += len(batch)
+        self._last_batch = len(batch)
+        self._max_batch = max(self._max_batch, len(batch))
+
+        # One forward pass per model present in the batch
+        by_model: Dict[str, List[tuple]] = {}
+        for item in batch:
+            by_model.setdefault(item[0], []).append(item)
+
+        for model_name, items in by_model.items():
+            drugs = [item[1] for item in items]
+            targets = [item[2] for item in items]
+            try:
+                scores = await run_in_threadpool(predict_pairs, model_name, drugs, targets)
+            except Exception as e:
+                for item in items:
+                    if not item[3].done():
+                        item[3].set_exception(e)
+                continue
+            for item, score in zip(items, scores):
+                if not item[3].done():
+                    item[3].set_result(score)
+
+        self._inference_total += time.perf_counter() - started
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size,
+            "batches": self._batches,
+            "requests": self._items,
+            "mean_batch_size": round(self._items / self._batches, 2) if self._batches else 0,
+            "last_batch_size": self._last_batch,
+            "largest_batch_size": self._max_batch,
+            "mean_wait_ms": round(self._wait_total / self._items * 1000, 3) if self._items else 0,
+            "max_wait_ms": round(self._wait_max * 1000, 3),
+            "mean_batch_inference_ms": round(self._inference_total / self._batches * 1000, 3) if self._batches else 0,
+        }
+
+    async def close(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+
+binding_batcher = BindingBatcher()
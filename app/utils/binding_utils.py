@@ -0,0 +1,209 @@
+import heapq
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+from rdkit import Chem
+
+from app.utils.encoding_cache import encoding_cache
+from app.utils.executor import rdkit_pool
+from app.utils.metrics import stage_timer
+from app.utils.model_registry import registry
+from app.utils.score_cache import score_cache, target_key
+from app.utils.startup import import_tracker
+
+
+def load_encoders() -> int:
+    """
+    Import DeepPurpose's encoders (and with them torch and pandas) in this
+    process; returns its pid. They are otherwise imported on first use.
+    """
+    import_tracker.load("DeepPurpose.utils")
+    return os.getpid()
+
+
+def _unique(values: List[str]) -> List[str]:
+    return list(dict.fromkeys(values))
+
+
+def canonical_smiles(smiles: List[str]) -> Dict[str, str]:
+    """
+    Canonical form of each distinct SMILES; strings RDKit cannot parse map to
+    themselves so they are scored (and cached) as given.
+    """
+    canonical = {}
+    with stage_timer("canonicalize"):
+        for s in _unique(smiles):
+            mol = Chem.MolFromSmiles(s)
+            canonical[s] = Chem.MolToSmiles(mol) if mol is not None else s
+    return canonical
+
+
+def _encode_drug_values(drug_encoding: str, smiles: List[str]) -> List[Any]:
+    """DeepPurpose drug encoding of each SMILES; runs inside RDKit pool workers"""
+    with stage_timer("drug_encoding"):
+        pd = import_tracker.load("pandas")
+        encode_drug = import_tracker.load("DeepPurpose.utils").encode_drug
+        df = encode_drug(pd.DataFrame({"SMILES": smiles}), drug_encoding)
+    return list(df["drug_encoding"])
+
+
+def encode_drugs(drug_encoding: str, smiles: List[str]) -> Dict[str, Any]:
+    """Encode each distinct SMILES once for the given DeepPurpose drug encoding"""
+    unique = _unique(smiles)
+    encodings = encoding_cache.get_many("drug", drug_encoding, unique)
+    missing = [s for s in unique if s not in encodings]
+    if missing:
+        # Called from worker threads; RDKit-based encodings run in the process pool
+        fresh = dict(zip(missing, rdkit_pool.run_sync(_encode_drug_values, drug_encoding, missing)))
+        encoding_cache.put_many("drug", drug_encoding, fresh)
+        encodings.update(fresh)
+    return encodings
+
+
+def encode_targets(target_encoding: str, sequences: List[str]) -> Dict[str, Any]:
+    """Encode each distinct protein sequence once for the given DeepPurpose target encoding"""
+    unique = _unique(sequences)
+    encodings = encoding_cache.get_many("target", target_encoding, unique)
+    missing = [s for s in unique if s not in encodings]
+    if missing:
+        with stage_timer("target_encoding"):
+            pd = import_tracker.load("pandas")
+            encode_protein = import_tracker.load("DeepPurpose.utils").encode_protein
+            df = encode_protein(pd.DataFrame({"Target Sequence": missing}), target_encoding)
+        fresh = dict(zip(missing, df["target_encoding"]))
+        encoding_cache.put_many("target", target_encoding, fresh)
+        encodings.update(fresh)
+    return encodings
+
+
+def score_encoded(model, drugs: List[str], targets: List[str],
+                  drug_encodings: Dict[str, Any], target_encodings: Dict[str, Any]) -> List[float]:
+    """
+    Run model.predict on aligned (drug, target) pairs using precomputed encodings.
+
+    This builds the same frame data_process_repurpose_virtual_screening would
+    produce, without re-encoding molecules or sequences that repeat.
+    """
+    pd = import_tracker.load("pandas")
+    df = pd.DataFrame({
+        "SMILES": drugs,
+        "Target Sequence": targets,
+        "Label": [0] * len(drugs),
+    })
+    df["drug_encoding"] = pd.Series([drug_encodings[d] for d in drugs], dtype=object)
+    df["target_encoding"] = pd.Series([target_encodings[t] for t in targets], dtype=object)
+    with stage_timer("model_predict"):
+        scores = model.predict(df)
+    return [float(score) for score in scores]
+
+
+def _score_missing(model_name: str, version: str, pairs: List[tuple]) -> Dict[tuple, float]:
+    """
+    Scores of (canonical SMILES, target sequence) pairs, running the model
+    only on pairs not in the score cache.
+    """
+    keys = [(drug, target_key(target)) for drug, target in pairs]
+    scores = score_cache.get_many(version, keys)
+    missing = {}
+    for key, pair in zip(keys, pairs):
+        if key not in scores:
+            missing.setdefault(key, pair)
+    if missing:
+        model = registry.get(model_name)
+        drugs = [drug for drug, _ in missing.values()]
+        targets = [target for _, target in missing.values()]
+        drug_encodings = encode_drugs(model.drug_encoding, drugs)
+        target_encodings = encode_targets(model.target_encoding, targets)
+        fresh = dict(zip(missing, score_encoded(model, drugs, targets, drug_encodings, target_encodings)))
+        score_cache.put_many(version, fresh)
+        scores.update(fresh)
+    return {pair: scores[key] for key, pair in zip(keys, pairs)}
+
+
+def predict_pairs(model_name: str, drugs: List[str], targets: List[str]) -> List[float]:
+    """
+    Score aligned (drug, target) pairs with one encode + predict pass.
+
+    Drugs are scored in canonical form, so every spelling of a molecule gets
+    the same score, and pairs scored before by the same checkpoint come from
+    the score cache without running the model.
+
+    Args:
+        model_name (str): Name of a model known to the registry
+        drugs (List[str]): SMILES strings
+        targets (List[str]): Protein sequences, one per drug
+
+    Returns:
+        List of binding scores in input order
+    """
+    version = registry.version(model_name)
+    canonical = canonical_smiles(drugs)
+    pairs = [(canonical[drug], target) for drug, target in zip(drugs, targets)]
+    scores = _score_missing(model_name, version, pairs)
+    score_cache.put_many(version, {}, canonical.items())
+    return [scores[pair] for pair in pairs]
+
+
+def iter_screen(model_name: str, drugs: List[str], targets: List[str],
+                top_k: Optional[int] = None, batch_size: int = 1024) -> Iterator[Dict[str, Any]]:
+    """
+    Score every drug against every target, yielding results as they are ready.
+
+    Drugs are canonicalized once up front. Pairs are scored target by target
+    in batches of `batch_size`; pairs already in the score cache skip the
+    model. With `top_k`, only the best `top_k` drugs of each target are
+    yielded, once that target is complete.
+
+    Yields:
+        Dicts with drug_index, drug_smiles, target_index and binding_score
+        (plus rank when top_k is set)
+    """
+    version = registry.version(model_name)
+    canonical = rdkit_pool.run_sync(canonical_smiles, drugs)
+    canonical_drugs = [canonical[drug] for drug in drugs]
+
+    # Flatten the cross product target-major so each target finishes in turn
+    pairs = ((t, d) for t in range(len(targets)) for d in range(len(drugs)))
+    hits: List[tuple] = []
+    current_target = 0
+
+    def flush_target(target_index, hits):
+        ranked = sorted(hits, key=lambda hit: (-hit[0], hit[1]))
+        for rank, (score, drug_index) in enumerate(ranked, start=1):
+            yield {
+                "drug_index": drug_index,
+                "drug_smiles": drugs[drug_index],
+                "target_index": target_index,
+                "binding_score": score,
+                "rank": rank,
+            }
+
+    while True:
+        batch = [pair for _, pair in zip(range(batch_size), pairs)]
+        if not batch:
+            break
+        batch_scores = _score_missing(
+            model_name, version, [(canonical_drugs[d], targets[t]) for t, d in batch]
+        )
+        for target_index, drug_index in batch:
+            score = batch_scores[(canonical_drugs[drug_index], targets[target_index])]
+            if top_k is None:
+                yield {
+                    "drug_index": drug_index,
+                    "drug_smiles": drugs[drug_index],
+                    "target_index": target_index,
+                    "binding_score": score,
+                }
+                continue
+            if target_index != current_target:
+                yield from flush_target(current_target, hits)
+                hits = []
+                current_target = target_index
+            # Min-heap of the best top_k scores seen for this target
+            if len(hits) < top_k:
+                heapq.heappush(hits, (score, drug_index))
+            elif score > hits[0][0]:
+                heapq.heapreplace(hits, (score, drug_index))
+
+    if top_k is not None and hits:
+        yield from flush_target(current_target, hits)
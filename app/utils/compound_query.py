@@ -0,0 +1,321 @@
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from rdkit import Chem
+
+from app import config
+from app.utils.file_lock import directory_lock
+from app.utils.metrics import stage_timer
+from app.utils.molecule_utils import (
+    DESCRIPTOR_COLUMNS,
+    MoleculeContext,
+    absorption_rule,
+    bbb_rule,
+    lipinski_rule,
+    low_toxicity_rule,
+)
+
+logger = logging.getLogger(__name__)
+
+PATTERN_BITS = 2048
+PATTERN_WORDS = PATTERN_BITS // 64
+
+# Comparison operators accepted in property filters
+OPERATORS = {
+    "lt": np.less,
+    "le": np.less_equal,
+    "gt": np.greater,
+    "ge": np.greater_equal,
+    "eq": np.equal,
+}
+
+# Lipinski/ADMET labels as (rule over the descriptor columns, label when the rule holds, label otherwise)
+LABELS = {
+    "drug_likeness": (lambda t: lipinski_rule(t["mol_weight"], t["logp"], t["hbd"], t["hba"]), "Pass", "Fail"),
+    "intestinal_absorption": (lambda t: absorption_rule(t["tpsa"], t["rotatable_bonds"]), "High", "Low"),
+    "blood_brain_barrier": (lambda t: bbb_rule(t["mol_weight"], t["logp"], t["tpsa"]), "High", "Low"),
+    "metabolism_risk": (lambda t: lipinski_rule(t["mol_weight"], t["logp"], t["hbd"], t["hba"]), "Low", "High"),
+    "toxicity_risk": (lambda t: low_toxicity_rule(t["logp"], t["tpsa"]), "Low", "High"),
+}
+
+
+def pattern_fingerprint(mol) -> np.ndarray:
+    """RDKit pattern fingerprint of a molecule or SMARTS query, packed into uint64 words"""
+    fp = Chem.PatternFingerprint(mol, fpSize=PATTERN_BITS)
+    bits = np.zeros((PATTERN_BITS,), dtype=np.uint8)
+    bits[list(fp.GetOnBits())] = 1
+    return np.packbits(bits).view(np.uint64)
+
+
+def describe_compounds(smiles_list: List[str]) -> Tuple[List[str], List[bytes], np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Everything the table stores for the valid inputs; runs inside pool workers.
+
+    Returns:
+        (canonical SMILES, RDKit molecule binaries, pattern fingerprints,
+        descriptor columns); invalid SMILES are skipped
+    """
+    canonical = []
+    binaries = []
+    patterns = []
+    columns = {name: [] for name in DESCRIPTOR_COLUMNS}
+    for smiles in smiles_list:
+        ctx = MoleculeContext(smiles) if smiles else None
+        if ctx is None or not ctx.is_valid:
+            continue
+        canonical.append(ctx.smiles)
+        binaries.append(ctx.mol.ToBinary())
+        patterns.append(pattern_fingerprint(ctx.mol))
+        for name in DESCRIPTOR_COLUMNS:
+            columns[name].append(getattr(ctx, name))
+    rows = np.vstack(patterns) if patterns else np.zeros((0, PATTERN_WORDS), dtype=np.uint64)
+    return canonical, binaries, rows, {name: np.asarray(values, dtype=np.float64) for name, values in columns.items()}
+
+
+def compile_smarts(patterns: Sequence[str]) -> List[Any]:
+    """
+    Parse SMARTS patterns.
+
+    Raises:
+        ValueError: naming the first pattern that cannot be parsed
+    """
+    queries = []
+    for smarts in patterns:
+        query = Chem.MolFromSmarts(smarts)
+        if query is None:
+            raise ValueError(f"Invalid SMARTS pattern: {smarts}")
+        queries.append(query)
+    return queries
+
+
+class CompoundTable:
+    """
+    Compound table for combined substructure and property queries.
+
+    Each compound is stored as a row of descriptor columns (the
+    DESCRIPTOR_COLUMNS predict_admet works from), a packed pattern
+    fingerprint and the RDKit molecule binary. A query first evaluates
+    property filters and Lipinski/ADMET labels as masks over whole columns,
+    then drops compounds whose fingerprint lacks a bit of a SMARTS query's
+    fingerprint (such a compound cannot contain the pattern), and only runs
+    full substructure matching on what is left. Compounds are deduplicated by
+    canonical SMILES; with `path` set the table is saved and reloaded there.
+    """
+
+    def __init__(self, path: Optional[str] = None, capacity: int = 1024):
+        self.path = path
+        self._lock = threading.Lock()
+        self._size = 0
+        self._patterns = np.zeros((capacity, PATTERN_WORDS), dtype=np.uint64)
+        self._columns = {name: np.zeros(capacity) for name in DESCRIPTOR_COLUMNS}
+        self._smiles: List[str] = []
+        # Molecule binaries; None for rows loaded from disk until first matched
+        self._binaries: List[Optional[bytes]] = []
+        self._known: Set[str] = set()
+        if path and os.path.exists(os.path.join(path, "patterns.npy")):
+            self._load()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self, needed: int) -> None:
+        capacity = max(needed, 2 * len(self._patterns))
+        patterns = np.zeros((capacity, PATTERN_WORDS), dtype=np.uint64)
+        patterns[:self._size] = self._patterns[:self._size]
+        self._patterns = patterns
+        for name, column in self._columns.items():
+            grown = np.zeros(capacity)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    def _load(self) -> None:
+        patterns = np.load(os.path.join(self.path, "patterns.npy"))
+        descriptors = np.load(os.path.join(self.path, "descriptors.npz"))
+        with open(os.path.join(self.path, "smiles.txt")) as f:
+            smiles = f.read().splitlines()
+        self._size = len(smiles)
+        self._patterns = patterns
+        self._columns = {name: descriptors[name] for name in DESCRIPTOR_COLUMNS}
+        self._smiles = smiles
+        self._binaries = [None] * len(smiles)
+        self._known = set(smiles)
+        logger.info("Loaded compound table with %d compounds", len(smiles))
+
+    def add_rows(self, smiles: List[str], binaries: List[bytes], patterns: np.ndarray,
+                 columns: Dict[str, np.ndarray]) -> int:
+        """Insert rows produced by describe_compounds; returns the number added"""
+        with self._lock:
+            keep = []
+            for i, s in enumerate(smiles):
+                if s not in self._known:
+                    self._known.add(s)
+                    keep.append(i)
+            if not keep:
+                return 0
+            needed = self._size + len(keep)
+            if needed > len(self._patterns):
+                self._grow(needed)
+            self._patterns[self._size:needed] = patterns[keep]
+            for name in DESCRIPTOR_COLUMNS:
+                self._columns[name][self._size:needed] = columns[name][keep]
+            self._smiles.extend(smiles[i] for i in keep)
+            self._binaries.extend(binaries[i] for i in keep)
+            self._size = needed
+            return len(keep)
+
+    def add(self, smiles_list: List[str]) -> int:
+        """Describe and insert SMILES in this thread"""
+        return self.add_rows(*describe_compounds(smiles_list))
+
+    def _molecule(self, row: int):
+        binary = self._binaries[row]
+        if binary is None:
+            mol = Chem.MolFromSmiles(self._smiles[row])
+            self._binaries[row] = mol.ToBinary()
+            return mol
+        return Chem.Mol(binary)
+
+    def query(self, smarts: Sequence[str] = (), exclude_smarts: Sequence[str] = (),
+              filters: Optional[Dict[str, Dict[str, float]]] = None,
+              labels: Optional[Dict[str, str]] = None,
+              limit: Optional[int] = 100) -> Dict[str, Any]:
+        """
+        Compounds matching every SMARTS in `smarts`, none in `exclude_smarts`,
+        every property filter and every label, in insertion order.
+
+        Args:
+            smarts: SMARTS patterns that must all be present
+            exclude_smarts: SMARTS patterns that must all be absent
+            filters: {descriptor: {operator: value}}, e.g. {"tpsa": {"lt": 90}};
+                descriptors are DESCRIPTOR_COLUMNS, operators are OPERATORS
+            labels: {label: value} over LABELS, e.g. {"blood_brain_barrier": "High"}
+            limit: maximum number of hits returned (None for all)
+
+        Returns:
+            Dict with "results" ({"smiles", **descriptors} per hit) and
+            "stats" counting how many compounds each stage let through
+
+        Raises:
+            ValueError: for invalid SMARTS, unknown descriptors, operators or labels
+        """
+        include = compile_smarts(smarts)
+        exclude = compile_smarts(exclude_smarts)
+        for name, conditions in (filters or {}).items():
+            if name not in DESCRIPTOR_COLUMNS:
+                raise ValueError(f"Unknown descriptor '{name}'; available: {list(DESCRIPTOR_COLUMNS)}")
+            unknown = set(conditions) - set(OPERATORS)
+            if unknown:
+                raise ValueError(f"Unknown operators {sorted(unknown)} for '{name}'; available: {list(OPERATORS)}")
+        for name, value in (labels or {}).items():
+            if name not in LABELS:
+                raise ValueError(f"Unknown label '{name}'; available: {list(LABELS)}")
+            if value not in LABELS[name][1:]:
+                raise ValueError(f"Label '{name}' must be one of {list(LABELS[name][1:])}")
+
+        with stage_timer("compound_query"):
+            return self._query(include, exclude, filters, labels, limit)
+
+    def _query(self, include, exclude, filters, labels, limit) -> Dict[str, Any]:
+        with self._lock:
+            size = self._size
+            patterns = self._patterns[:size]
+            table = {name: column[:size] for name, column in self._columns.items()}
+
+        # Property predicates over whole columns
+        mask = np.ones(size, dtype=bool)
+        for name, conditions in (filters or {}).items():
+            for op, value in conditions.items():
+                mask &= OPERATORS[op](table[name], value)
+        for name, value in (labels or {}).items():
+            rule, true_label, _ = LABELS[name]
+            holds = rule(table)
+            mask &= holds if value == true_label else ~holds
+        property_pass = int(mask.sum())
+
+        # Pattern fingerprint prescreen: every query bit must be set in the compound
+        for query in include:
+            query_fp = pattern_fingerprint(query)
+            mask &= np.all((patterns & query_fp) == query_fp, axis=1)
+        candidates = np.nonzero(mask)[0]
+
+        results = []
+        checked = 0
+        for row in candidates:
+            if limit is not None and len(results) >= limit:
+                break
+            if include or exclude:
+                checked += 1
+                mol = self._molecule(row)
+                if not all(mol.HasSubstructMatch(q) for q in include):
+                    continue
+                if any(mol.HasSubstructMatch(q) for q in exclude):
+                    continue
+            entry = {"smiles": self._smiles[row]}
+            entry.update({name: round(float(table[name][row]), 3) for name in DESCRIPTOR_COLUMNS})
+            results.append(entry)
+
+        return {
+            "results": results,
+            "stats": {
+                "compounds": size,
+                "property_pass": property_pass,
+                "prescreen_pass": len(candidates),
+                "substructure_checked": checked,
+                "returned": len(results),
+            }
+        }
+
+    def save(self) -> None:
+        """
+        Merge all compounds into the table at `path`.
+
+        Other processes may have saved to the same path since this one loaded
+        it, so what is on disk now is kept and only compounds it lacks are
+        added, under a lock held across processes. The table is reloaded
+        from the merged files.
+        """
+        if not self.path:
+            return
+        with directory_lock(self.path), self._lock:
+            size = self._size
+            patterns = self._patterns[:size]
+            columns = {name: column[:size] for name, column in self._columns.items()}
+            smiles = self._smiles
+            if os.path.exists(os.path.join(self.path, "patterns.npy")):
+                with open(os.path.join(self.path, "smiles.txt")) as f:
+                    saved = f.read().splitlines()
+                saved_set = set(saved)
+                new = [i for i, s in enumerate(smiles) if s not in saved_set]
+                descriptors = np.load(os.path.join(self.path, "descriptors.npz"))
+                patterns = np.concatenate([np.load(os.path.join(self.path, "patterns.npy")), patterns[new]])
+                columns = {name: np.concatenate([descriptors[name], column[new]]) for name, column in columns.items()}
+                smiles = saved + [smiles[i] for i in new]
+            # Write then rename so a crash never leaves a half-written table
+            tmp = os.path.join(self.path, "patterns.npy.tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, patterns)
+            os.replace(tmp, os.path.join(self.path, "patterns.npy"))
+            tmp = os.path.join(self.path, "descriptors.npz.tmp")
+            with open(tmp, "wb") as f:
+                np.savez(f, **columns)
+            os.replace(tmp, os.path.join(self.path, "descriptors.npz"))
+            tmp = os.path.join(self.path, "smiles.txt.tmp")
+            with open(tmp, "w") as f:
+                f.write("".join(s + "\n" for s in smiles))
+            os.replace(tmp, os.path.join(self.path, "smiles.txt"))
+            self._load()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "compounds": self._size,
+            "descriptors": list(DESCRIPTOR_COLUMNS),
+            "labels": {name: list(values) for name, (_, *values) in LABELS.items()},
+            "pattern_fingerprint_bits": PATTERN_BITS,
+            "path": self.path,
+        }
+
+
+compound_table = CompoundTable(config.COMPOUND_TABLE_PATH or None)
@@ -0,0 +1,295 @@
+"""
+Read-only columnar store of precomputed molecular descriptors.
+
+A store is a directory of .npy files written by the offline ingest command:
+
+    python -m app.utils.descriptor_store ingest STORE_DIR library.smi more.sdf ...
+
+and opened by the API when DRUG_API_DESCRIPTOR_STORE points at it. Every
+file is memory-mapped read-only, so all uvicorn and RDKit worker processes
+share one copy through the OS page cache instead of each loading its own.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app import config
+from app.utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Descriptors stored as integers; everything else is float64
+INTEGER_COLUMNS = ("hbd", "hba", "rotatable_bonds")
+
+# Recorded through the metrics registry so lookups made in RDKit pool workers count too
+STORE_LOOKUPS = metrics.counter(
+    "drug_api_descriptor_store_lookups", "Molecules looked up in the descriptor store", ("result",)
+)
+
+
+def smiles_key(smiles: str) -> int:
+    """64-bit lookup key of a SMILES string"""
+    return int.from_bytes(hashlib.blake2b(smiles.encode(), digest_size=8).digest(), "little")
+
+
+class DescriptorStore:
+    """
+    Memory-mapped descriptor columns, one row per distinct molecule.
+
+    Rows are found through a sorted array of 64-bit SMILES hashes: every
+    spelling seen at ingest time and the canonical SMILES of each molecule
+    map to its row, so known input strings are answered with a binary search
+    and no RDKit parse at all. Canonical lookups are verified against the
+    stored canonical SMILES.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.columns: Dict[str, np.ndarray] = {}
+        self._keys = np.zeros((0,), dtype=np.uint64)
+        self._key_rows = np.zeros((0,), dtype=np.int64)
+        self._smiles_offsets = np.zeros((1,), dtype=np.int64)
+        self._smiles_bytes = np.zeros((0,), dtype=np.uint8)
+        if path:
+            if os.path.exists(os.path.join(path, "meta.json")):
+                self._open()
+            else:
+                logger.warning("Descriptor store %s does not exist; descriptors will be computed", path)
+
+    def _open(self) -> None:
+        with open(os.path.join(self.path, "meta.json")) as f:
+            meta = json.load(f)
+        self.columns = {name: self._map(name) for name in meta["columns"]}
+        self._keys = self._map("keys")
+        self._key_rows = self._map("key_rows")
+        self._smiles_offsets = self._map("smiles_offsets")
+        self._smiles_bytes = self._map("smiles")
+        logger.info("Opened descriptor store with %d molecules", len(self))
+
+    def _map(self, name: str) -> np.ndarray:
+        return np.load(os.path.join(self.path, name + ".npy"), mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self._smiles_offsets) - 1
+
+    def _row(self, smiles: str) -> Optional[int]:
+        if not len(self._keys):
+            return None
+        key = np.uint64(smiles_key(smiles))
+        i = int(np.searchsorted(self._keys, key))
+        if i < len(self._keys) and self._keys[i] == key:
+            return int(self._key_rows[i])
+        return None
+
+    def find(self, smiles: str) -> Optional[int]:
+        """Row of a SMILES string in any spelling seen at ingest time"""
+        return self._row(smiles)
+
+    def find_canonical(self, canonical: str) -> Optional[int]:
+        """Row of a canonical SMILES, checked against the stored string"""
+        row = self._row(canonical)
+        if row is None or self.smiles(row) != canonical:
+            return None
+        return row
+
+    @staticmethod
+    def record(hit: bool) -> None:
+        """Count one molecule lookup, however many keys it tried"""
+        STORE_LOOKUPS.inc("hit" if hit else "miss")
+
+    @property
+    def hits(self) -> int:
+        return int(STORE_LOOKUPS.value("hit"))
+
+    @property
+    def misses(self) -> int:
+        return int(STORE_LOOKUPS.value("miss"))
+
+    def smiles(self, row: int) -> str:
+        """Canonical SMILES of a row"""
+        start, end = self._smiles_offsets[row], self._smiles_offsets[row + 1]
+        return self._smiles_bytes[start:end].tobytes().decode()
+
+    def descriptors(self, row: int) -> Dict[str, float]:
+        return {name: column[row].item() for name, column in self.columns.items()}
+
+    def stats(self) -> Dict[str, object]:
+        hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "path": self.path,
+            "molecules": len(self),
+            "keys": len(self._keys),
+            "columns": list(self.columns),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+descriptor_store = DescriptorStore(config.DESCRIPTOR_STORE or None)
+
+
+def iter_library(paths: Iterable[str]) -> Iterator[str]:
+    """SMILES from .smi, .csv and .sdf files; SDF records are converted to SMILES"""
+    from rdkit import Chem
+    from app.utils.molecule_utils import read_smiles_file
+
+    for path in paths:
+        lower = path.lower()
+        if lower.endswith((".sdf", ".sd")):
+            with open(path, "rb") as f:
+                for mol in Chem.ForwardSDMolSupplier(f):
+                    if mol is not None:
+                        yield Chem.MolToSmiles(mol)
+        elif lower.endswith(".csv"):
+            with open(path, "rb") as f:
+                yield from read_smiles_file(f.read(), path)
+        else:
+            with open(path) as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith("#"):
+                        yield line.split()[0]
+
+
+def describe_chunk(smiles_list: List[str]) -> List[Optional[Tuple[str, Tuple[float, ...]]]]:
+    """(canonical SMILES, descriptor values) per input, None if invalid; runs in ingest workers"""
+    from rdkit import Chem
+    from app.utils.molecule_utils import DESCRIPTOR_COLUMNS, MoleculeContext
+
+    described = []
+    for smiles in smiles_list:
+        mol = Chem.MolFromSmiles(smiles)
+        if mol is None:
+            described.append(None)
+            continue
+        # Built from the molecule so the values are computed, not read from a store
+        ctx = MoleculeContext.from_mol(mol)
+        described.append((ctx.smiles, tuple(getattr(ctx, name) for name in DESCRIPTOR_COLUMNS)))
+    return described
+
+
+def _chunks(items: Iterator[str], size: int) -> Iterator[List[str]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _save(path: str, name: str, array: np.ndarray) -> None:
+    np.save(os.path.join(path, name + ".npy"), array)
+
+
+def ingest(output: str, paths: List[str], workers: int = os.cpu_count() or 1, chunk_size: int = 1000) -> Dict[str, int]:
+    """
+    Build a descriptor store from library files, replacing any store at `output`.
+
+    The store is written next to `output` and renamed into place when
+    complete, so a running API never sees a partial store.
+    """
+    from app.utils.molecule_utils import DESCRIPTOR_COLUMNS
+
+    rows: Dict[str, int] = {}
+    keys: Dict[int, int] = {}
+    values: List[Tuple[float, ...]] = []
+    read = invalid = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunks = _chunks(iter_library(paths), chunk_size)
+        # Bounded lookahead keeps memory flat on very large libraries
+        pending = []
+        for chunk in chunks:
+            pending.append((chunk, pool.submit(describe_chunk, chunk)))
+            if len(pending) < workers * 2:
+                continue
+            chunk, future = pending.pop(0)
+            read, invalid = _collect(chunk, future.result(), rows, keys, values, read, invalid)
+        for chunk, future in pending:
+            read, invalid = _collect(chunk, future.result(), rows, keys, values, read, invalid)
+
+    tmp = output.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    table = np.array(values, dtype=np.float64).reshape(len(values), len(DESCRIPTOR_COLUMNS))
+    for i, name in enumerate(DESCRIPTOR_COLUMNS):
+        _save(tmp, name, table[:, i].astype(np.int32) if name in INTEGER_COLUMNS else table[:, i])
+
+    key_array = np.fromiter(keys.keys(), dtype=np.uint64, count=len(keys))
+    row_array = np.fromiter(keys.values(), dtype=np.int64, count=len(keys))
+    order = np.argsort(key_array)
+    _save(tmp, "keys", key_array[order])
+    _save(tmp, "key_rows", row_array[order])
+
+    encoded = [smiles.encode() for smiles in rows]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(s) for s in encoded], out=offsets[1:])
+    _save(tmp, "smiles_offsets", offsets)
+    _save(tmp, "smiles", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump({"columns": list(DESCRIPTOR_COLUMNS), "molecules": len(rows), "keys": len(keys),
+                   "sources": [os.path.basename(p) for p in paths]}, f)
+
+    if os.path.exists(output):
+        old = output.rstrip(os.sep) + ".old"
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(output, old)
+        os.replace(tmp, output)
+        shutil.rmtree(old)
+    else:
+        os.replace(tmp, output)
+    return {"read": read, "invalid": invalid, "molecules": len(rows), "keys": len(keys)}
+
+
+def _collect(chunk, described, rows, keys, values, read, invalid):
+    """Merge one described chunk into the ingest state (rows are in first-seen order)"""
+    for raw, entry in zip(chunk, described):
+        read += 1
+        if entry is None:
+            invalid += 1
+            continue
+        canonical, descriptor_values = entry
+        row = rows.get(canonical)
+        if row is None:
+            row = rows[canonical] = len(values)
+            values.append(descriptor_values)
+            keys[smiles_key(canonical)] = row
+        keys[smiles_key(raw)] = row
+    return read, invalid
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.utils.descriptor_store",
+                                     description="Build the precomputed descriptor store")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = commands.add_parser("ingest", help="Compute descriptors for .smi/.csv/.sdf libraries")
+    ingest_parser.add_argument("output", help="Store directory (replaced if it exists)")
+    ingest_parser.add_argument("files", nargs="+", help="Library files")
+    ingest_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ingest_parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    start = time.perf_counter()
+    counts = ingest(args.output, args.files, args.workers, args.chunk_size)
+    counts["seconds"] = round(time.perf_counter() - start, 1)
+    print(json.dumps(counts))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+import hashlib
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from app import config
+
+
+class EncodingCache:
+    """
+    Content-hashed LRU cache of DeepPurpose drug and target encodings.
+
+    Entries are keyed by a hash of (kind, encoding name, input text), so the
+    same protein sequence is encoded once per target encoding no matter how
+    many requests carry it. Memory use is bounded by the pickled size of the
+    cached values; least recently used entries are evicted first.
+
+    When `path` is given, entries are also written to a SQLite file read
+    through a memory map, so a restarted worker starts with a warm cache.
+    """
+
+    def __init__(self, max_bytes: int, path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.path = path
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA mmap_size = 268435456")
+            self._db.execute("PRAGMA journal_mode = WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS encodings (key TEXT PRIMARY KEY, value BLOB)")
+            self._db.commit()
+
+    @staticmethod
+    def key(kind: str, encoding: str, text: str) -> str:
+        return hashlib.sha1(f"{kind}\0{encoding}\0{text}".encode()).hexdigest()
+
+    def _insert(self, key: str, value: Any, size: int) -> None:
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def get_many(self, kind: str, encoding: str, texts: Iterable[str]) -> Dict[str, Any]:
+        """Cached encodings for the given texts; texts not cached are left out"""
+        found = {}
+        with self._lock:
+            for text in texts:
+                key = self.key(kind, encoding, text)
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    found[text] = entry[0]
+                    self.hits += 1
+                    continue
+                if self._db is not None:
+                    row = self._db.execute("SELECT value FROM encodings WHERE key = ?", (key,)).fetchone()
+                    if row is not None:
+                        value = pickle.loads(row[0])
+                        self._insert(key, value, len(row[0]))
+                        found[text] = value
+                        self.disk_hits += 1
+                        continue
+                self.misses += 1
+        return found
+
+    def put_many(self, kind: str, encoding: str, encodings: Dict[str, Any]) -> None:
+        with self._lock:
+            rows = []
+            for text, value in encodings.items():
+                key = self.key(kind, encoding, text)
+                blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+                self._insert(key, value, len(blob))
+                rows.append((key, blob))
+            if self._db is not None and rows:
+                self._db.executemany("INSERT OR REPLACE INTO encodings (key, value) VALUES (?, ?)", rows)
+                self._db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "persistent_path": self.path,
+        }
+
+
+encoding_cache = EncodingCache(
+    max_bytes=config.ENCODING_CACHE_MB * 1024 * 1024,
+    path=config.ENCODING_CACHE_PATH or None
+)
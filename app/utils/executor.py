@@ -0,0 +1,120 @@
+import asyncio
+import functools
+import logging
+import math
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app import config
+from app.utils.metrics import metrics, run_recorded
+
+logger = logging.getLogger(__name__)
+
+
+class TaskTimeoutError(TimeoutError):
+    pass
+
+
+def _init_worker() -> None:
+    # Forked workers inherit the parent's metric values; start from zero
+    metrics.reset()
+
+
+def _warm_up() -> int:
+    """Import RDKit and exercise the descriptor code once in a worker"""
+    import os
+    from app.utils.molecule_utils import predict_admet
+
+    predict_admet("CC(=O)OC1=CC=CC=C1C(=O)O")
+    return os.getpid()
+
+
+class RDKitPool:
+    """
+    Process pool that keeps RDKit work off the event loop and spreads it over cores.
+
+    Workers are started and warmed up by `start()`. Until then, or when
+    configured with zero workers, tasks run on the default thread pool so the
+    event loop still never blocks. A task exceeding its timeout raises
+    TaskTimeoutError for the caller; the worker finishes it in the background.
+    Metrics recorded inside a worker are merged into this process's registry
+    when the task returns.
+    """
+
+    def __init__(self, workers: int = config.PROCESS_WORKERS, timeout: float = config.TASK_TIMEOUT_SECONDS):
+        self.workers = workers
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def started(self) -> bool:
+        return self._pool is not None
+
+    def start(self) -> None:
+        if self._pool is not None or self.workers <= 0:
+            return
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        # One warm-up task per worker so the first real request doesn't pay for imports
+        warmed = self.warm_up(_warm_up)
+        logger.info("Started RDKit process pool with %d workers (%d warmed up)", self.workers, warmed)
+
+    def warm_up(self, fn: Callable[[], int]) -> int:
+        """
+        Submit fn once per worker and wait; fn returns its worker's pid. Returns
+        the number of distinct workers reached (the pool decides placement, so
+        this can be fewer than `workers`). The tasks' own metrics are dropped.
+        """
+        pool = self._pool
+        if pool is None:
+            fn()
+            return 0
+        futures = [pool.submit(run_recorded, fn) for _ in range(self.workers)]
+        return len({future.result()[0] for future in futures})
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    async def run(self, fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """Run fn(*args) in a worker process and await its result"""
+        timeout = self.timeout if timeout is None else timeout
+        pool = self._pool
+        if pool is None:
+            call = run_in_threadpool(fn, *args)
+        else:
+            call = asyncio.get_running_loop().run_in_executor(pool, functools.partial(run_recorded, fn, *args))
+        try:
+            result = await asyncio.wait_for(call, timeout)
+        except asyncio.TimeoutError:
+            raise TaskTimeoutError(f"{getattr(fn, '__name__', 'task')} exceeded {timeout:g}s")
+        if pool is None:
+            return result
+        result, delta = result
+        metrics.merge(delta)
+        return result
+
+    async def map_chunks(self, fn: Callable[[List], List], items: List, min_chunk: int = 256,
+                         timeout: Optional[float] = None) -> List:
+        """Split items over the workers, run fn on each chunk and concatenate the results"""
+        chunk_size = max(min_chunk, math.ceil(len(items) / max(self.workers, 1)))
+        chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+        results = await asyncio.gather(*(self.run(fn, chunk, timeout=timeout) for chunk in chunks))
+        return [item for chunk in results for item in chunk]
+
+    def run_sync(self, fn: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """Blocking variant of run() for code already running on a worker thread"""
+        if self._pool is None:
+            return fn(*args)
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            result, delta = self._pool.submit(run_recorded, fn, *args).result(timeout)
+        except FutureTimeoutError:
+            raise TaskTimeoutError(f"{getattr(fn, '__name__', 'task')} exceeded {timeout:g}s")
+        metrics.merge(delta)
+        return result
+
+
+rdkit_pool = RDKitPool()
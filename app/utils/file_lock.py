@@ -0,0 +1,21 @@
+import fcntl
+import os
+from contextlib import contextmanager
+
+
+@contextmanager
+def directory_lock(path: str):
+    """
+    Exclusive lock on a store directory, held across processes.
+
+    Every uvicorn worker saves its own in-memory additions to the same
+    directory at shutdown; holding this lock around read-merge-write keeps
+    one worker from overwriting another's rows.
+    """
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, ".lock"), "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
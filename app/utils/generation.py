@@ -0,0 +1,82 @@
+import asyncio
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Dict, Optional
+
+from app import config
+from app.utils.executor import rdkit_pool
+from app.utils.molecule_utils import generate_chunk
+
+
+async def stream_generated(num_samples: int, seed: int, seed_smiles: Optional[str] = None,
+                           chunk_size: int = 256, dedup_window: Optional[int] = None,
+                           stall_chunks: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Generate molecules in parallel chunks and yield them in a reproducible order.
+
+    Chunk i is generated in a worker process from its own RNG stream derived
+    from (seed, i). Chunks are consumed strictly in index order, so the same
+    seed, chunk_size and seed_smiles always give the same sequence, however
+    many workers there are. Only a bounded number of chunks is in flight at
+    once.
+
+    Deduplication is approximate: molecules are checked against the last
+    `dedup_window` distinct molecules emitted, so memory stays bounded but a
+    molecule can be emitted again once it has left the window.
+
+    Generation stops after num_samples molecules, after num_samples * 10
+    attempts, or once `stall_chunks` chunks in a row added nothing new, which
+    is how a seed whose reachable chemical space is used up ends early.
+
+    Yields:
+        {"type": "molecule", "index", "smiles"} entries, then one
+        {"type": "summary", ...} entry
+    """
+    dedup_window = config.GENERATE_DEDUP_WINDOW if dedup_window is None else dedup_window
+    stall_chunks = config.GENERATE_STALL_CHUNKS if stall_chunks is None else stall_chunks
+    max_attempts = num_samples * 10
+    lookahead = max(rdkit_pool.workers, 1) * 2
+    in_flight: deque = deque()
+    next_chunk = 0
+    emitted = 0
+    attempts = 0
+    stalled = 0
+    recent: "OrderedDict[str, None]" = OrderedDict()
+
+    try:
+        while emitted < num_samples and attempts < max_attempts and stalled < stall_chunks:
+            while len(in_flight) < lookahead:
+                in_flight.append(asyncio.ensure_future(
+                    rdkit_pool.run(generate_chunk, seed, next_chunk, chunk_size, seed_smiles)
+                ))
+                next_chunk += 1
+
+            molecules, chunk_attempts = await in_flight.popleft()
+            attempts += chunk_attempts
+            new = 0
+            for smiles in molecules:
+                if smiles in recent:
+                    recent.move_to_end(smiles)
+                    continue
+                recent[smiles] = None
+                if len(recent) > dedup_window:
+                    recent.popitem(last=False)
+                yield {"type": "molecule", "index": emitted, "smiles": smiles}
+                emitted += 1
+                new += 1
+                if emitted >= num_samples:
+                    break
+            stalled = 0 if new else stalled + 1
+    finally:
+        for future in in_flight:
+            future.cancel()
+
+    yield {
+        "type": "summary",
+        "seed": seed,
+        "chunk_size": chunk_size,
+        "num_molecules": emitted,
+        "attempts": attempts,
+        "acceptance_rate": round(emitted / attempts, 4) if attempts else 0.0,
+        "exhausted": stalled >= stall_chunks,
+        "message": "Generated drug-like molecules that pass Lipinski's Rule of Five"
+    }
@@ -0,0 +1,163 @@
+"""
+Optimized CPU inference for DeepPurpose binding models.
+
+`optimize` swaps a loaded model's torch module for a faster one that
+DeepPurpose's own predict() keeps using:
+
+- "traced": inference_mode execution of a torch.jit trace of the module
+- "int8": the same, after dynamic int8 quantization of its Linear layers
+
+The swap is only kept if the new module reproduces the eager scores on a
+fixed DAVIS-style sample set within a configured maximum absolute delta;
+otherwise the model stays eager. This module imports torch, so the registry
+only imports it when an optimized mode is configured.
+"""
+import logging
+import time
+from typing import Any, Dict, List, Tuple
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+# DAVIS-style parity set: kinase inhibitors against a fixed panel of sequences
+PARITY_DRUGS = (
+    "CN1CCN(CC1)CC2=CC=C(C=C2)C(=O)NC3=CC(=C(C=C3)C)NC4=NC=CC(=N4)C5=CN=CC=C5",  # imatinib
+    "COC1=C(C=C2C(=C1)N=CN=C2NC3=CC(=C(C=C3)F)Cl)OCCCN4CCOCC4",  # gefitinib
+    "COCCOC1=C(C=C2C(=C1)C(=NC=N2)NC3=CC=CC(=C3)C#C)OCCOC",  # erlotinib
+    "CCN(CC)CCNC(=O)C1=C(NC(=C1C)C=C2C3=C(C=CC(=C3)F)NC2=O)C",  # sunitinib
+    "CC1=C(C(=CC=C1)Cl)NC(=O)C2=CN=C(S2)NC3=CC(=NC(=N3)C)N4CCN(CC4)CCO",  # dasatinib
+    "CNC(=O)C1=NC=CC(=C1)OC2=CC=C(C=C2)NC(=O)NC3=CC(=C(C=C3)Cl)C(F)(F)F",  # sorafenib
+)
+PARITY_TARGETS = (
+    "MRGPGAGVLVVGVGVGVGVGVGVGV",
+    "MQIFVKTLTGKTITLEVEPSDTIENVKAKIQDKEGIPPDQQRLIFAGKQLEDGRTLSDYNIQKESTLHLVLRLRGG",
+    "KVFERCELARTLKRLGMDGYRGISLANWMCLAKWESGYNTRATNYNAGDRSTDYGIFQINSRYWCNDGKTPGAVNACHLSCSALLQDNIADAVACAKRVVRDPQGIRAWVAWRNRCQNRDVRQYVQGCGV",
+)
+
+
+class InferenceModule(torch.nn.Module):
+    """Runs the wrapped module under torch.inference_mode (no autograd bookkeeping)"""
+
+    def __init__(self, module: torch.nn.Module):
+        super().__init__()
+        self.module = module
+
+    def forward(self, *inputs):
+        with torch.inference_mode():
+            return self.module(*inputs)
+
+
+def set_threads(threads: int) -> None:
+    """Intra-op thread count of this process's torch ops (0 leaves torch's default)"""
+    if threads > 0:
+        torch.set_num_threads(threads)
+
+
+def parity_pairs() -> Tuple[List[str], List[str]]:
+    """Every parity drug against every parity target, as aligned lists"""
+    drugs = [drug for _ in PARITY_TARGETS for drug in PARITY_DRUGS]
+    targets = [target for target in PARITY_TARGETS for _ in PARITY_DRUGS]
+    return drugs, targets
+
+
+def _score(model, drugs: List[str], targets: List[str]) -> Tuple[List[float], float]:
+    from app.utils.binding_utils import encode_drugs, encode_targets, score_encoded
+
+    drug_encodings = encode_drugs(model.drug_encoding, drugs)
+    target_encodings = encode_targets(model.target_encoding, targets)
+    start = time.perf_counter()
+    scores = score_encoded(model, drugs, targets, drug_encodings, target_encodings)
+    return scores, time.perf_counter() - start
+
+
+def capture_first_inputs(module: torch.nn.Module):
+    """
+    Record the inputs of the module's first forward call.
+
+    Returns:
+        (dict that gets an "inputs" entry, hook handle to remove when done)
+    """
+    captured: Dict[str, Any] = {}
+
+    def hook(_, inputs) -> None:
+        # Returning anything but None would replace the inputs of every call
+        if "inputs" not in captured:
+            captured["inputs"] = inputs
+
+    return captured, module.register_forward_pre_hook(hook)
+
+
+def _build(module: torch.nn.Module, mode: str, example_inputs) -> Tuple[torch.nn.Module, bool]:
+    """The optimized module for `mode`, and whether it could be traced"""
+    module.eval()
+    if mode == "int8":
+        module = torch.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8)
+    traced = False
+    # Graph encodings (MPNN, DGL) and Transformer inputs are not plain tensors
+    if example_inputs and all(isinstance(x, torch.Tensor) for x in example_inputs):
+        try:
+            with torch.inference_mode():
+                module = torch.jit.freeze(torch.jit.trace(module, example_inputs, check_trace=False))
+            traced = True
+        except Exception:
+            logger.exception("Could not trace binding model; running it untraced")
+    return InferenceModule(module), traced
+
+
+def optimize(model, mode: str, max_delta: float) -> Dict[str, Any]:
+    """
+    Switch a loaded DeepPurpose model to an optimized module for `mode`,
+    keeping it only if parity holds.
+
+    Returns:
+        Report with the variant in use ("eager" if parity failed), whether
+        the module was traced and quantized, the parity deltas and the
+        timings of both variants on the parity set
+    """
+    drugs, targets = parity_pairs()
+    eager = model.model
+
+    # The first batch's inputs double as the example inputs for tracing
+    captured, handle = capture_first_inputs(eager)
+    try:
+        reference, eager_seconds = _score(model, drugs, targets)
+    finally:
+        handle.remove()
+
+    optimized, traced = _build(eager, mode, captured.get("inputs"))
+    model.model = optimized
+    error = None
+    try:
+        scores, optimized_seconds = _score(model, drugs, targets)
+        # A batch of a different size checks the trace is not tied to the example's shape
+        single, _ = _score(model, drugs[:1], targets[:1])
+        deltas = [abs(a - b) for a, b in zip(reference, scores)] + [abs(reference[0] - single[0])]
+        max_abs_delta = max(deltas)
+        passed = max_abs_delta <= max_delta
+    except Exception as e:
+        logger.exception("Optimized binding model failed on the parity set")
+        error = str(e)
+        deltas, max_abs_delta, optimized_seconds, passed = [], None, None, False
+
+    if not passed:
+        model.model = eager
+        logger.warning("Binding model %s failed parity (max delta %s, allowed %g); staying eager",
+                       mode, max_abs_delta, max_delta)
+    return {
+        "mode": mode,
+        "variant": mode if passed else "eager",
+        "traced": traced,
+        "quantized": mode == "int8",
+        "threads": torch.get_num_threads(),
+        "parity": {
+            "pairs": len(reference),
+            "max_abs_delta": round(max_abs_delta, 6) if max_abs_delta is not None else None,
+            "mean_abs_delta": round(sum(deltas) / len(deltas), 6) if deltas else None,
+            "max_allowed": max_delta,
+            "passed": passed,
+            "error": error,
+        },
+        "eager_seconds": round(eager_seconds, 4),
+        "optimized_seconds": round(optimized_seconds, 4) if optimized_seconds is not None else None,
+    }
@@ -0,0 +1,68 @@
+import asyncio
+
+from app import config
+from app.utils.binding_utils import iter_screen
+from app.utils.generation import stream_generated
+from app.utils.jobs import JobContext, JobRunner, JobStore
+from app.utils.similarity import schedule_index
+
+# Result rows written to the job store per transaction
+RESULT_FLUSH_ROWS = 500
+
+
+async def run_screen(ctx: JobContext) -> None:
+    """Drug x target screen; results are the /binding/screen result rows"""
+    params = ctx.params
+
+    def work():
+        rows = []
+        count = 0
+        for entry in iter_screen(params["model_name"], params["drugs"], params["targets"],
+                                 params.get("top_k"), params["batch_size"]):
+            rows.append(entry)
+            count += 1
+            if len(rows) >= RESULT_FLUSH_ROWS:
+                ctx.write_sync(rows)
+                rows = []
+        ctx.write_sync(rows)
+        return count
+
+    # iter_screen blocks on inference; a thread keeps the job loop free for other jobs
+    count = await asyncio.get_running_loop().run_in_executor(None, work)
+    ctx.summary = {
+        "num_results": count,
+        "num_drugs": len(params["drugs"]),
+        "num_targets": len(params["targets"]),
+        "top_k": params.get("top_k"),
+    }
+
+
+async def run_generate(ctx: JobContext) -> None:
+    """
+    Seeded generation campaign; results are {"index", "smiles"} rows. The
+    molecules are added to the similarity index only if the job asked for it.
+    """
+    params = ctx.params
+    index = params.get("index", False)
+    rows = []
+    async for entry in stream_generated(params["num_samples"], params["seed"],
+                                        params.get("seed_smiles"), params["chunk_size"]):
+        if entry["type"] == "summary":
+            ctx.summary = {key: value for key, value in entry.items() if key != "type"}
+            continue
+        rows.append({"index": entry["index"], "smiles": entry["smiles"]})
+        if len(rows) >= RESULT_FLUSH_ROWS:
+            await ctx.write(rows)
+            if index:
+                schedule_index([row["smiles"] for row in rows])
+            rows = []
+    await ctx.write(rows)
+    if index and rows:
+        schedule_index([row["smiles"] for row in rows])
+
+
+job_runner = JobRunner(
+    JobStore(config.JOBS_DB_PATH or ":memory:"),
+    {"screen": run_screen, "generate": run_generate},
+    workers=config.JOB_WORKERS
+)
@@ -0,0 +1,293 @@
+import asyncio
+import itertools
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+class JobStore:
+    """
+    SQLite-backed record of jobs and their result rows.
+
+    Results are stored as JSON, one row per result with a sequence number, so
+    they can be paged or followed while the job is still running. Use ":memory:"
+    for a store that does not outlive the process.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, kind TEXT, status TEXT, priority INTEGER, "
+            "params TEXT, progress INTEGER DEFAULT 0, total INTEGER, summary TEXT, error TEXT, "
+            "created_at REAL, started_at REAL, finished_at REAL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS job_results (job_id TEXT, seq INTEGER, data TEXT, PRIMARY KEY (job_id, seq))"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["summary"] = json.loads(job["summary"]) if job["summary"] else None
+        return job
+
+    def create(self, kind: str, params: Dict[str, Any], priority: int = 0, total: Optional[int] = None) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, status, priority, params, total, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, priority, json.dumps(params), total, time.time())
+            )
+            self._db.commit()
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row is not None else None
+
+    def list(self, limit: int = 50, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Most recently created jobs first"""
+        query = "SELECT * FROM jobs"
+        args: tuple = ()
+        if status is not None:
+            query += " WHERE status = ?"
+            args = (status,)
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY created_at DESC LIMIT ?", args + (limit,)).fetchall()
+        return [self._job(row) for row in rows]
+
+    def update(self, job_id: str, active_only: bool = False, **fields) -> None:
+        """Set job fields; with active_only, jobs that already finished are left alone"""
+        if "summary" in fields:
+            fields["summary"] = json.dumps(fields["summary"])
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        query = f"UPDATE jobs SET {assignments} WHERE id = ?"
+        if active_only:
+            query += " AND status NOT IN ({})".format(", ".join("?" * len(FINISHED_STATES)))
+        with self._lock:
+            self._db.execute(query, tuple(fields.values()) + (job_id,) + (FINISHED_STATES if active_only else ()))
+            self._db.commit()
+
+    def append_results(self, job_id: str, start: int, rows: List[Any]) -> int:
+        """Store rows with sequence numbers from `start` and record the progress; returns the next number"""
+        end = start + len(rows)
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO job_results (job_id, seq, data) VALUES (?, ?, ?)",
+                [(job_id, start + i, json.dumps(row)) for i, row in enumerate(rows)]
+            )
+            self._db.execute("UPDATE jobs SET progress = ? WHERE id = ?", (end, job_id))
+            self._db.commit()
+        return end
+
+    def results(self, job_id: str, offset: int = 0, limit: int = 1000) -> List[Any]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT data FROM job_results WHERE job_id = ? AND seq >= ? ORDER BY seq LIMIT ?",
+                (job_id, offset, limit)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def recover(self) -> List[Dict[str, Any]]:
+        """
+        Requeue jobs interrupted by a restart, dropping their partial results.
+
+        Returns:
+            All queued jobs, ready to be scheduled again
+        """
+        with self._lock:
+            interrupted = [row[0] for row in self._db.execute("SELECT id FROM jobs WHERE status = ?", (RUNNING,))]
+            for job_id in interrupted:
+                self._db.execute("DELETE FROM job_results WHERE job_id = ?", (job_id,))
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, progress = 0, started_at = NULL WHERE id = ?", (QUEUED, job_id)
+                )
+            self._db.commit()
+        return self.list(limit=-1, status=QUEUED)
+
+
+class JobCancelledError(Exception):
+    pass
+
+
+class JobContext:
+    """
+    What a job handler sees: its parameters and a way to publish results.
+
+    `write` is for handlers running on the job event loop, `write_sync` for
+    code the handler moved onto a thread; the latter raises JobCancelledError
+    once the job has been cancelled, so thread-bound loops stop promptly.
+    """
+
+    def __init__(self, store: JobStore, job: Dict[str, Any]):
+        self.store = store
+        self.job = job
+        self.params = job["params"]
+        self.cancelled = threading.Event()
+        self.summary: Optional[Dict[str, Any]] = None
+        self._next = 0
+
+    def write_sync(self, rows: List[Any]) -> None:
+        if self.cancelled.is_set():
+            raise JobCancelledError(self.job["id"])
+        if rows:
+            self._next = self.store.append_results(self.job["id"], self._next, rows)
+
+    async def write(self, rows: List[Any]) -> None:
+        self.write_sync(rows)
+
+
+JobHandler = Callable[[JobContext], Awaitable[None]]
+
+
+class JobRunner:
+    """
+    Runs queued jobs on a dedicated thread with its own event loop.
+
+    Long screens and generation campaigns therefore never share the API's
+    event loop with interactive requests. At most `workers` jobs run at once;
+    queued jobs start in order of priority (higher first), then submission.
+    Jobs interrupted by a restart are requeued by `start()`.
+    """
+
+    def __init__(self, store: JobStore, handlers: Dict[str, JobHandler], workers: int = 2):
+        self.store = store
+        self.handlers = handlers
+        self.workers = workers
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._running: Dict[str, tuple] = {}
+        self._order = itertools.count()
+
+    @property
+    def started(self) -> bool:
+        return self._loop is not None
+
+    def start(self) -> None:
+        if self._loop is not None:
+            return
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._serve, args=(ready,), name="job-runner", daemon=True)
+        self._thread.start()
+        ready.wait()
+        recovered = self.store.recover()
+        for job in sorted(recovered, key=lambda job: job["created_at"]):
+            self._enqueue(job)
+        if recovered:
+            logger.info("Requeued %d jobs", len(recovered))
+
+    def _serve(self, ready: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._queue = asyncio.PriorityQueue()
+        workers = [loop.create_task(self._worker()) for _ in range(self.workers)]
+        self._loop = loop
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            running = list(self._running.values())
+            for task, ctx in running:
+                # Stops handler threads too; the job stays "running" so it is requeued
+                ctx.cancelled.set()
+                task.cancel()
+            for task in workers:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*workers, *(task for task, _ in running), return_exceptions=True))
+            loop.close()
+
+    def stop(self) -> None:
+        """Stop the loop; running jobs are requeued on the next start"""
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop = None
+        self._thread = None
+
+    def _enqueue(self, job: Dict[str, Any]) -> None:
+        item = (-job["priority"], next(self._order), job["id"])
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+
+    def submit(self, kind: str, params: Dict[str, Any], priority: int = 0, total: Optional[int] = None) -> Dict[str, Any]:
+        """Record a job and queue it; returns the job as stored"""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        if self._loop is None:
+            raise RuntimeError("Job runner is not started")
+        job = self.store.create(kind, params, priority, total)
+        self._enqueue(job)
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a queued or running job; finished jobs are left as they are"""
+        job = self.store.get(job_id)
+        if job is None or job["status"] in FINISHED_STATES:
+            return job
+        running = self._running.get(job_id)
+        if running is not None:
+            task, ctx = running
+            ctx.cancelled.set()
+            self._loop.call_soon_threadsafe(task.cancel)
+        self.store.update(job_id, active_only=True, status=CANCELLED, finished_at=time.time())
+        return self.store.get(job_id)
+
+    async def _worker(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self.store.get(job_id)
+            if job is None or job["status"] != QUEUED:
+                continue
+            ctx = JobContext(self.store, job)
+            task = asyncio.ensure_future(self._run(ctx))
+            self._running[job_id] = (task, ctx)
+            try:
+                await asyncio.wait([task])
+            finally:
+                self._running.pop(job_id, None)
+
+    async def _run(self, ctx: JobContext) -> None:
+        job_id = ctx.job["id"]
+        self.store.update(job_id, active_only=True, status=RUNNING, started_at=time.time())
+        try:
+            await self.handlers[ctx.job["kind"]](ctx)
+        except (asyncio.CancelledError, JobCancelledError):
+            if not ctx.cancelled.is_set():
+                # Shutting down: leave the job running so recover() requeues it
+                raise
+            return
+        except Exception as e:
+            logger.exception("Job %s failed", job_id)
+            self.store.update(job_id, active_only=True, status=FAILED, error=str(e), finished_at=time.time())
+            return
+        self.store.update(job_id, active_only=True, status=COMPLETED, summary=ctx.summary, finished_at=time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running": len(self._running),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "store": self.store.path,
+        }
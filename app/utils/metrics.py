@@ -0,0 +1,299 @@
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Counters and histograms are plain Python numbers behind one lock per
+metric, so recording costs about a microsecond. Work done in RDKit pool
+workers is recorded in the worker's own registry and shipped back with each
+task result (see `take_delta`/`merge`), so /metrics covers every process.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Latency buckets in seconds, from sub-millisecond RDKit calls to LLM round trips
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Sample = Tuple[Dict[str, str], float]
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[tuple, object] = {}
+
+    def _header(self, name: str = "") -> List[str]:
+        name = name or self.name
+        return [f"# HELP {name} {self.documentation}", f"# TYPE {name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        # Declared under the sample name, like the *_total collector families
+        lines = self._header(f"{self.name}_total")
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}_total{_format_labels(self.labelnames, labels)} {value:g}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    @contextmanager
+    def track(self, *labels: str):
+        """Count the enclosed block as in progress"""
+        self.inc(*labels)
+        try:
+            yield
+        finally:
+            self.dec(*labels)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value:g}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, sum, count
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, *labels: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            items = [(labels, (list(state[0]), state[1], state[2])) for labels, state in self._values.items()]
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+Collector = Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]
+
+
+class MetricsRegistry:
+    """Named metrics plus collectors that read other components' stats at scrape time"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Collector) -> None:
+        """
+        Add a callable returning (name, type, help, [(labels, value), ...])
+        families, evaluated on every scrape
+        """
+        self._collectors.append(collector)
+
+    def take_delta(self) -> Dict[str, Dict[tuple, object]]:
+        """Counter and histogram values recorded since the last call, then reset them"""
+        delta = {}
+        for name, metric in self._metrics.items():
+            if isinstance(metric, Gauge):
+                continue
+            with metric._lock:
+                if metric._values:
+                    delta[name] = metric._values
+                    metric._values = {}
+        return delta
+
+    def merge(self, delta: Dict[str, Dict[tuple, object]]) -> None:
+        """Add values taken from another process's registry"""
+        for name, values in delta.items():
+            metric = self._metrics.get(name)
+            if metric is None:
+                continue
+            with metric._lock:
+                for labels, value in values.items():
+                    if isinstance(metric, Histogram):
+                        state = metric._values.get(labels)
+                        if state is None:
+                            metric._values[labels] = [list(value[0]), value[1], value[2]]
+                            continue
+                        state[0] = [a + b for a, b in zip(state[0], value[0])]
+                        state[1] += value[1]
+                        state[2] += value[2]
+                    else:
+                        metric._values[labels] = metric._values.get(labels, 0.0) + value
+
+    def reset(self) -> None:
+        for metric in self._metrics.values():
+            with metric._lock:
+                metric._values = {}
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, kind, documentation, samples in collector():
+                lines.append(f"# HELP {name} {documentation}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels.keys(), labels.values())} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    "drug_api_stage_seconds", "Time spent in each processing stage", ("stage",)
+)
+REQUESTS = metrics.counter(
+    "drug_api_requests", "HTTP requests by route and status", ("method", "route", "status")
+)
+REQUEST_SECONDS = metrics.histogram(
+    "drug_api_request_seconds", "HTTP request latency including streamed bodies", ("method", "route")
+)
+REQUESTS_IN_FLIGHT = metrics.gauge(
+    "drug_api_requests_in_flight", "HTTP requests being served"
+)
+UPSTREAM_IN_FLIGHT = metrics.gauge(
+    "drug_api_upstream_in_flight", "Calls in progress to external services", ("service",)
+)
+UPSTREAM_ERRORS = metrics.counter(
+    "drug_api_upstream_errors", "Failed calls to external services", ("service", "reason")
+)
+
+
+def stage_timer(stage: str):
+    """Context manager recording the enclosed block in drug_api_stage_seconds"""
+    return STAGE_SECONDS.time(stage)
+
+
+# Scope key a middleware can set to label a request it answered before routing
+ROUTE_LABEL = "drug_api.route_label"
+
+
+def _route_label(scope) -> str:
+    # Route templates keep label cardinality bounded (no job ids or raw paths)
+    label = scope.get(ROUTE_LABEL)
+    if label is not None:
+        return label
+    route = scope.get("route")
+    if route is not None and hasattr(route, "path"):
+        return route.path
+    endpoint = scope.get("endpoint")
+    return getattr(endpoint, "__name__", "unmatched")
+
+
+class MetricsMiddleware:
+    """ASGI middleware counting requests, errors and latency per route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = _route_label(scope)
+            REQUEST_SECONDS.observe(time.perf_counter() - start, scope["method"], route)
+            REQUESTS.inc(scope["method"], route, str(status["code"]))
+
+
+def run_recorded(fn: Callable, *args) -> Tuple[object, Dict[str, Dict[tuple, object]]]:
+    """Run fn in a pool worker and return its result with the metrics it recorded"""
+    return fn(*args), metrics.take_delta()
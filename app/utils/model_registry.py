@@ -0,0 +1,218 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from app import config
+from app.utils.startup import import_tracker
+
+logger = logging.getLogger(__name__)
+
+# Short names accepted in the `model_type` field of the request models
+MODEL_ALIASES = {
+    "CNN": "CNN_CNN_DAVIS",
+    "MPNN": "MPNN_CNN_DAVIS",
+    "Morgan": "Morgan_CNN_DAVIS",
+    "Daylight": "Daylight_AAC_DAVIS",
+}
+
+# Pretrained models DeepPurpose can download by name
+PRETRAINED_MODELS = (
+    "CNN_CNN_DAVIS", "MPNN_CNN_DAVIS", "Morgan_CNN_DAVIS", "Morgan_AAC_DAVIS",
+    "Daylight_AAC_DAVIS", "MPNN_AAC_DAVIS",
+    "CNN_CNN_BindingDB", "MPNN_CNN_BindingDB", "Morgan_CNN_BindingDB",
+    "Morgan_AAC_BindingDB", "Daylight_AAC_BindingDB", "MPNN_AAC_BindingDB",
+    "Transformer_CNN_BindingDB",
+    "MPNN_CNN_KIBA", "Morgan_CNN_KIBA", "Morgan_AAC_KIBA", "Daylight_AAC_KIBA",
+    "MPNN_AAC_KIBA",
+)
+
+# DeepPurpose unpacks some pretrained models into a directory named after the
+# original publication rather than the encoder pair. A checkpoint directory
+# needs both config.pkl and model.pt; DeepPurpose.DTI.model_pretrained(model=name)
+# downloads and unpacks them into ./save_folder/pretrained_models/
+CHECKPOINT_DIRS = {
+    "CNN_CNN_DAVIS": "model_DeepDTA_DAVIS",
+}
+
+
+# Values of DRUG_API_INFERENCE_MODE; see app.utils.inference
+INFERENCE_MODES = ("eager", "traced", "int8")
+
+
+class UnknownModelError(ValueError):
+    pass
+
+
+def _rss_bytes() -> Optional[int]:
+    """Resident set size of this process, when the platform exposes it"""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _parameter_bytes(model) -> int:
+    return sum(p.numel() * p.element_size() for p in model.model.parameters())
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of DeepPurpose models.
+
+    DeepPurpose (and torch) are imported when the first model is loaded, not
+    when this module is. Each model is loaded at most once and then shared by
+    every router. Models are looked up by their `model_type` alias (e.g.
+    "CNN") or full pretrained name, and local checkpoints under
+    `checkpoint_root` take precedence over downloading. With an
+    `inference_mode` other than "eager", loaded models are switched to
+    optimized CPU inference when it passes the parity check.
+    """
+
+    def __init__(self, checkpoint_root: str = config.CHECKPOINT_ROOT,
+                 inference_mode: str = config.INFERENCE_MODE):
+        if inference_mode not in INFERENCE_MODES:
+            raise ValueError(f"Unknown inference mode '{inference_mode}'; use one of {list(INFERENCE_MODES)}")
+        self.checkpoint_root = checkpoint_root
+        self.inference_mode = inference_mode
+        self._models: Dict[str, Any] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._incomplete: Set[str] = set()
+
+    def _checkpoint_dir(self, name: str) -> Optional[str]:
+        """Local checkpoint directory for a model, if a complete one exists"""
+        for dirname in (CHECKPOINT_DIRS.get(name), f"model_{name}", name):
+            if not dirname:
+                continue
+            path_dir = os.path.join(self.checkpoint_root, dirname)
+            missing = [f for f in ("config.pkl", "model.pt") if not os.path.isfile(os.path.join(path_dir, f))]
+            if not missing:
+                return path_dir
+            if os.path.isdir(path_dir) and path_dir not in self._incomplete:
+                self._incomplete.add(path_dir)
+                logger.warning(
+                    "Checkpoint directory %s is missing %s, so %s will be downloaded instead; "
+                    "DeepPurpose.DTI.model_pretrained(model=%r) saves a complete one under "
+                    "./save_folder/pretrained_models/", path_dir, " and ".join(missing), name, name
+                )
+        return None
+
+    def local_checkpoints(self) -> List[str]:
+        """Names of the models that can be loaded without downloading"""
+        if not os.path.isdir(self.checkpoint_root):
+            return []
+        dir_names = {v: k for k, v in CHECKPOINT_DIRS.items()}
+        names = []
+        for dirname in sorted(os.listdir(self.checkpoint_root)):
+            name = dir_names.get(dirname, dirname[len("model_"):] if dirname.startswith("model_") else dirname)
+            if self._checkpoint_dir(name):
+                names.append(name)
+        return names
+
+    def resolve(self, model_type: str) -> str:
+        """Map a request's model_type onto a model name"""
+        name = MODEL_ALIASES.get(model_type, model_type)
+        if name in PRETRAINED_MODELS or self._checkpoint_dir(name):
+            return name
+        raise UnknownModelError(
+            f"Unknown model_type '{model_type}'. Use one of {sorted(MODEL_ALIASES)} "
+            f"or a pretrained model name"
+        )
+
+    def get(self, model_type: str = "CNN"):
+        """Return the loaded model for model_type, loading it on first use"""
+        name = self.resolve(model_type)
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+        with load_lock:
+            if name not in self._models:
+                self._models[name] = self._load(name)
+        return self._models[name]
+
+    def _checkpoint_version(self, name: str, variant: str) -> str:
+        path_dir = self._checkpoint_dir(name)
+        if not path_dir:
+            version = f"{name}@pretrained"
+        else:
+            stat = os.stat(os.path.join(path_dir, "model.pt"))
+            version = f"{name}@{stat.st_size}-{stat.st_mtime_ns}"
+        # Optimized variants score slightly differently, so they get their own cache keys
+        return version if variant == "eager" else f"{version}+{variant}"
+
+    def version(self, name: str) -> str:
+        """
+        Identity of the checkpoint and inference variant behind a model name:
+        the one loaded in this process, or the one that would be loaded.
+        Changes when model.pt or the inference mode does.
+        """
+        loaded = self._stats.get(name)
+        if loaded is not None:
+            return loaded["version"]
+        return self._checkpoint_version(name, self.inference_mode)
+
+    def versions(self) -> List[str]:
+        """Versions of the loaded models"""
+        return [stats["version"] for stats in self._stats.values()]
+
+    def _load(self, name: str):
+        path_dir = self._checkpoint_dir(name)
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+
+        models = import_tracker.load("DeepPurpose.DTI")
+        if path_dir:
+            model = models.model_pretrained(path_dir=path_dir)
+        else:
+            model = models.model_pretrained(model=name)
+
+        # Measured before optimizing: frozen traces hold their weights as constants
+        parameter_bytes = _parameter_bytes(model)
+        inference = None
+        if self.inference_mode != "eager" or config.INFERENCE_THREADS:
+            # Only optimized or thread-limited deployments need this module (and torch) here
+            inference_utils = import_tracker.load("app.utils.inference")
+            inference_utils.set_threads(config.INFERENCE_THREADS)
+            if self.inference_mode != "eager":
+                inference = inference_utils.optimize(model, self.inference_mode, config.INFERENCE_MAX_DELTA)
+
+        load_seconds = time.perf_counter() - start
+        rss_after = _rss_bytes()
+        self._stats[name] = {
+            "source": path_dir or "pretrained download",
+            "version": self._checkpoint_version(name, inference["variant"] if inference else "eager"),
+            "drug_encoding": model.drug_encoding,
+            "target_encoding": model.target_encoding,
+            "load_seconds": round(load_seconds, 3),
+            "parameter_bytes": parameter_bytes,
+            "rss_delta_bytes": rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+            "inference": inference,
+        }
+        logger.info("Loaded binding model %s in %.2fs", name, load_seconds)
+        return model
+
+    def preload(self, model_types: List[str]) -> None:
+        """Load models ahead of the first request; failures are logged, not raised"""
+        for model_type in model_types:
+            try:
+                self.get(model_type)
+            except Exception:
+                logger.exception("Could not preload binding model %s", model_type)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "aliases": MODEL_ALIASES,
+            "inference_mode": self.inference_mode,
+            "local_checkpoints": self.local_checkpoints(),
+            "loaded": dict(self._stats),
+        }
+
+
+registry = ModelRegistry()
@@ -1,39 +1,146 @@
 from rdkit import Chem
 from rdkit.Chem import Descriptors, AllChem
 import numpy as np
-from typing import Dict, List, Union
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple, Union
+import csv
+import io
 import random
+import time
+from app.utils.descriptor_store import descriptor_store
+from app.utils.metrics import stage_timer
 
-# Move all the utility functions here
-def check_drug_likeness(smiles: str) -> Dict[str, Union[float, str]]:
+# Rule functions work on scalars and element-wise on NumPy arrays alike, so the
+# single-molecule and batch paths share one definition of every threshold
+def lipinski_rule(mol_weight, logp, hbd, hba):
+    return (mol_weight <= 500) & (logp <= 5) & (hbd <= 5) & (hba <= 10)
+
+def absorption_rule(tpsa, rotatable_bonds):
+    return (tpsa < 140) & (rotatable_bonds < 10)
+
+def bbb_rule(mol_weight, logp, tpsa):
+    return (mol_weight < 400) & (logp < 5) & (tpsa < 90)
+
+def low_toxicity_rule(logp, tpsa):
+    return (logp < 5) & (tpsa > 75)
+
+class MoleculeContext:
+    """
+    A molecule parsed once, with descriptors computed lazily and at most once.
+
+    Pass the same context to check_drug_likeness, predict_admet and the
+    generator so a SMILES string is parsed once however many checks run on it.
+    Molecules in the descriptor store are answered from it without computing
+    descriptors.
+    """
+
+    def __init__(self, smiles: Optional[str] = None, mol=None):
+        self.input_smiles = smiles
+        if mol is not None:
+            self.__dict__["mol"] = mol
+
+    @classmethod
+    def from_mol(cls, mol) -> "MoleculeContext":
+        """Wrap an already built RDKit molecule without a SMILES round-trip"""
+        return cls(mol=mol)
+
+    @cached_property
+    def mol(self):
+        with stage_timer("smiles_parse"):
+            return Chem.MolFromSmiles(self.input_smiles)
+
+    @cached_property
+    def stored(self) -> Optional[Dict[str, float]]:
+        """
+        Precomputed descriptors from the descriptor store, for molecules given
+        as SMILES. A spelling seen at ingest time is found without parsing.
+        """
+        if self.input_smiles is None or not descriptor_store:
+            return None
+        row = descriptor_store.find(self.input_smiles)
+        if row is None and self.mol is not None:
+            row = descriptor_store.find_canonical(self.smiles)
+        descriptor_store.record(row is not None)
+        if row is None:
+            return None
+        self.__dict__.setdefault("smiles", descriptor_store.smiles(row))
+        return descriptor_store.descriptors(row)
+
+    @property
+    def is_valid(self) -> bool:
+        return self.stored is not None or self.mol is not None
+
+    @cached_property
+    def smiles(self) -> str:
+        """Canonical SMILES of the parsed molecule"""
+        return Chem.MolToSmiles(self.mol)
+
+    def _descriptor(self, name: str, compute):
+        stored = self.stored
+        if stored is not None and name in stored:
+            return stored[name]
+        return compute(self.mol)
+
+    @cached_property
+    def mol_weight(self) -> float:
+        return self._descriptor("mol_weight", Descriptors.ExactMolWt)
+
+    @cached_property
+    def logp(self) -> float:
+        return self._descriptor("logp", Descriptors.MolLogP)
+
+    @cached_property
+    def hbd(self) -> int:
+        return self._descriptor("hbd", Descriptors.NumHDonors)
+
+    @cached_property
+    def hba(self) -> int:
+        return self._descriptor("hba", Descriptors.NumHAcceptors)
+
+    @cached_property
+    def tpsa(self) -> float:
+        return self._descriptor("tpsa", Descriptors.TPSA)
+
+    @cached_property
+    def rotatable_bonds(self) -> int:
+        return self._descriptor("rotatable_bonds", Descriptors.NumRotatableBonds)
+
+    @property
+    def passes_lipinski(self) -> bool:
+        return bool(lipinski_rule(self.mol_weight, self.logp, self.hbd, self.hba))
+
+def as_context(molecule: Union[str, MoleculeContext]) -> MoleculeContext:
+    """Accept either a SMILES string or an existing MoleculeContext"""
+    if isinstance(molecule, MoleculeContext):
+        return molecule
+    return MoleculeContext(molecule)
+
+def check_drug_likeness(smiles: Union[str, MoleculeContext]) -> Dict[str, Union[float, str]]:
     """
     Checks if a given molecule (SMILES format) follows Lipinski's Rule of Five.
     
     Args:
-        smiles (str): SMILES representation of the molecule
+        smiles (str | MoleculeContext): SMILES representation of the molecule,
+            or a context already parsed from it
         
     Returns:
         Dict with molecular properties and Lipinski's rule check results
     """
     try:
-        # Convert SMILES to RDKit molecule
-        mol = Chem.MolFromSmiles(smiles)
-        if mol is None:
+        # Convert SMILES to RDKit molecule (once per context)
+        ctx = as_context(smiles)
+        if not ctx.is_valid:
             return {"error": "Invalid SMILES string"}
 
         # Calculate properties
-        mol_weight = Descriptors.ExactMolWt(mol)
-        logp = Descriptors.MolLogP(mol)
-        hbd = Descriptors.NumHDonors(mol)
-        hba = Descriptors.NumHAcceptors(mol)
+        with stage_timer("descriptors"):
+            mol_weight = ctx.mol_weight
+            logp = ctx.logp
+            hbd = ctx.hbd
+            hba = ctx.hba
 
         # Check Lipinski's rules
-        passes_lipinski = (
-            mol_weight <= 500 and 
-            logp <= 5 and 
-            hbd <= 5 and 
-            hba <= 10
-        )
+        passes_lipinski = ctx.passes_lipinski
 
         return {
             "molecular_weight": round(mol_weight, 3),
@@ -47,38 +154,40 @@ def check_drug_likeness(smiles: str) -> Dict[str, Union[float, str]]:
     except Exception as e:
         return {"error": f"Drug-likeness calculation failed: {str(e)}"}
 
-def predict_admet(smiles: str) -> Dict[str, Union[Dict, str]]:
+def predict_admet(smiles: Union[str, MoleculeContext]) -> Dict[str, Union[Dict, str]]:
     """
     Predict ADMET properties using RDKit descriptors.
     
     Args:
-        smiles (str): SMILES representation of the molecule
+        smiles (str | MoleculeContext): SMILES representation of the molecule,
+            or a context already parsed from it
         
     Returns:
         Dict with ADMET properties and predictions
     """
     try:
-        mol = Chem.MolFromSmiles(smiles)
-        if mol is None:
+        ctx = as_context(smiles)
+        if not ctx.is_valid:
             return {"error": "Invalid SMILES string"}
 
         # Calculate molecular properties
-        mw = Descriptors.ExactMolWt(mol)
-        logp = Descriptors.MolLogP(mol)
-        tpsa = Descriptors.TPSA(mol)
-        rotatable_bonds = Descriptors.NumRotatableBonds(mol)
-        hbd = Descriptors.NumHDonors(mol)
-        hba = Descriptors.NumHAcceptors(mol)
+        with stage_timer("descriptors"):
+            mw = ctx.mol_weight
+            logp = ctx.logp
+            tpsa = ctx.tpsa
+            rotatable_bonds = ctx.rotatable_bonds
+            hbd = ctx.hbd
+            hba = ctx.hba
 
         # Predict absorption
-        absorption_prob = "High" if (tpsa < 140 and rotatable_bonds < 10) else "Low"
-        bbb_prob = "High" if (mw < 400 and logp < 5 and tpsa < 90) else "Low"
+        absorption_prob = "High" if absorption_rule(tpsa, rotatable_bonds) else "Low"
+        bbb_prob = "High" if bbb_rule(mw, logp, tpsa) else "Low"
 
         # Predict metabolism (based on Lipinski's rules)
-        metabolism_risk = "Low" if (mw <= 500 and logp <= 5 and hbd <= 5 and hba <= 10) else "High"
+        metabolism_risk = "Low" if ctx.passes_lipinski else "High"
 
         # Predict toxicity (basic rules)
-        toxicity_risk = "Low" if (logp < 5 and tpsa > 75) else "High"
+        toxicity_risk = "Low" if low_toxicity_rule(logp, tpsa) else "High"
 
         return {
             "absorption": {
@@ -103,66 +212,225 @@ def predict_admet(smiles: str) -> Dict[str, Union[Dict, str]]:
     except Exception as e:
         return {"error": f"ADMET prediction failed: {str(e)}"}
 
-def generate_molecule(num_samples: int = 1, seed_smiles: str = None) -> Dict[str, Union[List[str], str]]:
+DESCRIPTOR_COLUMNS = ("mol_weight", "logp", "hbd", "hba", "tpsa", "rotatable_bonds")
+
+def compute_descriptor_table(smiles_list: List[str], columns=DESCRIPTOR_COLUMNS) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """
+    Compute descriptors for many molecules into column arrays.
+
+    Args:
+        smiles_list (List[str]): SMILES strings
+        columns: MoleculeContext descriptor names to compute
+
+    Returns:
+        (table, valid): one float64 array per descriptor (NaN where the SMILES
+        is invalid) and a boolean mask of the parseable inputs
+    """
+    n = len(smiles_list)
+    table = {name: np.full(n, np.nan) for name in columns}
+    valid = np.zeros(n, dtype=bool)
+    with stage_timer("descriptor_table"):
+        for i, smiles in enumerate(smiles_list):
+            if not smiles:
+                continue
+            ctx = as_context(smiles)
+            if not ctx.is_valid:
+                continue
+            valid[i] = True
+            for name in columns:
+                table[name][i] = getattr(ctx, name)
+    return table, valid
+
+def check_drug_likeness_batch(smiles_list: List[str]) -> List[Dict[str, Union[float, str]]]:
+    """
+    Lipinski's Rule of Five for many molecules, evaluated as vectorized masks.
+
+    Returns one entry per input, in order; invalid SMILES get an "error" entry
+    instead of failing the whole batch.
+    """
+    table, valid = compute_descriptor_table(smiles_list, ("mol_weight", "logp", "hbd", "hba"))
+    passes = lipinski_rule(table["mol_weight"], table["logp"], table["hbd"], table["hba"]) & valid
+    mol_weight = np.round(table["mol_weight"], 3)
+    logp = np.round(table["logp"], 3)
+
+    results = []
+    for i, smiles in enumerate(smiles_list):
+        if not valid[i]:
+            results.append({"smiles": smiles, "error": "Invalid SMILES string"})
+            continue
+        results.append({
+            "smiles": smiles,
+            "molecular_weight": float(mol_weight[i]),
+            "logP": float(logp[i]),
+            "HBD": int(table["hbd"][i]),
+            "HBA": int(table["hba"][i]),
+            "drug_likeness": "Pass" if passes[i] else "Fail"
+        })
+    return results
+
+def predict_admet_batch(smiles_list: List[str]) -> List[Dict[str, Union[Dict, str]]]:
+    """
+    ADMET predictions for many molecules, evaluated as vectorized masks.
+
+    Returns one entry per input, in order; invalid SMILES get an "error" entry
+    instead of failing the whole batch.
+    """
+    table, valid = compute_descriptor_table(smiles_list)
+    mw, logp, tpsa = table["mol_weight"], table["logp"], table["tpsa"]
+    absorption = absorption_rule(tpsa, table["rotatable_bonds"])
+    bbb = bbb_rule(mw, logp, tpsa)
+    metabolism_low = lipinski_rule(mw, logp, table["hbd"], table["hba"])
+    toxicity_low = low_toxicity_rule(logp, tpsa)
+    tpsa_r, mw_r, logp_r = np.round(tpsa, 2), np.round(mw, 2), np.round(logp, 2)
+
+    results = []
+    for i, smiles in enumerate(smiles_list):
+        if not valid[i]:
+            results.append({"smiles": smiles, "error": "Invalid SMILES string"})
+            continue
+        results.append({
+            "smiles": smiles,
+            "absorption": {
+                "intestinal_absorption": "High" if absorption[i] else "Low",
+                "blood_brain_barrier": "High" if bbb[i] else "Low",
+                "TPSA": float(tpsa_r[i]),
+                "rotatable_bonds": int(table["rotatable_bonds"][i])
+            },
+            "metabolism": {
+                "risk_level": "Low" if metabolism_low[i] else "High",
+                "molecular_weight": float(mw_r[i]),
+                "logP": float(logp_r[i])
+            },
+            "toxicity": {
+                "risk_level": "Low" if toxicity_low[i] else "High",
+                "hbd": int(table["hbd"][i]),
+                "hba": int(table["hba"][i])
+            }
+        })
+    return results
+
+def read_smiles_file(content: bytes, filename: str) -> List[str]:
+    """
+    Extract SMILES from an uploaded .smi or .csv file.
+
+    .smi: first whitespace-separated token of each non-empty, non-comment line.
+    .csv: the column named "smiles" (any case), else the first column.
+    """
+    text = content.decode("utf-8-sig")
+    if filename.lower().endswith(".csv"):
+        rows = list(csv.reader(io.StringIO(text)))
+        if not rows:
+            return []
+        header = [cell.strip().lower() for cell in rows[0]]
+        if "smiles" in header:
+            column = header.index("smiles")
+            rows = rows[1:]
+        else:
+            column = 0
+        return [row[column].strip() if len(row) > column else "" for row in rows if any(row)]
+
+    smiles = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            smiles.append(line.split()[0])
+    return smiles
+
+# Fragment libraries are parsed once per process, not on every attempt
+GENERATION_FRAGMENTS = (
+    "CC", "c1ccccc1", "C1CCCCC1", "c1ccncc1",
+    "CC(=O)N", "CCO", "CCN", "CC(=O)O",
+    "CN", "CF", "CCl", "CBr",
+    "c1cccnc1", "c1ccco1", "c1ccs1"
+)
+MODIFICATION_FRAGMENTS = ("CC", "CN", "CO", "CF", "CCl", "c1ccccc1")
+GENERATION_FRAGMENT_MOLS = tuple(Chem.MolFromSmiles(smiles) for smiles in GENERATION_FRAGMENTS)
+MODIFICATION_FRAGMENT_MOLS = tuple(Chem.MolFromSmiles(smiles) for smiles in MODIFICATION_FRAGMENTS)
+
+class MoleculeGenerator:
+    """
+    Proposes candidate molecules and keeps the new drug-like ones.
+
+    Candidates either modify `seed_smiles` or combine 2-4 pre-parsed library
+    fragments. Each candidate is checked for drug-likeness on the RDKit
+    molecule itself and deduplicated through a set of canonical SMILES, so
+    accepting a molecule costs one sanitize, four descriptors and one
+    MolToSmiles call. Pass `rng` (a random.Random) for reproducible output.
+    """
+
+    def __init__(self, seed_smiles: Optional[str] = None, rng=None):
+        self.rng = rng or random
+        self.seed_mol = Chem.MolFromSmiles(seed_smiles) if seed_smiles else None
+        if seed_smiles and self.seed_mol is None:
+            raise ValueError("Invalid seed SMILES string")
+        self.seen = set()
+        self.attempts = 0
+        self.accepted = 0
+
+    def propose(self):
+        """One candidate molecule, or None if the attempt produced nothing"""
+        if self.seed_mol is not None:
+            return modify_molecule(self.seed_mol, self.rng)
+
+        # Randomly combine 2-4 fragments
+        num_fragments = self.rng.randint(2, 4)
+        selected = self.rng.sample(GENERATION_FRAGMENT_MOLS, num_fragments)
+        mol = selected[0]
+        for fragment_mol in selected[1:]:
+            mol = Chem.CombineMols(mol, fragment_mol)
+        Chem.SanitizeMol(mol)
+        return mol
+
+    def accept(self, mol) -> Optional[str]:
+        """Canonical SMILES of mol if it is drug-like and not seen before"""
+        ctx = MoleculeContext.from_mol(mol)
+        if not ctx.passes_lipinski:
+            return None
+        smiles = ctx.smiles
+        if smiles in self.seen:
+            return None
+        self.seen.add(smiles)
+        return smiles
+
+    def generate(self, num_samples: int, max_attempts: Optional[int] = None):
+        """Yield up to num_samples new molecules, giving up after max_attempts candidates"""
+        max_attempts = num_samples * 10 if max_attempts is None else max_attempts
+        produced = 0
+        while produced < num_samples and self.attempts < max_attempts:
+            self.attempts += 1
+            try:
+                mol = self.propose()
+                smiles = self.accept(mol) if mol is not None else None
+            except Exception:
+                continue
+            if smiles is not None:
+                produced += 1
+                self.accepted += 1
+                yield smiles
+
+    def stats(self, elapsed: float) -> Dict[str, float]:
+        return {
+            "attempts": self.attempts,
+            "accepted": self.accepted,
+            "acceptance_rate": round(self.accepted / self.attempts, 4) if self.attempts else 0.0,
+            "elapsed_seconds": round(elapsed, 4),
+            "molecules_per_sec": round(self.accepted / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+def generate_molecule(num_samples: int = 1, seed_smiles: str = None, rng=None) -> Dict[str, Union[List[str], str]]:
     """
     Generate novel drug-like molecules using RDKit's structure generation.
     """
     try:
-        generated_molecules = []
-        fragments = [
-            "CC", "c1ccccc1", "C1CCCCC1", "c1ccncc1",
-            "CC(=O)N", "CCO", "CCN", "CC(=O)O",
-            "CN", "CF", "CCl", "CBr",
-            "c1cccnc1", "c1ccco1", "c1ccs1"
-        ]
-        
-        if seed_smiles:
-            # Use the seed molecule as a template
-            seed_mol = Chem.MolFromSmiles(seed_smiles)
-            if not seed_mol:
-                return {"error": "Invalid seed SMILES string"}
-                
-            # Generate similar molecules by modifying the seed
-            for _ in range(num_samples):
-                modified_mol = modify_molecule(seed_mol)
-                if modified_mol:
-                    try:
-                        smiles = Chem.MolToSmiles(modified_mol)
-                        if check_drug_likeness(smiles).get("drug_likeness") == "Pass":
-                            generated_molecules.append(smiles)
-                    except:
-                        continue
-        else:
-            # Generate molecules from scratch using common fragments
-            attempts = 0
-            max_attempts = num_samples * 10  # Allow multiple attempts per requested sample
-            
-            while len(generated_molecules) < num_samples and attempts < max_attempts:
-                attempts += 1
-                try:
-                    # Randomly combine 2-4 fragments
-                    num_fragments = random.randint(2, 4)
-                    selected_fragments = random.sample(fragments, num_fragments)
-                    
-                    # Create base molecule from first fragment
-                    mol = Chem.MolFromSmiles(selected_fragments[0])
-                    
-                    # Add remaining fragments
-                    for fragment in selected_fragments[1:]:
-                        fragment_mol = Chem.MolFromSmiles(fragment)
-                        if fragment_mol:
-                            mol = Chem.CombineMols(mol, fragment_mol)
-                    
-                    # Convert to SMILES
-                    if mol:
-                        smiles = Chem.MolToSmiles(mol)
-                        # Check if it's drug-like
-                        if check_drug_likeness(smiles).get("drug_likeness") == "Pass":
-                            if smiles not in generated_molecules:
-                                generated_molecules.append(smiles)
-                except:
-                    continue
-        
+        try:
+            generator = MoleculeGenerator(seed_smiles, rng)
+        except ValueError as e:
+            return {"error": str(e)}
+
+        start = time.perf_counter()
+        generated_molecules = list(generator.generate(num_samples))
+        elapsed = time.perf_counter() - start
+
         if not generated_molecules:
             return {
                 "error": "Failed to generate valid drug-like molecules. Try different parameters or seed SMILES."
@@ -171,20 +439,42 @@ def generate_molecule(num_samples: int = 1, seed_smiles: str = None) -> Dict[str
         return {
             "generated_molecules": generated_molecules,
             "num_molecules": len(generated_molecules),
+            "stats": generator.stats(elapsed),
             "message": "Generated drug-like molecules that pass Lipinski's Rule of Five"
         }
         
     except Exception as e:
         return {"error": f"Molecule generation failed: {str(e)}"}
 
-def modify_molecule(mol):
+def chunk_rng(seed: int, chunk_index: int) -> random.Random:
+    """Independent, reproducible RNG stream for one chunk of a seeded campaign"""
+    state = np.random.SeedSequence(seed, spawn_key=(chunk_index,)).generate_state(4)
+    return random.Random(int.from_bytes(state.tobytes(), "little"))
+
+def generate_chunk(seed: int, chunk_index: int, chunk_size: int,
+                   seed_smiles: Optional[str] = None) -> Tuple[List[str], int]:
+    """
+    Generate one chunk of a seeded campaign; runs inside pool workers.
+
+    The output depends only on (seed, chunk_index, chunk_size, seed_smiles),
+    never on which worker runs it or when.
+
+    Returns:
+        (accepted SMILES, attempts made)
+    """
+    generator = MoleculeGenerator(seed_smiles, chunk_rng(seed, chunk_index))
+    molecules = list(generator.generate(chunk_size))
+    return molecules, generator.attempts
+
+def modify_molecule(mol, rng=None):
     """Helper function to modify a molecule"""
+    rng = rng or random
     try:
         # Make a copy of the molecule
         new_mol = Chem.RWMol(mol)
         
         # Randomly choose a modification
-        modification = random.choice([
+        modification = rng.choice([
             'add_atom',
             'remove_atom',
             'modify_bond',
@@ -194,37 +484,30 @@ def modify_molecule(mol):
         if modification == 'add_atom':
             # Add a random atom (C, N, O) to a random position
             atom_types = [6, 7, 8]  # C, N, O
-            atom_idx = random.randint(0, new_mol.GetNumAtoms()-1)
-            new_atom_idx = new_mol.AddAtom(Chem.Atom(random.choice(atom_types)))
+            atom_idx = rng.randint(0, new_mol.GetNumAtoms()-1)
+            new_atom_idx = new_mol.AddAtom(Chem.Atom(rng.choice(atom_types)))
             new_mol.AddBond(atom_idx, new_atom_idx, Chem.BondType.SINGLE)
             
         elif modification == 'remove_atom':
             if new_mol.GetNumAtoms() > 5:  # Keep at least 5 atoms
-                atom_idx = random.randint(0, new_mol.GetNumAtoms()-1)
+                atom_idx = rng.randint(0, new_mol.GetNumAtoms()-1)
                 new_mol.RemoveAtom(atom_idx)
                 
         elif modification == 'modify_bond':
             if new_mol.GetNumBonds() > 0:
-                bond_idx = random.randint(0, new_mol.GetNumBonds()-1)
+                bond_idx = rng.randint(0, new_mol.GetNumBonds()-1)
                 bond = new_mol.GetBondWithIdx(bond_idx)
-                new_order = random.choice([
+                new_order = rng.choice([
                     Chem.BondType.SINGLE,
                     Chem.BondType.DOUBLE
                 ])
                 bond.SetBondType(new_order)
                 
         elif modification == 'add_fragment':
-            fragments = ["CC", "CN", "CO", "CF", "CCl", "c1ccccc1"]
-            fragment = Chem.MolFromSmiles(random.choice(fragments))
-            if fragment:
-                new_mol = Chem.CombineMols(new_mol, fragment)
+            new_mol = Chem.CombineMols(new_mol, rng.choice(MODIFICATION_FRAGMENT_MOLS))
         
         # Try to sanitize the molecule
         Chem.SanitizeMol(new_mol)
         return new_mol
     except:
         return None
-
-def create_molecule_from_fragments(fragments):
-    """Helper function to create molecules from fragments"""
-    # ... (previous implementation)
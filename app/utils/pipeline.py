@@ -0,0 +1,115 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+StageFn = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class Stage:
+    """
+    One step of a pipeline.
+
+    `fn` is an async callable receiving the results of the stages listed in
+    `deps`, keyed by stage name.
+    """
+
+    def __init__(self, name: str, fn: StageFn, deps: Iterable[str] = ()):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+
+
+class Pipeline:
+    """
+    Runs stages as a dependency graph: every stage starts as soon as the
+    stages it depends on have finished, so independent stages overlap and
+    end-to-end latency follows the slowest path instead of the sum.
+
+    Stages must be listed after their dependencies. The first failing stage's
+    exception is re-raised unchanged (its name is kept in `failed_stage`) and
+    the remaining stages are cancelled.
+    """
+
+    def __init__(self, stages: List[Stage]):
+        self.stages = stages
+        seen = set()
+        for stage in stages:
+            missing = [dep for dep in stage.deps if dep not in seen]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on undefined or later stages {missing}")
+            seen.add(stage.name)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._timings: Dict[str, Dict[str, float]] = {}
+        self._started_at: Optional[float] = None
+        self.failed_stage: Optional[str] = None
+
+    async def _run_stage(self, stage: Stage) -> Any:
+        inputs = {dep: await self._tasks[dep] for dep in stage.deps}
+        started = time.perf_counter()
+        try:
+            return await stage.fn(inputs)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            if self.failed_stage is None:
+                self.failed_stage = stage.name
+            raise
+        finally:
+            finished = time.perf_counter()
+            self._timings[stage.name] = {
+                "start_ms": round((started - self._started_at) * 1000, 3),
+                "duration_ms": round((finished - started) * 1000, 3),
+            }
+
+    def start(self) -> None:
+        """Schedule every stage; safe to call more than once"""
+        if self._tasks:
+            return
+        self._started_at = time.perf_counter()
+        for stage in self.stages:
+            self._tasks[stage.name] = asyncio.ensure_future(self._run_stage(stage))
+
+    def cancel(self) -> None:
+        for task in self._tasks.values():
+            if not task.done():
+                task.cancel()
+
+    async def result(self, name: str) -> Any:
+        """Wait for one stage and return its result"""
+        self.start()
+        try:
+            return await asyncio.shield(self._tasks[name])
+        except Exception:
+            self.cancel()
+            raise
+
+    async def run(self) -> Dict[str, Any]:
+        """Run all stages and return their results keyed by stage name"""
+        self.start()
+        try:
+            await asyncio.gather(*self._tasks.values())
+        except BaseException:
+            self.cancel()
+            raise
+        return {name: task.result() for name, task in self._tasks.items()}
+
+    async def iter_completed(self) -> AsyncIterator[Tuple[str, Any]]:
+        """Yield (stage name, result) pairs in the order stages finish"""
+        self.start()
+        order = {stage.name: i for i, stage in enumerate(self.stages)}
+        pending = {task: name for name, task in self._tasks.items()}
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: order[pending[t]]):
+                    name = pending.pop(task)
+                    yield name, task.result()
+        finally:
+            self.cancel()
+
+    def timings(self) -> Dict[str, float]:
+        """Duration of each finished stage plus the total, in milliseconds"""
+        timings = {name: timing["duration_ms"] for name, timing in self._timings.items()}
+        if self._timings:
+            timings["total_ms"] = round(max(t["start_ms"] + t["duration_ms"] for t in self._timings.values()), 3)
+        return timings
@@ -0,0 +1,186 @@
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from app import config
+from app.utils.executor import rdkit_pool
+from app.utils.molecule_utils import MoleculeContext, check_drug_likeness, predict_admet
+
+RESULT_FUNCTIONS = {
+    "lipinski": check_drug_likeness,
+    "admet": predict_admet,
+}
+
+
+class ResultCache:
+    """
+    Bounded cache of per-molecule results keyed by canonical SMILES.
+
+    Equivalent SMILES spellings share one entry. Raw SMILES strings that have
+    been seen before map straight to their canonical form, so repeated
+    lookups skip RDKit entirely; a new spelling is looked up by its canonical
+    form before anything is computed (see `get_results`). Entries expire after
+    `ttl_seconds` (0 disables expiry) and the least recently used ones are
+    evicted beyond `max_entries`. Error results are never cached.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._results: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._aliases: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.canonical_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _get(self, key: tuple) -> Optional[dict]:
+        entry = self._results.get(key)
+        if entry is None:
+            return None
+        expires_at, result, size = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._results[key]
+            self._bytes -= size
+            self.expirations += 1
+            return None
+        self._results.move_to_end(key)
+        return result
+
+    def _put(self, key: tuple, result: dict) -> None:
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds > 0 else None
+        size = len(json.dumps(result))
+        if key in self._results:
+            self._bytes -= self._results.pop(key)[2]
+        self._results[key] = (expires_at, result, size)
+        self._bytes += size
+        while len(self._results) > self.max_entries:
+            _, (_, _, evicted_size) = self._results.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def _remember_alias(self, smiles: str, canonical: str) -> None:
+        self._aliases[smiles] = canonical
+        self._aliases.move_to_end(smiles)
+        # Aliases are cheap but unbounded input; keep them proportional to results
+        while len(self._aliases) > 2 * self.max_entries:
+            self._aliases.popitem(last=False)
+
+    def lookup(self, kind: str, smiles: str) -> Optional[dict]:
+        """Cached result for a raw SMILES string seen before, without touching RDKit"""
+        with self._lock:
+            canonical = self._aliases.get(smiles)
+            result = self._get((kind, canonical)) if canonical is not None else None
+            if result is not None:
+                self.hits += 1
+                return copy.deepcopy(result)
+        return None
+
+    def store(self, kind: str, smiles: str, canonical: str, result: dict) -> None:
+        """Record a result computed elsewhere for smiles and its canonical form"""
+        if "error" in result:
+            return
+        with self._lock:
+            self._remember_alias(smiles, canonical)
+            self._put((kind, canonical), copy.deepcopy(result))
+
+    def lookup_canonical(self, kind: str, smiles: str, canonical: str) -> Optional[dict]:
+        """
+        Cached result for the canonical form of a spelling not seen before.
+        The spelling is remembered, so next time `lookup` answers it directly.
+        """
+        with self._lock:
+            self._remember_alias(smiles, canonical)
+            result = self._get((kind, canonical))
+            if result is None:
+                self.misses += 1
+                return None
+            self.canonical_hits += 1
+            return copy.deepcopy(result)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+            self._aliases.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.canonical_hits + self.misses
+        return {
+            "entries": len(self._results),
+            "aliases": len(self._aliases),
+            "approx_bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "canonical_hits": self.canonical_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round((self.hits + self.canonical_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+result_cache = ResultCache(
+    max_entries=config.RESULT_CACHE_MAX_ENTRIES,
+    ttl_seconds=config.RESULT_CACHE_TTL_SECONDS
+)
+
+
+def canonicalize(smiles: str) -> Optional[str]:
+    """Canonical SMILES, or None if it cannot be parsed; runs inside pool workers"""
+    ctx = MoleculeContext(smiles)
+    return ctx.smiles if ctx.is_valid else None
+
+
+def compute_results(kinds: Sequence[str], smiles: str) -> Tuple[Optional[str], Dict[str, dict]]:
+    """
+    Compute several result kinds from one parse; runs inside pool workers.
+
+    Returns:
+        (canonical SMILES or None if invalid, {kind: result})
+    """
+    ctx = MoleculeContext(smiles)
+    results = {kind: RESULT_FUNCTIONS[kind](ctx) for kind in kinds}
+    return (ctx.smiles if ctx.is_valid else None), results
+
+
+async def get_results(kinds: Sequence[str], smiles: str) -> Dict[str, dict]:
+    """
+    Cached results for a SMILES string, computing misses in the RDKit pool.
+
+    Raw SMILES seen before are answered from the cache on the event loop. A
+    new spelling is canonicalized in a worker first, so equivalent spellings
+    of a cached molecule are answered without computing descriptors; only
+    kinds still missing are then computed, from one parse, in a worker.
+    """
+    results = {}
+    for kind in kinds:
+        cached = result_cache.lookup(kind, smiles)
+        if cached is not None:
+            results[kind] = cached
+    missing = [kind for kind in kinds if kind not in results]
+    if not missing:
+        return results
+
+    canonical = await rdkit_pool.run(canonicalize, smiles)
+    if canonical is not None:
+        for kind in missing:
+            cached = result_cache.lookup_canonical(kind, smiles, canonical)
+            if cached is not None:
+                results[kind] = cached
+        missing = [kind for kind in missing if kind not in results]
+    if missing:
+        # Invalid SMILES are passed through so the result functions report the error
+        _, computed = await rdkit_pool.run(compute_results, missing, canonical or smiles)
+        for kind, result in computed.items():
+            if canonical is not None:
+                result_cache.store(kind, smiles, canonical, result)
+            results[kind] = result
+    return results
@@ -0,0 +1,176 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+from app import config
+
+# (canonical SMILES, target sequence hash)
+PairKey = Tuple[str, str]
+
+
+@lru_cache(maxsize=4096)
+def target_key(sequence: str) -> str:
+    """Hash identifying a protein sequence in score cache keys"""
+    return hashlib.sha1(sequence.encode()).hexdigest()
+
+
+class ScoreCache:
+    """
+    LRU cache of binding scores keyed by (model version, canonical SMILES,
+    target sequence hash).
+
+    The model version names the checkpoint a score came from, so replacing a
+    checkpoint makes its old scores unreachable; `purge_stale` also deletes
+    them from disk. Raw SMILES spellings that have been scored map to their
+    canonical form, so a repeated request is answered without RDKit or the
+    model. When `path` is given, scores are also written to SQLite and
+    survive restarts.
+    """
+
+    def __init__(self, max_entries: int, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.path = path
+        self._scores: "OrderedDict[tuple, float]" = OrderedDict()
+        self._aliases: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode = WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS scores (model TEXT, version TEXT, drug TEXT, target TEXT, "
+                "score REAL, PRIMARY KEY (model, version, drug, target))"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def _model(version: str) -> str:
+        return version.split("@", 1)[0]
+
+    @staticmethod
+    def _checkpoint(version: str) -> str:
+        """The version without its inference variant ("m@1+int8" -> "m@1")"""
+        return version.split("+", 1)[0]
+
+    def _insert(self, key: tuple, score: float) -> None:
+        self._scores[key] = score
+        self._scores.move_to_end(key)
+        while len(self._scores) > self.max_entries:
+            self._scores.popitem(last=False)
+            self.evictions += 1
+
+    def get_many(self, version: str, pairs: Iterable[PairKey]) -> Dict[PairKey, float]:
+        """Cached scores for the given (canonical SMILES, target hash) pairs; misses are left out"""
+        found = {}
+        with self._lock:
+            for pair in pairs:
+                if pair in found:
+                    continue
+                key = (version,) + pair
+                score = self._scores.get(key)
+                if score is not None:
+                    self._scores.move_to_end(key)
+                    found[pair] = score
+                    self.hits += 1
+                    continue
+                if self._db is not None:
+                    row = self._db.execute(
+                        "SELECT score FROM scores WHERE model = ? AND version = ? AND drug = ? AND target = ?",
+                        (self._model(version), version) + pair
+                    ).fetchone()
+                    if row is not None:
+                        self._insert(key, row[0])
+                        found[pair] = row[0]
+                        self.disk_hits += 1
+                        continue
+                self.misses += 1
+        return found
+
+    def get_raw(self, version: str, smiles: str, sequence: str) -> Optional[float]:
+        """Cached score for a SMILES spelling scored before, without touching RDKit"""
+        with self._lock:
+            canonical = self._aliases.get(smiles)
+            if canonical is None:
+                return None
+            key = (version, canonical, target_key(sequence))
+            score = self._scores.get(key)
+            if score is None:
+                return None
+            self._scores.move_to_end(key)
+            self.hits += 1
+            return score
+
+    def put_many(self, version: str, scores: Dict[PairKey, float],
+                 aliases: Iterable[Tuple[str, str]] = ()) -> None:
+        """Store scores, and remember which raw SMILES spellings map to which canonical form"""
+        with self._lock:
+            for pair, score in scores.items():
+                self._insert((version,) + pair, score)
+            for smiles, canonical in aliases:
+                self._aliases[smiles] = canonical
+                self._aliases.move_to_end(smiles)
+            # Aliases are cheap but unbounded input; keep them proportional to scores
+            while len(self._aliases) > 2 * self.max_entries:
+                self._aliases.popitem(last=False)
+            if self._db is not None and scores:
+                model = self._model(version)
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO scores (model, version, drug, target, score) VALUES (?, ?, ?, ?, ?)",
+                    [(model, version) + pair + (score,) for pair, score in scores.items()]
+                )
+                self._db.commit()
+
+    def purge_stale(self, versions: Iterable[str]) -> int:
+        """
+        Delete persisted scores of older checkpoints of the given current model
+        versions. Scores of other inference variants of a current checkpoint
+        are kept.
+        """
+        if self._db is None:
+            return 0
+        deleted = 0
+        with self._lock:
+            for version in versions:
+                model, checkpoint = self._model(version), self._checkpoint(version)
+                stale = [
+                    (model, stored) for (stored,) in self._db.execute(
+                        "SELECT DISTINCT version FROM scores WHERE model = ?", (model,)
+                    ).fetchall()
+                    if self._checkpoint(stored) != checkpoint
+                ]
+                for params in stale:
+                    deleted += self._db.execute("DELETE FROM scores WHERE model = ? AND version = ?", params).rowcount
+            self._db.commit()
+        return deleted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._scores.clear()
+            self._aliases.clear()
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._scores),
+            "aliases": len(self._aliases),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "persistent_path": self.path,
+        }
+
+
+score_cache = ScoreCache(
+    max_entries=config.SCORE_CACHE_MAX_ENTRIES,
+    path=config.SCORE_CACHE_PATH or None
+)
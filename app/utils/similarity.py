@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from rdkit import Chem, DataStructs
+from rdkit.Chem import AllChem
+
+from app import config
+from app.utils.executor import rdkit_pool
+from app.utils.file_lock import directory_lock
+from app.utils.metrics import stage_timer
+
+logger = logging.getLogger(__name__)
+
+FP_BITS = 2048
+FP_RADIUS = 2
+FP_WORDS = FP_BITS // 64
+# Rows scored per block, bounding the temporary arrays of a search
+SEARCH_BLOCK_ROWS = 131072
+
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount_rows(words: np.ndarray) -> np.ndarray:
+    """Number of set bits in each row of a 2D uint64 array"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int32)
+    return _POPCOUNT_TABLE[words.view(np.uint8)].sum(axis=1, dtype=np.int32)
+
+
+def packed_fingerprint(mol) -> np.ndarray:
+    """Morgan fingerprint of a molecule packed into FP_WORDS uint64 words"""
+    bits = np.zeros((FP_BITS,), dtype=np.uint8)
+    DataStructs.ConvertToNumpyArray(AllChem.GetMorganFingerprintAsBitVect(mol, FP_RADIUS, nBits=FP_BITS), bits)
+    return np.packbits(bits).view(np.uint64)
+
+
+def fingerprint_smiles(smiles_list: List[str]) -> Tuple[List[str], np.ndarray]:
+    """
+    Canonical SMILES and packed fingerprints of the valid inputs; runs inside
+    pool workers. Invalid SMILES are skipped.
+    """
+    canonical = []
+    rows = []
+    for smiles in smiles_list:
+        mol = Chem.MolFromSmiles(smiles) if smiles else None
+        if mol is None:
+            continue
+        canonical.append(Chem.MolToSmiles(mol))
+        rows.append(packed_fingerprint(mol))
+    if not rows:
+        return [], np.zeros((0, FP_WORDS), dtype=np.uint64)
+    return canonical, np.vstack(rows)
+
+
+class FingerprintIndex:
+    """
+    Morgan fingerprint index for bulk Tanimoto search.
+
+    Fingerprints are stored as packed uint64 rows with precomputed popcounts;
+    a search ANDs the query against every row and derives Tanimoto from
+    popcounts, in blocks. A saved index is reopened memory-mapped, and new
+    compounds go to an in-memory segment until the next save. Compounds are
+    deduplicated by canonical SMILES.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._base = np.zeros((0, FP_WORDS), dtype=np.uint64)
+        self._base_counts = np.zeros((0,), dtype=np.int32)
+        self._extra = np.zeros((1024, FP_WORDS), dtype=np.uint64)
+        self._extra_counts = np.zeros((1024,), dtype=np.int32)
+        self._extra_size = 0
+        self._smiles: List[str] = []
+        self._known: Set[str] = set()
+        if path and os.path.exists(os.path.join(path, "fingerprints.npy")):
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._smiles)
+
+    def _load(self) -> None:
+        self._base = np.load(os.path.join(self.path, "fingerprints.npy"), mmap_mode="r")
+        self._base_counts = np.load(os.path.join(self.path, "counts.npy"), mmap_mode="r")
+        with open(os.path.join(self.path, "smiles.txt")) as f:
+            self._smiles = f.read().splitlines()
+        self._known = set(self._smiles)
+        logger.info("Opened fingerprint index with %d compounds", len(self._smiles))
+
+    def add_rows(self, smiles: List[str], rows: np.ndarray) -> int:
+        """Insert precomputed (canonical SMILES, packed fingerprint) rows; returns the number added"""
+        with self._lock:
+            keep = []
+            for i, s in enumerate(smiles):
+                if s not in self._known:
+                    self._known.add(s)
+                    keep.append(i)
+            if not keep:
+                return 0
+            new_rows = rows[keep]
+            needed = self._extra_size + len(keep)
+            if needed > len(self._extra):
+                capacity = max(needed, 2 * len(self._extra))
+                extra = np.zeros((capacity, FP_WORDS), dtype=np.uint64)
+                extra[:self._extra_size] = self._extra[:self._extra_size]
+                counts = np.zeros((capacity,), dtype=np.int32)
+                counts[:self._extra_size] = self._extra_counts[:self._extra_size]
+                self._extra, self._extra_counts = extra, counts
+            self._extra[self._extra_size:needed] = new_rows
+            self._extra_counts[self._extra_size:needed] = popcount_rows(new_rows)
+            self._extra_size = needed
+            self._smiles.extend(smiles[i] for i in keep)
+            return len(keep)
+
+    def add(self, smiles_list: List[str]) -> int:
+        """Fingerprint and insert SMILES in this thread"""
+        return self.add_rows(*fingerprint_smiles(smiles_list))
+
+    def search(self, smiles: str, threshold: float = 0.0, top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Compounds with Tanimoto similarity >= threshold to smiles, best first.
+
+        Raises:
+            ValueError: if smiles cannot be parsed
+        """
+        with stage_timer("similarity_search"):
+            return self._search(smiles, threshold, top_k)
+
+    def _search(self, smiles: str, threshold: float, top_k: Optional[int]) -> List[Dict[str, Any]]:
+        mol = Chem.MolFromSmiles(smiles)
+        if mol is None:
+            raise ValueError("Invalid SMILES string")
+        query = packed_fingerprint(mol)
+        query_count = int(popcount_rows(query[None, :])[0])
+
+        with self._lock:
+            segments = [(self._base, self._base_counts, 0),
+                        (self._extra[:self._extra_size], self._extra_counts[:self._extra_size], len(self._base))]
+            smiles_table = self._smiles
+
+        hit_rows = []
+        hit_scores = []
+        for rows, counts, offset in segments:
+            for start in range(0, len(rows), SEARCH_BLOCK_ROWS):
+                block = np.asarray(rows[start:start + SEARCH_BLOCK_ROWS])
+                common = popcount_rows(block & query)
+                union = np.asarray(counts[start:start + SEARCH_BLOCK_ROWS]) + query_count - common
+                scores = np.divide(common, union, out=np.zeros(len(block)), where=union > 0)
+                matches = np.nonzero(scores >= threshold)[0]
+                if top_k is not None and len(matches) > top_k:
+                    matches = matches[np.argpartition(-scores[matches], top_k - 1)[:top_k]]
+                hit_rows.append(matches + offset + start)
+                hit_scores.append(scores[matches])
+
+        if not hit_rows:
+            return []
+        rows = np.concatenate(hit_rows)
+        scores = np.concatenate(hit_scores)
+        order = np.lexsort((rows, -scores))
+        if top_k is not None:
+            order = order[:top_k]
+        return [{"smiles": smiles_table[i], "similarity": round(float(scores[j]), 4)}
+                for j, i in zip(order, rows[order])]
+
+    def save(self) -> None:
+        """
+        Merge all compounds into the index at `path` and reopen it memory-mapped.
+
+        Other processes may have saved to the same path since this one loaded
+        it, so what is on disk now is kept and only compounds it lacks are
+        added, under a lock held across processes.
+        """
+        if not self.path:
+            return
+        with directory_lock(self.path), self._lock:
+            rows = np.concatenate([np.asarray(self._base), self._extra[:self._extra_size]])
+            counts = np.concatenate([np.asarray(self._base_counts), self._extra_counts[:self._extra_size]])
+            smiles = self._smiles
+            if os.path.exists(os.path.join(self.path, "fingerprints.npy")):
+                with open(os.path.join(self.path, "smiles.txt")) as f:
+                    saved = f.read().splitlines()
+                saved_set = set(saved)
+                new = [i for i, s in enumerate(smiles) if s not in saved_set]
+                rows = np.concatenate([np.load(os.path.join(self.path, "fingerprints.npy")), rows[new]])
+                counts = np.concatenate([np.load(os.path.join(self.path, "counts.npy")), counts[new]])
+                smiles = saved + [smiles[i] for i in new]
+            # Write then rename so readers never see a half-written index
+            for name, array in (("fingerprints.npy", rows), ("counts.npy", counts)):
+                tmp = os.path.join(self.path, name + ".tmp")
+                with open(tmp, "wb") as f:
+                    np.save(f, array)
+                os.replace(tmp, os.path.join(self.path, name))
+            tmp = os.path.join(self.path, "smiles.txt.tmp")
+            with open(tmp, "w") as f:
+                f.write("".join(s + "\n" for s in smiles))
+            os.replace(tmp, os.path.join(self.path, "smiles.txt"))
+            self._load()
+            self._extra_size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "compounds": len(self._smiles),
+            "memory_mapped": len(self._base),
+            "in_memory": self._extra_size,
+            "fingerprint": f"Morgan radius {FP_RADIUS}, {FP_BITS} bits",
+            "path": self.path,
+        }
+
+
+similarity_index = FingerprintIndex(config.SIMILARITY_INDEX_PATH or None)
+
+# Background inserts are referenced here until they finish
+_pending_inserts: Set[asyncio.Task] = set()
+
+
+async def index_compounds(smiles_list: List[str]) -> int:
+    """Fingerprint SMILES in the RDKit pool and add them to the index"""
+    if not smiles_list:
+        return 0
+    canonical, rows = await rdkit_pool.run(fingerprint_smiles, list(smiles_list))
+    return similarity_index.add_rows(canonical, rows)
+
+
+def schedule_index(smiles_list: List[str]) -> None:
+    """Add compounds to the index in the background without delaying the response"""
+    task = asyncio.ensure_future(index_compounds(smiles_list))
+    _pending_inserts.add(task)
+    task.add_done_callback(_pending_inserts.discard)
@@ -0,0 +1,72 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from app.utils.metrics import metrics
+
+COALESCED = metrics.counter(
+    "drug_api_coalesced_calls", "Calls that joined an identical call already in flight", ("flight",)
+)
+EXECUTED = metrics.counter(
+    "drug_api_single_flight_calls", "Calls that ran because no identical call was in flight", ("flight",)
+)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one computation.
+
+    The first call for a key starts `fn()` as its own task; calls with the
+    same key arriving before it finishes await that task instead of starting
+    another. Every caller gets the same result object (so it must not be
+    mutated) or the same exception. Because the computation is a separate
+    task, a caller that disconnects does not cancel it for the others. Keys
+    are forgotten as soon as the computation finishes; caching results is
+    left to the caches behind it.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.executed += 1
+            EXECUTED.inc(self.name)
+        else:
+            self.coalesced += 1
+            COALESCED.inc(self.name)
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark a failure as retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.executed + self.coalesced
+        return {
+            "in_flight": len(self._calls),
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "coalesced_rate": round(self.coalesced / calls, 4) if calls else 0.0,
+        }
+
+
+# Every SingleFlight created through single_flight(), by name
+flights: Dict[str, SingleFlight] = {}
+
+
+def single_flight(name: str) -> SingleFlight:
+    """The process-wide SingleFlight called `name`, created on first use"""
+    flight = flights.get(name)
+    if flight is None:
+        flight = flights[name] = SingleFlight(name)
+    return flight
@@ -0,0 +1,71 @@
+"""
+Import-time accounting and readiness state.
+
+Heavy optional dependencies (DeepPurpose, and through it torch) are loaded
+with `import_tracker.load` at first use or on warm-up instead of at module
+import, so a process that only serves RDKit endpoints never pays for them.
+Every module loaded this way, and every router main.py mounts, is timed for
+the startup report served at /health/ready.
+"""
+import importlib
+import logging
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Modules whose presence in sys.modules is reported as a loaded subsystem
+SUBSYSTEM_MODULES = {
+    "rdkit": "rdkit",
+    "torch": "torch",
+    "deeppurpose": "DeepPurpose.DTI",
+}
+
+
+class ImportTracker:
+    """Timed, thread-safe imports plus the process's startup milestones"""
+
+    def __init__(self):
+        self.created = time.perf_counter()
+        self.ready_seconds: Optional[float] = None
+        self._times: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def load(self, name: str) -> ModuleType:
+        """Import a module, recording how long the first import took"""
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        with self._lock:
+            module = sys.modules.get(name)
+            if module is not None:
+                # Imported by another thread while this one waited
+                return module
+            start = time.perf_counter()
+            module = importlib.import_module(name)
+            seconds = time.perf_counter() - start
+            self._times[name] = round(seconds, 4)
+        logger.info("Imported %s in %.2fs", name, seconds)
+        return module
+
+    def mark_ready(self) -> None:
+        self.ready_seconds = round(time.perf_counter() - self.created, 3)
+
+    @property
+    def ready(self) -> bool:
+        return self.ready_seconds is not None
+
+    def subsystems(self) -> Dict[str, bool]:
+        return {name: module in sys.modules for name, module in SUBSYSTEM_MODULES.items()}
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "ready_after_seconds": self.ready_seconds,
+            "import_seconds": dict(sorted(self._times.items(), key=lambda item: -item[1])),
+        }
+
+
+import_tracker = ImportTracker()
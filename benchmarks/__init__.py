@@ -0,0 +1,11 @@
+"""
+Benchmark and load-test suite for the Drug Analysis API.
+
+    python -m benchmarks micro            # function-level benchmarks
+    python -m benchmarks load             # in-process HTTP load test
+    python -m benchmarks all --compare benchmarks/baselines/local.json
+    python -m benchmarks all --save benchmarks/baselines/local.json
+
+Runs use the fixed corpus in benchmarks.corpus, so numbers are comparable
+across commits on the same machine.
+"""
@@ -0,0 +1,63 @@
+import argparse
+import asyncio
+import json
+import platform
+import sys
+
+from benchmarks.stats import find_regressions, format_table, load_baseline, save_baseline
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks and load tests")
+    parser.add_argument("suite", choices=("micro", "load", "all"))
+    parser.add_argument("--rounds", type=int, default=20, help="Micro-benchmark passes over the corpus")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per load scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients per load scenario")
+    parser.add_argument("--scenario", action="append", help="Only run these load scenarios")
+    parser.add_argument("--no-binding", action="store_true", help="Skip benchmarks that need a binding model")
+    parser.add_argument("--agentai-latency-ms", type=float, default=50.0, help="Latency of the AgentAI stub")
+    parser.add_argument("--cached", action="store_true",
+                        help="Let load scenarios hit the result, score and encoding caches")
+    parser.add_argument("--save", metavar="PATH", help="Write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed relative p95/throughput change before flagging a regression")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    results = {}
+    if args.suite in ("micro", "all"):
+        from benchmarks.micro import run_micro
+        results.update(run_micro(args.rounds, binding=not args.no_binding))
+    if args.suite in ("load", "all"):
+        from benchmarks.load import run_load
+        results.update(asyncio.run(run_load(
+            args.requests, args.concurrency, args.scenario,
+            binding=not args.no_binding, agentai_latency_ms=args.agentai_latency_ms,
+            cached=args.cached
+        )))
+
+    print(json.dumps(results, indent=2) if args.json else format_table(results))
+
+    status = 0
+    if args.compare:
+        baseline = load_baseline(args.compare)
+        if baseline is None:
+            print(f"\nNo baseline at {args.compare}", file=sys.stderr)
+        else:
+            regressions = find_regressions(results, baseline.get("results", baseline), args.tolerance)
+            if regressions:
+                print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+                for line in regressions:
+                    print(f"  {line}")
+                status = 1
+            else:
+                print(f"\nNo regressions beyond {args.tolerance:.0%}")
+    if args.save:
+        save_baseline(args.save, {"machine": platform.platform(), "python": platform.python_version(),
+                                  "results": results})
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
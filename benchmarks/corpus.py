@@ -0,0 +1,43 @@
+"""Fixed inputs for every benchmark; change them only together with the baselines"""
+
+# Approved drugs and common scaffolds of varying size and polarity
+SMILES = (
+    "CC(=O)OC1=CC=CC=C1C(=O)O",                      # aspirin
+    "CC(C)CC1=CC=C(C=C1)C(C)C(=O)O",                 # ibuprofen
+    "CC(=O)NC1=CC=C(C=C1)O",                         # paracetamol
+    "CN1C=NC2=C1C(=O)N(C(=O)N2C)C",                  # caffeine
+    "CN1CCN(CC1)CC2=CC=C(C=C2)C(=O)NC3=CC(=C(C=C3)C)NC4=NC=CC(=N4)C5=CN=CC=C5",  # imatinib
+    "COC1=CC2=C(C=C1)C(=CN2)CCN",                    # 5-methoxytryptamine
+    "CC12CCC3C(C1CCC2O)CCC4=CC(=O)CCC34C",           # testosterone
+    "CN(C)CCCN1C2=CC=CC=C2CCC3=CC=CC=C31",           # imipramine
+    "C1=CC=C(C=C1)C2=CC(=O)C3=C(C=C(C=C3O2)O)O",     # chrysin
+    "CC(C)NCC(COC1=CC=CC2=CC=CC=C21)O",              # propranolol
+    "CN1CCC23C4C1CC5=C2C(=C(C=C5)O)OC3C(C=C4)O",     # morphine
+    "CC1=C(C=C(C=C1)NC(=O)C2=CC=C(C=C2)CN3CCN(CC3)C)NC4=NC=CC(=N4)C5=CN=CC=C5",  # imatinib isomer
+    "C1CCC(CC1)NC(=O)NS(=O)(=O)C2=CC=C(C=C2)CCNC(=O)C3=NC=C(N=C3)C",  # glipizide-like
+    "CC(C)(C)NCC(C1=CC(=C(C=C1)O)CO)O",              # salbutamol
+    "CN1C(=O)CN=C(C2=C1C=CC(=C2)Cl)C3=CC=CC=C3",     # diazepam
+    "C1=CC(=CC=C1C(=O)O)N",                          # 4-aminobenzoic acid
+    "CCOC(=O)C1=C(NC(=C(C1C2=CC=CC=C2Cl)C(=O)OC)C)COCCN",  # amlodipine
+    "CC(C)C1=C(C(=C(N1CCC(CC(CC(=O)O)O)O)C2=CC=C(C=C2)F)C3=CC=CC=C3)C(=O)NC4=CC=CC=C4",  # atorvastatin
+    "COC1=C(C=C2C(=C1)N=CN=C2NC3=CC(=C(C=C3)F)Cl)OCCCN4CCOCC4",  # gefitinib
+    "C1=CC=C2C(=C1)C=CC=C2",                         # naphthalene
+    "OC(=O)CCCCCCCCCCCCCCC",                         # palmitic acid
+    "CC1=CC=C(C=C1)S(=O)(=O)N",                      # toluenesulfonamide
+    "C1CCNCC1",                                      # piperidine
+    "c1ccncc1",                                      # pyridine
+)
+
+INVALID_SMILES = ("not_a_smiles", "C1CC")
+
+# Protein targets: the API's example sequence, human ubiquitin and human lysozyme
+TARGETS = (
+    "MRGPGAGVLVVGVGVGVGVGVGVGV",
+    "MQIFVKTLTGKTITLEVEPSDTIENVKAKIQDKEGIPPDQQRLIFAGKQLEDGRTLSDYNIQKESTLHLVLRLRGG",
+    "KVFERCELARTLKRLGMDGYRGISLANWMCLAKWESGYNTRATNYNAGDRSTDYGIFQINSRYWCNDGKTPGAVNACHLSCSALLQDNIADAVACAKRVVRDPQGIRAWVAWRNRCQNRDVRQYVQGCGV",
+)
+
+QUESTION = "Summarize the drug-likeness and binding of this molecule"
+
+# Canned AgentAI reply served by the load test's stub transport
+AGENTAI_REPLY = {"response": "Stub analysis: drug-like, moderate predicted affinity."}
@@ -0,0 +1,152 @@
+"""
+In-process load generator against the FastAPI app.
+
+Requests go through httpx's ASGI transport, so the full middleware, routing
+and serialization stack is exercised without a network or a server process.
+The app's lifespan runs as in production (RDKit pool, model preload), and
+AgentAI is replaced by a local stub so LLM latency is fixed and free.
+
+Most scenarios replay the same small corpus, so after the first pass they
+would only measure cache hits. Unless `cached` is set, those scenarios run
+with the result and score caches keeping nothing and the encoding cache
+emptied before every request. The disk-backed cache layers are not touched:
+leave DRUG_API_SCORE_CACHE_PATH and DRUG_API_ENCODING_CACHE_PATH unset for
+cold numbers.
+"""
+import asyncio
+import contextlib
+import itertools
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.corpus import AGENTAI_REPLY, QUESTION, SMILES, TARGETS
+from benchmarks.stats import summarize
+
+# name -> (method, path, request kwargs for the i-th request)
+Scenario = Tuple[str, str, Callable[[int], Dict[str, Any]]]
+
+
+def _smiles(i: int) -> str:
+    return SMILES[i % len(SMILES)]
+
+
+def _target(i: int) -> str:
+    return TARGETS[i % len(TARGETS)]
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "lipinski": ("POST", "/lipinski/", lambda i: {"json": {"smiles": _smiles(i)}}),
+    "admet": ("POST", "/admet/", lambda i: {"json": {"smiles": _smiles(i)}}),
+    "lipinski_batch_240": ("POST", "/lipinski/batch", lambda i: {"json": {"smiles": list(SMILES) * 10}}),
+    "admet_batch_240": ("POST", "/admet/batch", lambda i: {"json": {"smiles": list(SMILES) * 10}}),
+    "generate_5": ("GET", "/generate/", lambda i: {"params": {"num_samples": 5, "seed": i}}),
+    "similarity": ("POST", "/similarity/", lambda i: {"json": {"smiles": _smiles(i), "threshold": 0.3}}),
+    "agentai": ("POST", "/agentai/", lambda i: {"json": {
+        "instructions": f"{QUESTION} #{i}", "drug_data": {"drug_smiles": _smiles(i)}
+    }}),
+    "binding": ("POST", "/binding/", lambda i: {"json": {"drug": _smiles(i), "target": _target(i)}}),
+    "agent": ("POST", "/agent/", lambda i: {"json": {
+        "smiles": _smiles(i), "target": _target(i), "question": f"{QUESTION} #{i}"
+    }}),
+    "metrics": ("GET", "/metrics", lambda i: {}),
+}
+
+# Scenarios that need a binding model loaded
+BINDING_SCENARIOS = ("binding", "agent")
+
+# Scenarios whose repeated inputs would otherwise be served from the caches
+UNCACHED_SCENARIOS = ("lipinski", "admet", "lipinski_batch_240", "admet_batch_240", "binding", "agent")
+
+
+@contextlib.contextmanager
+def caches_disabled():
+    """Make the in-memory result, score and encoding caches keep nothing while active"""
+    from app.utils.encoding_cache import encoding_cache
+    from app.utils.result_cache import result_cache
+    from app.utils.score_cache import score_cache
+
+    limits = result_cache.max_entries, score_cache.max_entries, encoding_cache.max_bytes
+    for cache in (result_cache, score_cache, encoding_cache):
+        cache.clear()
+    result_cache.max_entries = score_cache.max_entries = encoding_cache.max_bytes = 0
+    try:
+        yield
+    finally:
+        result_cache.max_entries, score_cache.max_entries, encoding_cache.max_bytes = limits
+
+
+def _clear_encodings() -> None:
+    from app.utils.encoding_cache import encoding_cache
+
+    # A zero byte budget still keeps the newest entry
+    encoding_cache.clear()
+
+
+def agentai_stub(latency_ms: float) -> httpx.MockTransport:
+    """Transport answering every AgentAI call with a canned reply after `latency_ms`"""
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        return httpx.Response(200, json=AGENTAI_REPLY)
+
+    return httpx.MockTransport(handler)
+
+
+async def _run_scenario(client: httpx.AsyncClient, scenario: Scenario, requests: int,
+                        concurrency: int, before: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    method, path, make = scenario
+    counter = itertools.count()
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while True:
+            i = next(counter)
+            if i >= requests:
+                return
+            if before is not None:
+                before()
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, **make(i))
+                if response.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+async def run_load(requests: int = 200, concurrency: int = 16, scenarios: Optional[List[str]] = None,
+                   binding: bool = True, agentai_latency_ms: float = 50.0,
+                   cached: bool = False) -> Dict[str, Dict[str, float]]:
+    from app.main import app
+    from app.utils.agentai_client import agentai_client
+    from app.utils.similarity import index_compounds
+
+    names = scenarios or [name for name in SCENARIOS if binding or name not in BINDING_SCENARIOS]
+    await agentai_client.configure(url="http://agentai.stub/invoke", transport=agentai_stub(agentai_latency_ms))
+    # Every call reaches the stub instead of the answer cache
+    agentai_client.cache_ttl = 0
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        await index_compounds(list(SMILES))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            for name in names:
+                uncached = not cached and name in UNCACHED_SCENARIOS
+                with caches_disabled() if uncached else contextlib.nullcontext():
+                    before = _clear_encodings if uncached else None
+                    # Warm-up pass so one-off loads and first parses are not measured
+                    await _run_scenario(client, SCENARIOS[name], min(requests, concurrency), concurrency, before)
+                    results[f"load.{name}"] = await _run_scenario(
+                        client, SCENARIOS[name], requests, concurrency, before
+                    )
+    return results
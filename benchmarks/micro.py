@@ -0,0 +1,94 @@
+"""Function-level benchmarks of the hot paths, run in this process"""
+import random
+import time
+from typing import Callable, Dict, List, Sequence
+
+from benchmarks.corpus import SMILES, TARGETS
+from benchmarks.stats import summarize
+
+
+def bench(fn: Callable, inputs: Sequence, rounds: int) -> Dict[str, float]:
+    """Call fn on every input `rounds` times, timing each call"""
+    latencies: List[float] = []
+    errors = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for item in inputs:
+            call_start = time.perf_counter()
+            try:
+                fn(item)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - call_start)
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+def run_descriptors(rounds: int) -> Dict[str, Dict[str, float]]:
+    from app.utils.molecule_utils import (
+        check_drug_likeness, check_drug_likeness_batch, predict_admet, predict_admet_batch
+    )
+
+    library = list(SMILES) * 40
+    return {
+        "micro.check_drug_likeness": bench(check_drug_likeness, SMILES, rounds),
+        "micro.predict_admet": bench(predict_admet, SMILES, rounds),
+        "micro.check_drug_likeness_batch_960": bench(check_drug_likeness_batch, [library], max(1, rounds // 10)),
+        "micro.predict_admet_batch_960": bench(predict_admet_batch, [library], max(1, rounds // 10)),
+    }
+
+
+def run_generation(rounds: int) -> Dict[str, Dict[str, float]]:
+    from app.utils.molecule_utils import generate_molecule
+
+    seeds = list(range(10))
+    return {
+        "micro.generate_molecule_10": bench(
+            lambda seed: generate_molecule(10, rng=random.Random(seed)), seeds, max(1, rounds // 5)
+        ),
+        "micro.generate_molecule_seeded_template": bench(
+            lambda seed: generate_molecule(5, "CC(=O)OC1=CC=CC=C1C(=O)O", random.Random(seed)),
+            seeds, max(1, rounds // 5)
+        ),
+    }
+
+
+def run_binding(rounds: int, model_type: str = "CNN") -> Dict[str, Dict[str, float]]:
+    """Preprocessing (canonicalize + encode, caches cleared) and model.predict on fixed pairs"""
+    from app.utils.binding_utils import canonical_smiles, encode_drugs, encode_targets, score_encoded
+    from app.utils.encoding_cache import encoding_cache
+    from app.utils.model_registry import registry
+
+    model = registry.get(model_type)
+    drugs = list(SMILES)
+    pairs_drugs = [d for _ in TARGETS for d in drugs]
+    pairs_targets = [t for t in TARGETS for _ in drugs]
+
+    def preprocess(_):
+        encoding_cache.clear()
+        canonical = canonical_smiles(drugs)
+        encode_drugs(model.drug_encoding, list(canonical.values()))
+        encode_targets(model.target_encoding, list(TARGETS))
+
+    drug_encodings = encode_drugs(model.drug_encoding, drugs)
+    target_encodings = encode_targets(model.target_encoding, list(TARGETS))
+
+    def predict(_):
+        score_encoded(model, pairs_drugs, pairs_targets, drug_encodings, target_encodings)
+
+    def predict_single(index):
+        score_encoded(model, [drugs[index]], [TARGETS[0]], drug_encodings, target_encodings)
+
+    return {
+        f"micro.binding_preprocess_{len(drugs)}x{len(TARGETS)}": bench(preprocess, [None], max(1, rounds // 5)),
+        f"micro.binding_predict_{len(pairs_drugs)}_pairs": bench(predict, [None], max(1, rounds // 5)),
+        "micro.binding_predict_single_pair": bench(predict_single, range(len(drugs)), max(1, rounds // 10)),
+    }
+
+
+def run_micro(rounds: int = 20, binding: bool = True) -> Dict[str, Dict[str, float]]:
+    results = {}
+    results.update(run_descriptors(rounds))
+    results.update(run_generation(rounds))
+    if binding:
+        results.update(run_binding(rounds))
+    return results
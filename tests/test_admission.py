@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+from app.utils.admission import (
+    AI,
+    BATCH,
+    INTERACTIVE,
+    AdmissionController,
+    AdmissionMiddleware,
+    Limiter,
+    Rejected,
+    parse_route_limits,
+)
+from app.utils.metrics import MetricsMiddleware, metrics
+
+
+def test_full_queue_is_rejected_with_429():
+    limiter = Limiter("batch", limit=1, max_queue=1, max_wait=1.0)
+
+    async def main():
+        await limiter.acquire()
+        waiting = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Rejected) as rejected:
+            await limiter.acquire()
+        limiter.release()
+        await waiting
+        return rejected.value
+
+    rejection = asyncio.run(main())
+
+    assert rejection.status_code == 429
+    assert rejection.retry_after >= 1
+    assert limiter.active == 1
+
+
+def test_waiting_past_the_deadline_is_rejected_with_503():
+    limiter = Limiter("ai", limit=1, max_queue=4, max_wait=0.01)
+
+    async def main():
+        await limiter.acquire()
+        with pytest.raises(Rejected) as rejected:
+            await limiter.acquire()
+        return rejected.value
+
+    assert asyncio.run(main()).status_code == 503
+    assert limiter.queued == 0
+    assert limiter.active == 1
+
+
+def test_released_slots_go_to_waiters_in_arrival_order():
+    limiter = Limiter("interactive", limit=1, max_queue=4, max_wait=1.0)
+    order = []
+
+    async def request(name):
+        await limiter.acquire()
+        order.append(name)
+        await asyncio.sleep(0.01)
+        limiter.release(0.01)
+
+    async def main():
+        await asyncio.gather(*(request(name) for name in "abc"))
+
+    asyncio.run(main())
+
+    assert order == ["a", "b", "c"]
+    assert limiter.active == 0
+    assert limiter.admitted == 3
+
+
+def test_paths_map_to_classes_and_route_limits():
+    controller = AdmissionController(
+        {INTERACTIVE: (8, 8, 1.0), BATCH: (2, 4, 5.0), AI: (2, 4, 5.0)},
+        parse_route_limits(["/generate/stream=1"])
+    )
+
+    assert controller.limiter_for("/lipinski/").name == INTERACTIVE
+    assert controller.limiter_for("/lipinski/batch").name == BATCH
+    assert controller.limiter_for("/agentai/").name == AI
+    assert controller.limiter_for("/generate/").name == BATCH
+    route = controller.limiter_for("/generate/stream")
+    assert (route.name, route.limit, route.max_wait) == ("/generate/stream", 1, 5.0)
+    assert controller.limiter_for("/agent/").name == AI
+    assert controller.limiter_for("/health/ready") is None
+    assert controller.limiter_for("/") is None
+
+
+@pytest.mark.parametrize("path", [
+    "/agentai/stats", "/binding/queue", "/binding/encoding-cache", "/binding/models",
+    "/similarity/stats", "/query/stats", "/cache/stats", "/metrics",
+])
+def test_stats_routes_bypass_admission(path):
+    controller = AdmissionController({INTERACTIVE: (0, 0, 1.0), BATCH: (0, 0, 1.0), AI: (0, 0, 1.0)})
+
+    assert controller.limiter_for(path) is None
+
+
+def test_invalid_route_limits_are_refused():
+    with pytest.raises(ValueError):
+        parse_route_limits(["generate=2"])
+
+
+def test_middleware_rejects_with_retry_after():
+    controller = AdmissionController({INTERACTIVE: (0, 0, 1.0)})
+    messages = []
+
+    async def app(scope, receive, send):
+        raise AssertionError("rejected requests must not reach the app")
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(AdmissionMiddleware(app, controller)({"type": "http", "path": "/lipinski/"}, None, send))
+
+    assert messages[0]["status"] == 429
+    assert (b"retry-after", b"1") in messages[0]["headers"]
+
+
+def test_rejections_are_labelled_by_limiter_in_request_metrics():
+    controller = AdmissionController({INTERACTIVE: (8, 8, 1.0), BATCH: (0, 0, 1.0), AI: (0, 0, 1.0)})
+
+    async def app(scope, receive, send):
+        raise AssertionError("rejected requests must not reach the app")
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "POST", "path": "/lipinski/batch"}
+    asyncio.run(MetricsMiddleware(AdmissionMiddleware(app, controller))(scope, None, send))
+
+    assert 'drug_api_requests_total{method="POST",route="admission:batch",status="429"}' in metrics.render()
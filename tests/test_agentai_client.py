@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from app.utils.agentai_client import AgentAIClient
+
+
+def reply(body):
+    return httpx.MockTransport(lambda request: httpx.Response(200, json=body))
+
+
+def test_configure_closes_the_old_connection_pool():
+    async def go():
+        client = AgentAIClient(url="http://first/invoke")
+        await client.configure(transport=reply({"answer": 1}))
+        old = client._get_client()
+        await client.configure(url="http://second/invoke", transport=reply({"answer": 2}))
+        answer = await client.invoke("question", "gpt4o")
+        await client.aclose()
+        return old, answer
+
+    old, answer = asyncio.run(go())
+
+    assert old.is_closed
+    assert answer == {"answer": 2}
+
+
+def test_streamed_analysis_is_one_event(monkeypatch):
+    pytest.importorskip("fastapi")
+    import json
+    from app.routes import agent_ai
+
+    client = AgentAIClient(url="http://stub/invoke", cache_ttl=0)
+    monkeypatch.setattr(agent_ai, "agentai_client", client)
+
+    async def go():
+        await client.configure(transport=reply({"response": "looks drug-like"}))
+        lines = [line async for line in agent_ai.stream_ai_events("question", {"drug_smiles": "CCO"}, "gpt4o")]
+        await client.aclose()
+        return lines
+
+    events = [json.loads(line) for line in asyncio.run(go())]
+
+    assert events == [{"event": "ai_analysis", "data": {"response": "looks drug-like"}}]
@@ -0,0 +1,28 @@
+from benchmarks.stats import find_regressions, percentile, summarize
+
+
+def test_percentiles_use_nearest_rank():
+    values = [i / 1000 for i in range(1, 101)]
+
+    assert percentile(values, 50) == 0.05
+    assert percentile(values, 99) == 0.099
+    assert summarize(values, elapsed=2.0)["throughput_per_sec"] == 50.0
+
+
+def test_slower_p95_and_lower_throughput_are_flagged():
+    baseline = {"load.lipinski": {"p95_ms": 10.0, "throughput_per_sec": 100.0, "errors": 0}}
+    current = {"load.lipinski": {"p95_ms": 13.0, "throughput_per_sec": 70.0, "errors": 0}}
+
+    regressions = find_regressions(current, baseline, tolerance=0.2)
+
+    assert len(regressions) == 2
+
+
+def test_changes_within_tolerance_and_new_benchmarks_pass():
+    baseline = {"load.lipinski": {"p95_ms": 10.0, "throughput_per_sec": 100.0, "errors": 0}}
+    current = {
+        "load.lipinski": {"p95_ms": 11.0, "throughput_per_sec": 95.0, "errors": 0},
+        "load.admet": {"p95_ms": 50.0, "throughput_per_sec": 1.0, "errors": 0},
+    }
+
+    assert find_regressions(current, baseline, tolerance=0.2) == []
@@ -0,0 +1,78 @@
+import pytest
+
+pytest.importorskip("rdkit")
+
+from rdkit import Chem
+
+from app.utils.compound_query import CompoundTable
+
+LIBRARY = [
+    "CC(=O)OC1=CC=CC=C1C(=O)O",
+    "CC(C)CC1=CC=C(C=C1)C(C)C(=O)O",
+    "CN1C=NC2=C1C(=O)N(C(=O)N2C)C",
+    "CC(=O)NC1=CC=C(C=C1)O",
+    "OC(=O)C1=CC=CC=C1O",
+    "C1=CC=C(C=C1)C(=O)O",
+    "CCO",
+    "CCN(CC)CC",
+    "C1CCCCC1",
+    "C1=CC=C2C=CC=CC2=C1",
+    "ClC1=CC=C(Cl)C=C1",
+    "CC(C)NCC(O)COC1=CC=CC2=CC=CC=C12",
+]
+PATTERNS = ["c1ccccc1", "C(=O)[OH]", "[NX3;H2,H1;!$(NC=O)]", "[#7]", "c[Cl]", "[CH3][CH2][OH]", "[R2]", "C=O"]
+
+
+def canonical_library():
+    return [Chem.MolToSmiles(Chem.MolFromSmiles(s)) for s in LIBRARY]
+
+
+def full_match(smiles, include=(), exclude=()):
+    mol = Chem.MolFromSmiles(smiles)
+    return (all(mol.HasSubstructMatch(Chem.MolFromSmarts(p)) for p in include)
+            and not any(mol.HasSubstructMatch(Chem.MolFromSmarts(p)) for p in exclude))
+
+
+@pytest.fixture(scope="module")
+def table():
+    table = CompoundTable()
+    table.add(LIBRARY)
+    return table
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_prescreen_gives_the_same_hits_as_full_matching(table, pattern):
+    result = table.query(smarts=[pattern], limit=None)
+
+    expected = [s for s in canonical_library() if full_match(s, include=[pattern])]
+    assert [r["smiles"] for r in result["results"]] == expected
+    assert result["stats"]["prescreen_pass"] >= len(expected)
+
+
+def test_combined_include_and_exclude(table):
+    result = table.query(smarts=["c1ccccc1"], exclude_smarts=["C(=O)[OH]"], limit=None)
+
+    expected = [s for s in canonical_library() if full_match(s, ["c1ccccc1"], ["C(=O)[OH]"])]
+    assert [r["smiles"] for r in result["results"]] == expected
+
+
+def test_invalid_smarts_is_an_error(table):
+    with pytest.raises(ValueError):
+        table.query(smarts=["[C"])
+
+
+def test_saves_from_separate_workers_are_merged(tmp_path):
+    first = CompoundTable(str(tmp_path))
+    second = CompoundTable(str(tmp_path))
+    first.add(LIBRARY[:8])
+    second.add(LIBRARY[5:])
+
+    first.save()
+    second.save()
+
+    merged = CompoundTable(str(tmp_path))
+    assert sorted(r["smiles"] for r in merged.query(limit=None)["results"]) == sorted(canonical_library())
+    assert [r["smiles"] for r in merged.query(smarts=["c[Cl]"], limit=None)["results"]] == \
+        [s for s in canonical_library() if full_match(s, include=["c[Cl]"])]
+    # The saving worker sees the merged table too
+    assert len(second) == len(LIBRARY)
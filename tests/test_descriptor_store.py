@@ -0,0 +1,65 @@
+import pytest
+
+pytest.importorskip("rdkit")
+
+from rdkit import Chem
+
+from app.utils import molecule_utils
+from app.utils.descriptor_store import DescriptorStore, ingest
+from app.utils.molecule_utils import DESCRIPTOR_COLUMNS, MoleculeContext, check_drug_likeness
+
+LIBRARY = [
+    "CC(=O)OC1=CC=CC=C1C(=O)O",
+    "OC(=O)c1ccccc1OC(C)=O",  # aspirin again, spelled differently
+    "CN1C=NC2=C1C(=O)N(C(=O)N2C)C",
+    "not_a_smiles",
+    "CCO",
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    library = tmp_path / "library.smi"
+    library.write_text("# test library\n" + "".join(f"{smiles} name{i}\n" for i, smiles in enumerate(LIBRARY)))
+    counts = ingest(str(tmp_path / "store"), [str(library)], workers=1, chunk_size=2)
+    assert counts == {"read": 5, "invalid": 1, "molecules": 3, "keys": 6}
+    return DescriptorStore(str(tmp_path / "store"))
+
+
+def computed(smiles):
+    ctx = MoleculeContext.from_mol(Chem.MolFromSmiles(smiles))
+    return {name: getattr(ctx, name) for name in DESCRIPTOR_COLUMNS}
+
+
+def test_ingested_descriptors_round_trip(store):
+    assert len(store) == 3
+    for smiles in (LIBRARY[0], LIBRARY[1], LIBRARY[2], LIBRARY[4]):
+        row = store.find(smiles)
+        assert row is not None
+        assert store.smiles(row) == Chem.MolToSmiles(Chem.MolFromSmiles(smiles))
+        assert store.descriptors(row) == pytest.approx(computed(smiles))
+    assert store.find(LIBRARY[0]) == store.find(LIBRARY[1])
+    assert store.find("CCN") is None
+
+
+def test_canonical_lookup_is_verified(store):
+    canonical = Chem.MolToSmiles(Chem.MolFromSmiles(LIBRARY[2]))
+
+    assert store.find_canonical(canonical) == store.find(LIBRARY[2])
+    assert store.find_canonical("CCN") is None
+
+
+def test_contexts_read_from_the_store(store, monkeypatch):
+    expected = check_drug_likeness(LIBRARY[0])
+    monkeypatch.setattr(molecule_utils, "descriptor_store", store)
+    hits, misses = store.hits, store.misses
+
+    # A spelling seen at ingest time needs no parse at all
+    ctx = MoleculeContext(LIBRARY[1])
+    assert check_drug_likeness(ctx) == expected
+    assert "mol" not in ctx.__dict__
+    # An unseen spelling is found by its canonical SMILES
+    assert MoleculeContext("C(C)O").stored == pytest.approx(computed("CCO"))
+    assert MoleculeContext("CCN").stored is None
+
+    assert (store.hits - hits, store.misses - misses) == (2, 1)
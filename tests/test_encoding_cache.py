@@ -0,0 +1,38 @@
+from app.utils.encoding_cache import EncodingCache
+
+
+def test_hits_and_misses_are_counted():
+    cache = EncodingCache(max_bytes=1024 * 1024)
+    cache.put_many("target", "CNN", {"MKV": ["M", "K", "V"]})
+
+    found = cache.get_many("target", "CNN", ["MKV", "MKL"])
+
+    assert found == {"MKV": ["M", "K", "V"]}
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_entries_are_separated_by_encoding():
+    cache = EncodingCache(max_bytes=1024 * 1024)
+    cache.put_many("drug", "CNN", {"CCO": "cnn"})
+
+    assert cache.get_many("drug", "Morgan", ["CCO"]) == {}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = EncodingCache(max_bytes=1)
+    cache.put_many("drug", "CNN", {"CCO": "a"})
+    cache.put_many("drug", "CNN", {"CCN": "b"})
+
+    assert cache.get_many("drug", "CNN", ["CCO", "CCN"]) == {"CCN": "b"}
+    assert cache.evictions == 1
+
+
+def test_persistent_store_warms_a_new_cache(tmp_path):
+    path = str(tmp_path / "encodings.sqlite")
+    EncodingCache(max_bytes=1024, path=path).put_many("target", "CNN", {"MKV": [1, 2, 3]})
+
+    restarted = EncodingCache(max_bytes=1024, path=path)
+
+    assert restarted.get_many("target", "CNN", ["MKV"]) == {"MKV": [1, 2, 3]}
+    assert restarted.disk_hits == 1
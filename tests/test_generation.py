@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("rdkit")
+
+from app.utils import generation
+from app.utils.executor import RDKitPool
+from app.utils.molecule_utils import generate_chunk
+
+
+def fake_chunks(chunks):
+    """rdkit_pool.run stand-in returning chunks[i] (or nothing) for chunk i"""
+    async def run(fn, seed, chunk_index, chunk_size, seed_smiles):
+        molecules = chunks[chunk_index] if chunk_index < len(chunks) else []
+        return molecules, chunk_size
+    return run
+
+
+def collect(**kwargs):
+    async def go():
+        return [entry async for entry in generation.stream_generated(**kwargs)]
+    return asyncio.run(go())
+
+
+def test_stops_once_chunks_stop_adding_molecules(monkeypatch):
+    monkeypatch.setattr(generation.rdkit_pool, "run", fake_chunks([["C", "CC"], ["CC", "C"], ["C"]]))
+
+    entries = collect(num_samples=1000, seed=1, chunk_size=2, stall_chunks=3)
+
+    assert [e["smiles"] for e in entries if e["type"] == "molecule"] == ["C", "CC"]
+    summary = entries[-1]
+    assert summary["exhausted"] is True
+    # Three chunks in a row without news, not the 10000 attempts allowed
+    assert summary["attempts"] == 8
+
+
+def test_dedup_only_covers_the_window(monkeypatch):
+    monkeypatch.setattr(generation.rdkit_pool, "run", fake_chunks([["C", "CC", "CCC"], ["C"]]))
+
+    entries = collect(num_samples=4, seed=1, chunk_size=3, dedup_window=2, stall_chunks=2)
+
+    # "C" left the two-molecule window, so it is emitted again
+    assert [e["smiles"] for e in entries if e["type"] == "molecule"] == ["C", "CC", "CCC", "C"]
+
+
+def seeded_campaign(monkeypatch, workers):
+    pool = RDKitPool(workers=workers)
+    pool.start()
+    monkeypatch.setattr(generation, "rdkit_pool", pool)
+    try:
+        entries = collect(num_samples=40, seed=11, chunk_size=8)
+    finally:
+        pool.shutdown()
+    return [e["smiles"] for e in entries if e["type"] == "molecule"], entries[-1]
+
+
+def test_same_seed_gives_same_sequence_for_any_worker_count(monkeypatch):
+    inline, inline_summary = seeded_campaign(monkeypatch, 0)
+    parallel, parallel_summary = seeded_campaign(monkeypatch, 3)
+
+    assert inline
+    assert parallel == inline
+    assert len(set(inline)) == len(inline)
+    assert parallel_summary["attempts"] == inline_summary["attempts"]
+
+
+def test_chunks_depend_only_on_seed_and_index():
+    assert generate_chunk(5, 2, 6) == generate_chunk(5, 2, 6)
+    assert generate_chunk(5, 2, 6) != generate_chunk(5, 3, 6)
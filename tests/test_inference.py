@@ -0,0 +1,23 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from app.utils.inference import capture_first_inputs  # noqa: E402
+
+
+def test_capture_keeps_first_inputs_without_changing_later_calls():
+    torch.manual_seed(0)
+    module = torch.nn.Linear(4, 1)
+    first, second = torch.randn(3, 4), torch.randn(5, 4)
+    expected = module(second)
+
+    captured, handle = capture_first_inputs(module)
+    try:
+        module(first)
+        output = module(second)
+    finally:
+        handle.remove()
+
+    assert torch.equal(captured["inputs"][0], first)
+    assert output.shape == (5, 1)
+    assert torch.equal(output, expected)
@@ -0,0 +1,106 @@
+import asyncio
+import time
+
+from app.utils.jobs import CANCELLED, COMPLETED, FAILED, QUEUED, RUNNING, JobRunner, JobStore
+
+
+def wait_for(store, job_id, states, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job["status"] in states:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} stuck in {store.get(job_id)['status']}")
+
+
+async def count_up(ctx):
+    for i in range(ctx.params["n"]):
+        await ctx.write([{"i": i}])
+    ctx.summary = {"n": ctx.params["n"]}
+
+
+async def sleep_forever(ctx):
+    await ctx.write([{"started": True}])
+    await asyncio.sleep(3600)
+
+
+async def fail(ctx):
+    raise RuntimeError("boom")
+
+
+def make_runner(workers=1):
+    runner = JobRunner(JobStore(), {"count": count_up, "sleep": sleep_forever, "fail": fail}, workers=workers)
+    runner.start()
+    return runner
+
+
+def test_results_are_paged_in_order_and_summary_is_stored():
+    runner = make_runner()
+    try:
+        job = runner.submit("count", {"n": 5})
+        done = wait_for(runner.store, job["id"], (COMPLETED,))
+
+        assert done["progress"] == 5
+        assert done["summary"] == {"n": 5}
+        assert runner.store.results(job["id"], offset=3, limit=10) == [{"i": 3}, {"i": 4}]
+    finally:
+        runner.stop()
+
+
+def test_failed_job_records_the_error():
+    runner = make_runner()
+    try:
+        job = runner.submit("fail", {})
+        failed = wait_for(runner.store, job["id"], (FAILED,))
+
+        assert failed["error"] == "boom"
+    finally:
+        runner.stop()
+
+
+def test_running_and_queued_jobs_can_be_cancelled():
+    runner = make_runner(workers=1)
+    try:
+        running = runner.submit("sleep", {})
+        wait_for(runner.store, running["id"], (RUNNING,))
+        queued = runner.submit("count", {"n": 1})
+
+        assert runner.cancel(queued["id"])["status"] == CANCELLED
+        assert runner.cancel(running["id"])["status"] == CANCELLED
+        # The worker is free again and the cancelled queued job never runs
+        later = runner.submit("count", {"n": 1})
+        wait_for(runner.store, later["id"], (COMPLETED,))
+        assert runner.store.get(queued["id"])["progress"] == 0
+    finally:
+        runner.stop()
+
+
+def test_higher_priority_jobs_start_first():
+    runner = make_runner(workers=1)
+    try:
+        blocker = runner.submit("sleep", {})
+        wait_for(runner.store, blocker["id"], (RUNNING,))
+        low = runner.submit("count", {"n": 1}, priority=0)
+        high = runner.submit("count", {"n": 1}, priority=5)
+        runner.cancel(blocker["id"])
+
+        wait_for(runner.store, low["id"], (COMPLETED,))
+        assert runner.store.get(high["id"])["finished_at"] <= runner.store.get(low["id"])["finished_at"]
+    finally:
+        runner.stop()
+
+
+def test_interrupted_jobs_are_requeued(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    store = JobStore(path)
+    job = store.create("count", {"n": 2})
+    store.update(job["id"], status=RUNNING)
+    store.append_results(job["id"], 0, [{"i": 0}])
+
+    recovered = JobStore(path).recover()
+
+    assert [j["id"] for j in recovered] == [job["id"]]
+    assert recovered[0]["status"] == QUEUED
+    assert recovered[0]["progress"] == 0
+    assert JobStore(path).results(job["id"]) == []
@@ -0,0 +1,68 @@
+import asyncio
+
+from app.utils.metrics import MetricsMiddleware, MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+    latency.observe(0.05, "parse")
+    latency.observe(0.5, "parse")
+    latency.observe(5.0, "parse")
+
+    text = registry.render()
+
+    assert 'latency_seconds_bucket{stage="parse",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{stage="parse",le="1"} 2' in text
+    assert 'latency_seconds_bucket{stage="parse",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{stage="parse"} 3' in text
+
+
+def test_worker_deltas_are_merged_and_reset():
+    worker = MetricsRegistry()
+    parent = MetricsRegistry()
+    for registry in (worker, parent):
+        registry.counter("hits", "Hits", ("cache",))
+        registry.histogram("latency_seconds", "Latency", buckets=(1.0,))
+    worker.counter("hits", "Hits", ("cache",)).inc("a", amount=2)
+    worker.histogram("latency_seconds", "Latency").observe(0.5)
+
+    parent.merge(worker.take_delta())
+    parent.merge(worker.take_delta())
+
+    text = parent.render()
+    assert 'hits_total{cache="a"} 2' in text
+    assert parent.counter("hits", "Hits", ("cache",)).value("a") == 2
+    assert "latency_seconds_count 1" in text
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    registry.counter("errors", "Errors", ("reason",)).inc('bad "quote"\n')
+
+    assert 'errors_total{reason="bad \\"quote\\"\\n"} 1' in registry.render()
+
+
+def test_counters_are_declared_under_their_sample_name():
+    registry = MetricsRegistry()
+    registry.counter("errors", "Errors").inc()
+
+    assert registry.render().splitlines()[:3] == [
+        "# HELP errors_total Errors", "# TYPE errors_total counter", "errors_total 1"
+    ]
+
+
+def test_middleware_counts_status_and_route():
+    async def app(scope, receive, send):
+        scope["endpoint"] = app
+        await send({"type": "http.response.start", "status": 404})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    middleware = MetricsMiddleware(app)
+    asyncio.run(middleware({"type": "http", "method": "GET", "path": "/x"}, None, send))
+
+    from app.utils.metrics import metrics
+    assert 'drug_api_requests_total{method="GET",route="app",status="404"}' in metrics.render()
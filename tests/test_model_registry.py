@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+from app.utils.model_registry import ModelRegistry
+
+
+def _checkpoint(root, dirname):
+    path = os.path.join(root, dirname)
+    os.makedirs(path)
+    for filename in ("config.pkl", "model.pt"):
+        with open(os.path.join(path, filename), "wb") as f:
+            f.write(b"x")
+
+
+def test_inference_mode_is_part_of_the_version(tmp_path):
+    _checkpoint(str(tmp_path), "model_Morgan_CNN_DAVIS")
+    eager = ModelRegistry(str(tmp_path), inference_mode="eager")
+    int8 = ModelRegistry(str(tmp_path), inference_mode="int8")
+
+    assert eager.version("Morgan_CNN_DAVIS").startswith("Morgan_CNN_DAVIS@1-")
+    assert int8.version("Morgan_CNN_DAVIS") == eager.version("Morgan_CNN_DAVIS") + "+int8"
+    assert int8.version("MPNN_CNN_DAVIS") == "MPNN_CNN_DAVIS@pretrained+int8"
+
+
+def test_unknown_inference_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ModelRegistry(str(tmp_path), inference_mode="fp16")
+
+
+def test_incomplete_checkpoint_is_reported_once(tmp_path, caplog):
+    path = os.path.join(str(tmp_path), "model_DeepDTA_DAVIS")
+    os.makedirs(path)
+    with open(os.path.join(path, "config.pkl"), "wb") as f:
+        f.write(b"x")
+    registry = ModelRegistry(str(tmp_path))
+
+    with caplog.at_level("WARNING", logger="app.utils.model_registry"):
+        assert registry.version("CNN_CNN_DAVIS") == "CNN_CNN_DAVIS@pretrained"
+        registry.resolve("CNN")
+
+    warnings = [r.getMessage() for r in caplog.records if "model_DeepDTA_DAVIS" in r.getMessage()]
+    assert len(warnings) == 1
+    assert "model.pt" in warnings[0]
@@ -0,0 +1,85 @@
+import pytest
+
+pytest.importorskip("rdkit")
+
+from app.utils import molecule_utils
+from app.utils.molecule_utils import (
+    MoleculeContext, check_drug_likeness, check_drug_likeness_batch, predict_admet, predict_admet_batch
+)
+
+ASPIRIN = "CC(=O)OC1=CC=CC=C1C(=O)O"
+
+
+def count_parses(monkeypatch):
+    calls = []
+    parse = molecule_utils.Chem.MolFromSmiles
+
+    def counting(smiles, *args):
+        calls.append(smiles)
+        return parse(smiles, *args)
+
+    monkeypatch.setattr(molecule_utils.Chem, "MolFromSmiles", counting)
+    return calls
+
+
+def test_shared_context_parses_once(monkeypatch):
+    expected = check_drug_likeness(ASPIRIN), predict_admet(ASPIRIN)
+    calls = count_parses(monkeypatch)
+
+    ctx = MoleculeContext(ASPIRIN)
+    results = check_drug_likeness(ctx), predict_admet(ctx)
+
+    assert results == expected
+    assert calls == [ASPIRIN]
+
+
+def test_context_descriptors_are_computed_once(monkeypatch):
+    ctx = MoleculeContext(ASPIRIN)
+    first = ctx.mol_weight
+    monkeypatch.setattr(molecule_utils.Descriptors, "ExactMolWt", lambda mol: pytest.fail("recomputed"))
+
+    assert ctx.mol_weight == first
+    assert check_drug_likeness(ctx)["molecular_weight"] == round(first, 3)
+
+
+def test_context_from_mol_skips_parsing(monkeypatch):
+    expected = check_drug_likeness(ASPIRIN)
+    mol = molecule_utils.Chem.MolFromSmiles(ASPIRIN)
+    calls = count_parses(monkeypatch)
+
+    assert check_drug_likeness(MoleculeContext.from_mol(mol)) == expected
+    assert calls == []
+
+
+def test_invalid_context_is_an_error():
+    ctx = MoleculeContext("not a smiles")
+
+    assert "error" in check_drug_likeness(ctx)
+    assert "error" in predict_admet(ctx)
+
+
+BATCH = [ASPIRIN, "not a smiles", "", "CCO"]
+
+
+def test_lipinski_batch_reports_errors_per_entry():
+    results = check_drug_likeness_batch(BATCH)
+
+    assert [r["smiles"] for r in results] == BATCH
+    assert [("error" in r) for r in results] == [False, True, True, False]
+    for smiles, result in zip(BATCH, results):
+        if "error" not in result:
+            single = check_drug_likeness(smiles)
+            assert {k: result[k] for k in ("molecular_weight", "logP", "HBD", "HBA", "drug_likeness")} == \
+                {k: single[k] for k in ("molecular_weight", "logP", "HBD", "HBA", "drug_likeness")}
+
+
+def test_admet_batch_reports_errors_per_entry():
+    results = predict_admet_batch(BATCH)
+
+    assert [r["smiles"] for r in results] == BATCH
+    assert [("error" in r) for r in results] == [False, True, True, False]
+    for smiles, result in zip(BATCH, results):
+        if "error" not in result:
+            single = predict_admet(smiles)
+            for section in ("absorption", "metabolism", "toxicity"):
+                assert result[section] == single[section]
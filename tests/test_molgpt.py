@@ -1,9 +1,29 @@
-# tests/test_molgpt.py
+import random
 
-from app.services.molgpt_service import generate_molecule
+import pytest
 
-def test_molgpt_generation():
-    result = generate_molecule("C")
-    assert isinstance(result, str)
-    assert len(result) > 0
-    print("Generated Molecule:", result)
+pytest.importorskip("rdkit")
+
+from app.utils.molecule_utils import check_drug_likeness, generate_molecule  # noqa: E402
+
+
+def test_generated_molecules_are_new_drug_like_smiles():
+    result = generate_molecule(5, rng=random.Random(7))
+
+    assert "error" not in result
+    molecules = result["generated_molecules"]
+    assert result["num_molecules"] == len(molecules) > 0
+    assert len(set(molecules)) == len(molecules)
+    for smiles in molecules:
+        assert check_drug_likeness(smiles)["drug_likeness"] == "Pass"
+
+
+def test_same_rng_seed_gives_same_molecules():
+    first = generate_molecule(5, rng=random.Random(3))
+    second = generate_molecule(5, rng=random.Random(3))
+
+    assert first["generated_molecules"] == second["generated_molecules"]
+
+
+def test_invalid_seed_smiles_is_an_error():
+    assert "error" in generate_molecule(1, seed_smiles="not_a_smiles")
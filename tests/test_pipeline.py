@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+import pytest
+
+from app.utils.pipeline import Pipeline, Stage
+
+
+def sleeper(value, delay):
+    async def fn(inputs):
+        await asyncio.sleep(delay)
+        return value
+    return fn
+
+
+def test_independent_stages_run_concurrently():
+    pipeline = Pipeline([
+        Stage("a", sleeper(1, 0.1)),
+        Stage("b", sleeper(2, 0.1)),
+        Stage("c", sleeper(3, 0.1)),
+    ])
+
+    start = time.perf_counter()
+    results = asyncio.run(pipeline.run())
+
+    assert results == {"a": 1, "b": 2, "c": 3}
+    assert time.perf_counter() - start < 0.25
+
+
+def test_dependent_stage_receives_inputs():
+    async def total(inputs):
+        return inputs["a"] + inputs["b"]
+
+    pipeline = Pipeline([
+        Stage("a", sleeper(1, 0)),
+        Stage("b", sleeper(2, 0)),
+        Stage("sum", total, deps=("a", "b")),
+    ])
+
+    assert asyncio.run(pipeline.run())["sum"] == 3
+    assert set(pipeline.timings()) == {"a", "b", "sum", "total_ms"}
+
+
+def test_failure_is_reraised_and_other_stages_cancelled():
+    async def fail(inputs):
+        raise ValueError("bad molecule")
+
+    slow_finished = []
+
+    async def slow(inputs):
+        await asyncio.sleep(1)
+        slow_finished.append(True)
+
+    pipeline = Pipeline([Stage("fail", fail), Stage("slow", slow)])
+
+    with pytest.raises(ValueError, match="bad molecule"):
+        asyncio.run(pipeline.run())
+    assert pipeline.failed_stage == "fail"
+    assert not slow_finished
+
+
+def test_iter_completed_yields_in_finish_order():
+    pipeline = Pipeline([
+        Stage("slow", sleeper("slow", 0.05)),
+        Stage("fast", sleeper("fast", 0)),
+    ])
+
+    async def collect():
+        return [name async for name, _ in pipeline.iter_completed()]
+
+    assert asyncio.run(collect()) == ["fast", "slow"]
+
+
+def test_stages_must_follow_their_dependencies():
+    with pytest.raises(ValueError):
+        Pipeline([Stage("b", sleeper(1, 0), deps=("a",)), Stage("a", sleeper(1, 0))])
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("rdkit")
+
+from app.utils import result_cache as result_cache_module
+from app.utils.result_cache import ResultCache, get_results
+
+ASPIRIN = "CC(=O)OC1=CC=CC=C1C(=O)O"
+ASPIRIN_AGAIN = "OC(=O)c1ccccc1OC(C)=O"
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResultCache(max_entries=10, ttl_seconds=0)
+    monkeypatch.setattr(result_cache_module, "result_cache", cache)
+    computed = []
+    compute = result_cache_module.compute_results
+
+    def counting(kinds, smiles):
+        computed.append(list(kinds))
+        return compute(kinds, smiles)
+
+    monkeypatch.setattr(result_cache_module, "compute_results", counting)
+    cache.computed = computed
+    return cache
+
+
+def test_second_spelling_is_served_from_the_cache(cache):
+    first = asyncio.run(get_results(("lipinski", "admet"), ASPIRIN))
+    second = asyncio.run(get_results(("lipinski", "admet"), ASPIRIN_AGAIN))
+
+    assert second == first
+    assert cache.computed == [["lipinski", "admet"]]
+    assert (cache.hits, cache.canonical_hits, cache.misses) == (0, 2, 2)
+
+    # Now a known spelling, answered without RDKit
+    asyncio.run(get_results(("lipinski",), ASPIRIN_AGAIN))
+    assert cache.hits == 1
+
+
+def test_only_missing_kinds_are_computed(cache):
+    asyncio.run(get_results(("lipinski",), ASPIRIN))
+    asyncio.run(get_results(("lipinski", "admet"), ASPIRIN_AGAIN))
+
+    assert cache.computed == [["lipinski"], ["admet"]]
+    assert cache.canonical_hits == 1
+
+
+def test_invalid_smiles_are_reported_and_not_cached(cache):
+    results = asyncio.run(get_results(("lipinski",), "not a smiles"))
+
+    assert "error" in results["lipinski"]
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,53 @@
+from app.utils.score_cache import ScoreCache, target_key
+
+
+def test_scores_are_separated_by_model_version():
+    cache = ScoreCache(max_entries=10)
+    pair = ("CCO", target_key("MKV"))
+    cache.put_many("CNN_CNN_DAVIS@1", {pair: 5.5})
+
+    assert cache.get_many("CNN_CNN_DAVIS@1", [pair]) == {pair: 5.5}
+    assert cache.get_many("CNN_CNN_DAVIS@2", [pair]) == {}
+
+
+def test_raw_spelling_is_answered_through_its_alias():
+    cache = ScoreCache(max_entries=10)
+    cache.put_many("m@1", {("CCO", target_key("MKV")): 6.0}, [("OCC", "CCO")])
+
+    assert cache.get_raw("m@1", "OCC", "MKV") == 6.0
+    assert cache.get_raw("m@1", "C(O)C", "MKV") is None
+
+
+def test_scores_survive_restart_and_stale_versions_are_purged(tmp_path):
+    path = str(tmp_path / "scores.db")
+    pair = ("CCO", target_key("MKV"))
+    ScoreCache(max_entries=10, path=path).put_many("m@1", {pair: 7.0})
+
+    cache = ScoreCache(max_entries=10, path=path)
+    assert cache.get_many("m@1", [pair]) == {pair: 7.0}
+    assert cache.disk_hits == 1
+
+    assert cache.purge_stale(["m@2"]) == 1
+    assert ScoreCache(max_entries=10, path=path).get_many("m@1", [pair]) == {}
+
+
+def test_purge_keeps_inference_variants_of_the_current_checkpoint(tmp_path):
+    cache = ScoreCache(max_entries=10, path=str(tmp_path / "scores.db"))
+    pair = ("CCO", target_key("MKV"))
+    for version in ("m@1", "m@1+int8", "m@2", "m@2+traced", "other@1"):
+        cache.put_many(version, {pair: 1.0})
+    cache.clear()
+
+    assert cache.purge_stale(["m@2+int8"]) == 2
+    for version in ("m@2", "m@2+traced", "other@1"):
+        assert cache.get_many(version, [pair]) == {pair: 1.0}
+    assert cache.get_many("m@1+int8", [pair]) == {}
+
+
+def test_least_recently_used_score_is_evicted():
+    cache = ScoreCache(max_entries=1)
+    cache.put_many("m@1", {("CCO", "t"): 1.0})
+    cache.put_many("m@1", {("CCN", "t"): 2.0})
+
+    assert cache.get_many("m@1", [("CCO", "t"), ("CCN", "t")]) == {("CCN", "t"): 2.0}
+    assert cache.evictions == 1
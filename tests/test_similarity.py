@@ -0,0 +1,86 @@
+import pytest
+
+pytest.importorskip("rdkit")
+
+from rdkit import Chem, DataStructs
+from rdkit.Chem import AllChem
+
+from app.utils.similarity import FP_BITS, FP_RADIUS, FingerprintIndex
+
+LIBRARY = [
+    "CC(=O)OC1=CC=CC=C1C(=O)O",
+    "CC(C)CC1=CC=C(C=C1)C(C)C(=O)O",
+    "CN1C=NC2=C1C(=O)N(C(=O)N2C)C",
+    "CC(=O)NC1=CC=C(C=C1)O",
+    "OC(=O)C1=CC=CC=C1O",
+    "C1=CC=C(C=C1)C(=O)O",
+    "CCO",
+    "CCN(CC)CC",
+    "C1CCCCC1",
+    "C1=CC=C2C=CC=CC2=C1",
+]
+QUERY = "CC(=O)OC1=CC=CC=C1C(=O)OC"
+
+
+def bitvect(smiles):
+    return AllChem.GetMorganFingerprintAsBitVect(Chem.MolFromSmiles(smiles), FP_RADIUS, nBits=FP_BITS)
+
+
+def expected_scores():
+    canonical = [Chem.MolToSmiles(Chem.MolFromSmiles(s)) for s in LIBRARY]
+    scores = DataStructs.BulkTanimotoSimilarity(bitvect(QUERY), [bitvect(s) for s in LIBRARY])
+    return dict(zip(canonical, scores))
+
+
+def check_matches_rdkit(index):
+    expected = expected_scores()
+    hits = index.search(QUERY)
+
+    assert len(hits) == len(LIBRARY)
+    for hit in hits:
+        assert hit["similarity"] == pytest.approx(expected[hit["smiles"]], abs=5e-5)
+    assert [h["similarity"] for h in hits] == sorted((h["similarity"] for h in hits), reverse=True)
+
+
+def test_tanimoto_matches_rdkit_bulk_similarity():
+    index = FingerprintIndex()
+    assert index.add(LIBRARY) == len(LIBRARY)
+
+    check_matches_rdkit(index)
+
+
+def test_saved_index_scores_the_same(tmp_path):
+    index = FingerprintIndex(str(tmp_path))
+    index.add(LIBRARY[:5])
+    index.save()
+    index.add(LIBRARY[5:])
+
+    # Memory-mapped and in-memory segments together
+    check_matches_rdkit(index)
+    index.save()
+    check_matches_rdkit(FingerprintIndex(str(tmp_path)))
+
+
+def test_threshold_and_top_k():
+    index = FingerprintIndex()
+    index.add(LIBRARY + LIBRARY)
+    expected = sorted(expected_scores().values(), reverse=True)
+
+    top = index.search(QUERY, top_k=3)
+    assert [h["similarity"] for h in top] == pytest.approx(expected[:3], abs=5e-5)
+    assert all(h["similarity"] >= 0.3 for h in index.search(QUERY, threshold=0.3))
+    assert len(index.search(QUERY, threshold=0.3)) == sum(score >= 0.3 for score in expected)
+
+
+def test_saves_from_separate_workers_are_merged(tmp_path):
+    first = FingerprintIndex(str(tmp_path))
+    second = FingerprintIndex(str(tmp_path))
+    first.add(LIBRARY[:6])
+    second.add(LIBRARY[4:])
+
+    first.save()
+    second.save()
+
+    merged = FingerprintIndex(str(tmp_path))
+    assert len(merged) == len(LIBRARY)
+    check_matches_rdkit(merged)
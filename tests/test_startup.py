@@ -0,0 +1,33 @@
+import sys
+
+from app.utils.startup import ImportTracker
+
+
+def test_load_times_first_import_only():
+    sys.modules.pop("colorsys", None)
+    tracker = ImportTracker()
+
+    module = tracker.load("colorsys")
+
+    assert module is sys.modules["colorsys"]
+    assert tracker.load("colorsys") is module
+    assert list(tracker.report()["import_seconds"]) == ["colorsys"]
+
+
+def test_modules_imported_elsewhere_are_not_reported():
+    tracker = ImportTracker()
+
+    tracker.load("json")
+
+    assert tracker.report()["import_seconds"] == {}
+
+
+def test_ready_after_mark_ready():
+    tracker = ImportTracker()
+    assert not tracker.ready
+    assert tracker.report()["ready_after_seconds"] is None
+
+    tracker.mark_ready()
+
+    assert tracker.ready
+    assert tracker.report()["ready_after_seconds"] >= 0